@@ -0,0 +1 @@
+# puts the repository root on sys.path, so tests import the `src` package like main.py does
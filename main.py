@@ -1,5 +1,7 @@
 import asyncio
 import argparse
+import json
+import os
 
 def parse_args():
     parser = argparse.ArgumentParser(
@@ -17,6 +19,23 @@ def parse_args():
         default="./mcp-servers-perf.json",
         help="Path to MCP Server config file"
     )
+    gen_parser.add_argument(
+        "--llm-cache",
+        type=str,
+        choices=["readwrite", "readonly", "off"],
+        default=None,
+        help="LLM response cache mode, overrides llmCache.mode in the config"
+    )
+    gen_parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only regenerate tools changed since the previous suite of each server"
+    )
+    gen_parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue each server's interrupted suite, skipping tools already written"
+    )
     
     #val-cases子命令
     val_parser = subparsers.add_parser('val-cases', help='Validate test cases')
@@ -32,6 +51,166 @@ def parse_args():
         default=".logs/perf_mcp_2025-09-12T06-43-29-026631/testcases.json",
         help="Path to get testcases"
     )
+    val_parser.add_argument(
+        "--shard",
+        type=str,
+        default=None,
+        help="Only validate shard i of N (i/N, 1-based), cases are split by a stable hash of their id"
+    )
+    val_parser.add_argument(
+        "--history",
+        type=str,
+        default=None,
+        help="Previous validation results or report.json, to balance shards by per-tool execution time"
+    )
+    val_parser.add_argument(
+        "--server",
+        type=str,
+        default=None,
+        help="Server to validate with --fast, by default the one the testcases folder is named after"
+    )
+    val_parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Validate on a pool of sessions with SuiteValidator and batched LLM judging, "
+             "without setting up the environment of failing cases"
+    )
+
+    # merge-results 子命令
+    merge_parser = subparsers.add_parser('merge-results', help='Merge the validation results of val-cases shards')
+    merge_parser.add_argument("inputs", nargs="+", help="Validation results of the shards")
+    merge_parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Merged validation_results.json, by default in a new results folder of the shards' server"
+    )
+
+    # db 子命令
+    db_parser = subparsers.add_parser('db', help='Import, query and export suites and results in the SQLite store')
+    db_parser.add_argument("action", choices=["import", "runs", "cases", "results", "export"], help="What to do")
+    db_parser.add_argument("folders", nargs="*", help="Suite or results folders to import")
+    db_parser.add_argument(
+        "--db",
+        type=str,
+        default=".logs/suites.db",
+        help="Path of the SQLite database"
+    )
+    db_parser.add_argument("--server", type=str, default=None, help="Only this server")
+    db_parser.add_argument("--tool", type=str, default=None, help="Only this tool")
+    db_parser.add_argument(
+        "--status",
+        type=str,
+        choices=["success", "error", "passed", "failed"],
+        default=None,
+        help="Expected status (success/error) for cases, passed/failed for results"
+    )
+    db_parser.add_argument("--since", type=str, default=None, help="ISO 8601 start of the time range")
+    db_parser.add_argument("--until", type=str, default=None, help="ISO 8601 end of the time range")
+    db_parser.add_argument("--last-runs", type=int, default=None, help="Only the newest N runs of each server")
+    db_parser.add_argument("--run", type=int, default=None, help="Run to export")
+    db_parser.add_argument("--output", type=str, default=None, help="Folder to export the run to")
+
+    # bench 子命令
+    bench_parser = subparsers.add_parser('bench', help='Load test an MCP server by replaying test cases')
+    bench_parser.add_argument(
+        "--config", 
+        type=str, 
+        default="./mcp-servers-perf.json",
+        help="Path to MCP Server config file"
+    )
+    bench_parser.add_argument(
+        "--testpath", 
+        type=str, 
+        default=".logs/perf_mcp_2025-09-12T06-43-29-026631/testcases.json",
+        help="Path to get testcases"
+    )
+    bench_parser.add_argument(
+        "--server",
+        type=str,
+        default=None,
+        help="Server to benchmark, by default the one the testcases folder is named after"
+    )
+    bench_parser.add_argument("--concurrency", type=int, default=4, help="Number of sessions calling tools in parallel")
+    bench_parser.add_argument("--rate", type=float, default=0, help="Target calls per second, 0 for unlimited")
+    bench_parser.add_argument(
+        "--max-inflight",
+        type=int,
+        default=None,
+        help="With --rate, calls dispatched but not finished before dispatching waits, by default rate x callTimeout"
+    )
+    bench_parser.add_argument("--warmup", type=float, default=0, help="Seconds of calls excluded from the results")
+    bench_parser.add_argument(
+        "--duration",
+        type=float,
+        default=0,
+        help="Seconds to keep replaying the cases after warmup, 0 to replay every case once"
+    )
+    bench_parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Path of the results file, by default bench_results.json next to the testcases"
+    )
+    bench_parser.add_argument("--baseline", type=str, default=None, help="Previous results file to compare with")
+    bench_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative change against the baseline reported as a regression"
+    )
+
+    # bench-pipeline 子命令
+    pipeline_parser = subparsers.add_parser(
+        'bench-pipeline',
+        help='Time gen-cases, validation and reporting offline against a synthetic MCP server'
+    )
+    pipeline_parser.add_argument("--workdir", type=str, default=".bench", help="Folder for the synthetic suite and results")
+    pipeline_parser.add_argument("--tools", type=int, default=500, help="Number of synthetic tools")
+    pipeline_parser.add_argument("--cases-per-tool", type=int, default=20, help="Test cases generated per tool")
+    pipeline_parser.add_argument("--latency", type=float, default=0, help="Mean seconds the server spends in a call")
+    pipeline_parser.add_argument("--payload", type=int, default=256, help="Bytes of data in each tool result")
+    pipeline_parser.add_argument("--error-rate", type=float, default=0.05, help="Probability of a tool call failing")
+    pipeline_parser.add_argument("--concurrency", type=int, default=8, help="LLM requests and server sessions in flight")
+    pipeline_parser.add_argument(
+        "--transport",
+        type=str,
+        choices=["stdio", "http", "sse"],
+        default="stdio",
+        help="Serve the synthetic server over stdio (a process per session), or over streamable HTTP or SSE"
+    )
+    pipeline_parser.add_argument(
+        "--recording",
+        type=str,
+        default=None,
+        help="LLM recording to replay or, with --record, to write (default llm_recording.jsonl in --workdir)"
+    )
+    pipeline_parser.add_argument(
+        "--record",
+        action="store_true",
+        help="Call the real LLM and save its responses to --recording"
+    )
+    pipeline_parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Path of the results file, by default pipeline_bench.json in --workdir"
+    )
+    pipeline_parser.add_argument("--baseline", type=str, default=None, help="Previous results file to compare with")
+    pipeline_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Relative increase of time or memory against the baseline reported as a regression"
+    )
+
+    for sub_parser in (gen_parser, val_parser, bench_parser, pipeline_parser):
+        sub_parser.add_argument(
+            "--trace",
+            type=str,
+            default=None,
+            help="Write timing spans to this file (Chrome trace, or OTLP JSON if it ends with .otlp.json)"
+        )
 
     # reporter 子命令
     rep_parser = subparsers.add_parser('rep-cases', help='report testing results')
@@ -39,29 +218,144 @@ def parse_args():
         "--valpath", 
         type=str, 
         default=".logs/perf_mcp_2025-09-11T07-31-04-418670/validation_results.json",
-        help="Path to MCP Server config file"
+        help="Path to validation results (JSON array or JSONL)"
+    )
+    rep_parser.add_argument(
+        "--prevpath",
+        type=str,
+        default=None,
+        help="Previous run's validation results or report.json, to flag tools that got slower or started failing"
+    )
+    rep_parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Folder for report.json and report.html, by default the folder of --valpath"
+    )
+    rep_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="Tolerated pass rate drop and relative p95 execution time increase"
     )
     
     return parser.parse_args()
 
 
-async def gen_cases(config_path):
+async def gen_cases(config_path, incremental=False, resume=False):
     from src.test_generator.TestGenerator import TestGenerator
-    generator = TestGenerator(config_path=config_path)
+    generator = TestGenerator(config_path=config_path, incremental=incremental, resume=resume)
     return await generator.run()
 
 
-async def val_cases(config_path, testcase_path):
-    from src.validator.Response_validator_withenv import ResponseValidator_withenv
-    validator = ResponseValidator_withenv(config_path=config_path, testcase_path=testcase_path)
+async def val_cases(config_path, testcase_path, shard=None, history=None, server=None, fast=False):
+    if shard:
+        from src.validator.Sharding import write_shard
+        testcase_path = write_shard(testcase_path, shard, history)
+    if fast:
+        from src.validator.SuiteValidator import SuiteValidator
+        validator = SuiteValidator(config_path=config_path, testcase_path=testcase_path, server_name=server)
+    else:
+        from src.validator.Response_validator_withenv import ResponseValidator_withenv
+        validator = ResponseValidator_withenv(config_path=config_path, testcase_path=testcase_path)
     return await validator.run()
 
+def rep_cases(valpath, prevpath=None, output=None, threshold=0.1):
+    from src.reporter.Reporter import run_report
+    return run_report(valpath, prevpath, output, threshold)
+
+async def bench(args):
+    from src.client.Client import Configuration
+    from src.bench.LoadTester import run_benchmark
+    config = Configuration().load_config(args.config)
+    return await run_benchmark(
+        config,
+        args.testpath,
+        args.server,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        max_inflight=args.max_inflight,
+        warmup=args.warmup,
+        duration=args.duration,
+        output=args.output,
+        baseline=args.baseline,
+        threshold=args.threshold
+    )
+
+async def bench_pipeline(args):
+    from src.bench.PipelineBench import run_pipeline_bench
+    return await run_pipeline_bench(
+        args.workdir,
+        tools=args.tools,
+        cases_per_tool=args.cases_per_tool,
+        latency=args.latency,
+        payload=args.payload,
+        error_rate=args.error_rate,
+        concurrency=args.concurrency,
+        transport=args.transport,
+        recording=args.recording,
+        record=args.record,
+        output=args.output,
+        baseline=args.baseline,
+        threshold=args.threshold
+    )
+
+def db_command(args):
+    from src.utils.suite_db import SuiteDatabase
+    db = SuiteDatabase(args.db)
+    try:
+        if args.action == 'import':
+            for folder in args.folders:
+                print(f"Imported {folder} as runs {db.import_folder(folder, args.server)}")
+        elif args.action == 'runs':
+            for run in db.list_runs(args.server):
+                print(f"{run['id']:>6}  {run['kind']:<11}{run['server']:<24}{run['created_at']:<28}{run['folder'] or ''}")
+        elif args.action in ('cases', 'results'):
+            filters = dict(server=args.server, tool=args.tool, since=args.since, until=args.until, last_runs=args.last_runs)
+            if args.action == 'results':
+                passed = None if args.status is None else args.status == 'passed'
+                records = db.query_results(passed=passed, **filters)
+            else:
+                records = db.query_cases(status=args.status, **filters)
+            for record in records:
+                print(json.dumps(record, ensure_ascii=False))
+        elif args.action == 'export':
+            if args.run is None or not args.output:
+                raise SystemExit("db export needs --run and --output")
+            db.export_run(args.run, args.output)
+    finally:
+        db.close()
+
 async def main():
     args = parse_args()
-    if args.command == 'gen-cases':
-        await gen_cases(args.config)  
-    if args.command == 'val-cases':
-        await val_cases(args.config, args.testpath)
+    if getattr(args, 'llm_cache', None):
+        os.environ['LLM_CACHE'] = args.llm_cache
+    trace = getattr(args, 'trace', None)
+    if trace:
+        if args.command == 'val-cases' and not args.fast:
+            raise SystemExit("val-cases only supports --trace with --fast")
+        from src.utils.tracing import tracer
+        tracer.enable()
+    try:
+        if args.command == 'gen-cases':
+            await gen_cases(args.config, args.incremental, args.resume)
+        if args.command == 'val-cases':
+            await val_cases(args.config, args.testpath, args.shard, args.history, args.server, args.fast)
+        if args.command == 'bench':
+            await bench(args)
+        if args.command == 'bench-pipeline':
+            await bench_pipeline(args)
+    finally:
+        if trace:
+            tracer.export(trace)
+            tracer.print_summary()
+    if args.command == 'db':
+        db_command(args)
+    if args.command == 'merge-results':
+        from src.validator.Sharding import merge_results
+        merge_results(args.inputs, args.output)
+    if args.command == 'rep-cases':
+        rep_cases(args.valpath, args.prevpath, args.output, args.threshold)
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
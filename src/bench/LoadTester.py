@@ -0,0 +1,259 @@
+import asyncio
+import datetime
+import json
+import math
+import os
+import time
+from typing import Dict, List, Optional
+from ..client.MCPClientPool import MCPClientPool, ToolCallTimeout, timeout_options
+from ..utils.stats import latency_summary
+from ..utils.suite_store import iter_testcases, suite_server
+from ..utils.tracing import tracer
+
+
+class LoadTester:
+    """
+    Replays a suite's tool calls against an MCP server and measures latency and throughput
+
+    `concurrency` sessions each run one call at a time. With a target rate, calls
+    are dispatched on a fixed schedule and latency is measured from the
+    scheduled time, so a server falling behind shows up as queueing delay
+    instead of silently lowering the offered load. A call counts as an error
+    only when its status differs from the case's `expect.status`; errors the
+    case expects, such as schema cases, are reported as `expected_errors`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        srv_config: dict,
+        concurrency: int = 1,
+        rate: float = 0,
+        warmup: float = 0,
+        duration: float = 0,
+        pool_options: Optional[dict] = None,
+        max_inflight: Optional[int] = None
+    ):
+        """
+        Args:
+            name: Name of the MCP server
+            srv_config: Server entry from `mcpServers`
+            concurrency: Number of sessions calling tools in parallel
+            rate: Target calls per second, 0 for as fast as the sessions allow
+            warmup: Seconds of calls left out of the results
+            duration: Seconds to keep replaying the suite after warmup, 0 to replay every case once
+            pool_options: Timeout settings of the session pool, see `timeout_options`
+            max_inflight: Calls dispatched and not finished allowed with a target rate, beyond
+                which dispatching waits; by default the calls of one call timeout (60s without one)
+        """
+        self.name = name
+        self.srv_config = srv_config
+        self.concurrency = max(1, concurrency)
+        self.rate = rate
+        self.warmup = warmup
+        self.duration = duration
+        self.pool_options = pool_options or {}
+        self.max_inflight = max_inflight
+        self.samples: List[tuple] = []  # (tool name, latency, ok, dispatched at, timed out, expected error)
+
+    async def run(self, cases: List[dict]) -> dict:
+        """
+        Replay the cases and return the benchmark results
+        """
+        if not cases:
+            raise ValueError("No test cases to replay")
+
+        async with MCPClientPool(self.name, self.srv_config, self.concurrency, **self.pool_options) as pool:
+            started = time.perf_counter()
+            measure_from = started + self.warmup
+            stop_at = measure_from + self.duration if self.duration else None
+            inflight = asyncio.Semaphore(self.inflight_limit(pool.sessions))
+            pending = set()
+            sent = 0
+            measured_sent = 0
+
+            while True:
+                now = time.perf_counter()
+                if stop_at is not None and now >= stop_at:
+                    break
+                if stop_at is None and measured_sent >= len(cases):
+                    break
+
+                if self.rate:
+                    dispatched = started + sent / self.rate
+                    if dispatched > now:
+                        await asyncio.sleep(dispatched - now)
+                    await inflight.acquire()
+                else:
+                    await inflight.acquire()
+                    dispatched = time.perf_counter()
+                if dispatched >= measure_from:
+                    measured_sent += 1
+
+                case = cases[sent % len(cases)]
+                sent += 1
+                future = pool.submit(case, self._call(dispatched))
+                future.add_done_callback(self._on_done(case, dispatched, inflight))
+                # finished calls drop out, so a long run only holds the calls in flight
+                pending.add(future)
+                future.add_done_callback(pending.discard)
+
+            await asyncio.gather(*list(pending), return_exceptions=True)
+            elapsed = time.perf_counter() - measure_from
+
+        measured = [sample for sample in self.samples if sample[3] >= measure_from]
+        return self.summarize(measured, max(elapsed, 1e-9))
+
+    def inflight_limit(self, sessions: int) -> int:
+        """
+        Calls handed to the pool at once, beyond the sessions they wait in its queue
+        """
+        if not self.rate:
+            # closed loop, a session takes the next call when its last one is done
+            return sessions
+        if self.max_inflight:
+            return max(1, self.max_inflight)
+        # enough for the server to fall a whole call timeout behind before dispatching waits
+        return max(sessions, math.ceil(self.rate * (self.pool_options.get("call_timeout") or 60)))
+
+    def _call(self, dispatched: float):
+        async def call(client, case: dict):
+            expected = (case.get("expect") or {}).get("status", "success")
+            is_error = False
+            try:
+                with tracer.span("tool.execute", "mcp", tool=case["toolName"]):
+                    result = await client.execute_tool(case["toolName"], case.get("input") or {})
+                is_error = bool(getattr(result, "isError", False))
+                ok = ("error" if is_error else "success") == expected
+            except Exception:
+                # a call that never returned a result is not the error a case expects
+                ok = False
+            self.samples.append(
+                (case["toolName"], time.perf_counter() - dispatched, ok, dispatched, False, ok and is_error)
+            )
+        return call
+
+    def _on_done(self, case: dict, dispatched: float, inflight: asyncio.Semaphore):
+        def done(future: asyncio.Future):
+            inflight.release()
+            # a timed out call is cancelled by the pool before it can record itself
+            if not future.cancelled() and isinstance(future.exception(), ToolCallTimeout):
+                self.samples.append((case["toolName"], time.perf_counter() - dispatched, False, dispatched, True, False))
+        return done
+
+    def summarize(self, samples: List[tuple], elapsed: float) -> dict:
+        by_tool: Dict[str, List[tuple]] = {}
+        for sample in samples:
+            by_tool.setdefault(sample[0], []).append(sample)
+
+        def stats(group: List[tuple]) -> dict:
+            errors = sum(1 for sample in group if not sample[2])
+            return {
+                "requests": len(group),
+                "errors": errors,
+                "expected_errors": sum(1 for sample in group if sample[5]),
+                "timeouts": sum(1 for sample in group if sample[4]),
+                "error_rate": errors / len(group) if group else 0.0,
+                "throughput": len(group) / elapsed,
+                "latency": latency_summary([sample[1] for sample in group])
+            }
+
+        return {
+            "server": self.name,
+            "timestamp": datetime.datetime.utcnow().isoformat(),
+            "settings": {
+                "concurrency": self.concurrency,
+                "rate": self.rate,
+                "warmup": self.warmup,
+                "duration": self.duration
+            },
+            "elapsed": elapsed,
+            "overall": stats(samples),
+            "tools": {tool: stats(group) for tool, group in sorted(by_tool.items())}
+        }
+
+
+def compare_with_baseline(results: dict, baseline: dict, threshold: float = 0.1) -> List[str]:
+    """
+    List the tools that got slower, lost throughput or fail more often than in the baseline
+
+    Args:
+        threshold: Relative change tolerated before a tool is reported
+    """
+    regressions = []
+    for tool, current in results["tools"].items():
+        previous = baseline.get("tools", {}).get(tool)
+        if not previous:
+            continue
+        for percentile in ("p50", "p95", "p99"):
+            before, after = previous["latency"][percentile], current["latency"][percentile]
+            if before and after > before * (1 + threshold):
+                regressions.append(f"{tool}: {percentile} latency {before * 1000:.1f}ms -> {after * 1000:.1f}ms")
+        if previous["throughput"] and current["throughput"] < previous["throughput"] * (1 - threshold):
+            regressions.append(
+                f"{tool}: throughput {previous['throughput']:.1f}/s -> {current['throughput']:.1f}/s"
+            )
+        if current["error_rate"] > previous["error_rate"] + threshold:
+            regressions.append(
+                f"{tool}: error rate {previous['error_rate']:.1%} -> {current['error_rate']:.1%}"
+            )
+    return regressions
+
+
+def print_results(results: dict):
+    print(f"\nBenchmark of {results['server']} over {results['elapsed']:.1f}s")
+    print(f"{'tool':<32}{'reqs':>8}{'err%':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    rows = list(results["tools"].items()) + [("TOTAL", results["overall"])]
+    for tool, stats in rows:
+        latency = stats["latency"]
+        print(
+            f"{tool:<32}{stats['requests']:>8}{stats['error_rate'] * 100:>8.1f}{stats['throughput']:>10.1f}"
+            f"{latency['p50'] * 1000:>10.1f}{latency['p95'] * 1000:>10.1f}{latency['p99'] * 1000:>10.1f}"
+        )
+
+
+async def run_benchmark(config: dict, testcase_path: str, server_name: Optional[str] = None, **options) -> dict:
+    """
+    Benchmark one server of the config with a generated suite
+
+    Args:
+        config: Loaded MCP config
+        testcase_path: testcases.json, testcases.jsonl or their suite folder
+        server_name: Server to benchmark, by default the one the suite folder is named after
+        options: concurrency, rate, warmup, duration, max_inflight, output, baseline and threshold
+    """
+    servers = config["mcpServers"]
+    server_name = server_name or suite_server(list(servers), testcase_path)
+
+    cases = list(iter_testcases(testcase_path))
+    tester = LoadTester(
+        server_name,
+        servers[server_name],
+        concurrency=options.get("concurrency", 1),
+        rate=options.get("rate", 0),
+        warmup=options.get("warmup", 0),
+        duration=options.get("duration", 0),
+        pool_options=timeout_options(config, server_name),
+        max_inflight=options.get("max_inflight")
+    )
+    results = await tester.run(cases)
+    print_results(results)
+
+    if options.get("baseline"):
+        with open(options["baseline"], 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = compare_with_baseline(results, baseline, options.get("threshold", 0.1))
+        results["regressions"] = regressions
+        if regressions:
+            print("\nRegressions against baseline:")
+            print("\n".join(f"  {line}" for line in regressions))
+        else:
+            print("\nNo regressions against baseline")
+
+    output = options.get("output") or os.path.join(
+        testcase_path if os.path.isdir(testcase_path) else os.path.dirname(testcase_path), "bench_results.json"
+    )
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, ensure_ascii=False, indent=4)
+    print(f"Benchmark results are saved into {output}")
+    return results
@@ -0,0 +1,314 @@
+import asyncio
+import datetime
+import json
+import os
+import re
+import resource
+import socket
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import List, Optional
+from ..llm.ReplayLLM import ReplayLLMClient
+from ..reporter.Reporter import run_report
+from ..test_generator.TestGenerator import TestGenerator
+from ..utils.suite_store import TESTCASES_JSON, iter_testcases, list_suite_folders
+from ..validator.SuiteValidator import SuiteValidator
+from .SyntheticServer import SERVER_NAME, server_config, server_url, tool_sources
+
+PIPELINE_RESULTS_JSON = "pipeline_bench.json"
+LLM_RECORDING_JSONL = "llm_recording.jsonl"
+# seconds before a synthetic tool call counts as hung and its server is restarted
+CALL_TIMEOUT = 60
+
+
+class SyntheticSource:
+    """
+    Stands in for ReadSourceCode, the synthetic server has no per-tool source files
+    """
+
+    def __init__(self, tools: int):
+        self.sources = tool_sources(tools)
+
+    def get_code(self, server_name: str) -> dict:
+        return self.sources
+
+
+def synthetic_llm_response(messages: List[dict]) -> str:
+    """
+    Answer the pipeline's prompts with well-formed responses, for runs without a recording
+    """
+    prompt = messages[-1]["content"]
+
+    if "## Tool Definition" in prompt:
+        name = re.search(r"^Name: (.+)$", prompt, re.MULTILINE).group(1).strip()
+        count = int(re.search(r"Generate (\d+) diverse", prompt).group(1))
+        cases = []
+        for index in range(count):
+            rules = [
+                {"type": "contains", "value": name, "message": "Response names the tool"},
+                {"type": "schema", "value": {"type": "object", "required": ["tool", "data"]},
+                 "message": "Response is the tool's result object"}
+            ]
+            if index % 5 == 0:
+                rules.append({"type": "llm", "value": f"The result echoes the query 'item {index}'",
+                              "message": "Query is echoed"})
+            cases.append({
+                "description": f"Synthetic case {index} of {name}",
+                "input": {"query": f"item {index}", "count": index % 100 + 1},
+                "expect": {"status": "success", "validationRules": rules}
+            })
+        return json.dumps(cases)
+
+    if "Test scenarios (each with its id" in prompt:
+        scenarios = json.loads(re.search(r"include\):\n([\s\S]*?)\n\nFor each scenario", prompt).group(1))
+        return json.dumps({
+            scenario["id"]: f"Please look up {json.dumps(scenario['parameters'])}" for scenario in scenarios
+        })
+
+    if "**Items:**" in prompt:
+        items = json.loads(re.search(r"\*\*Items:\*\*\n([\s\S]*?)\n\nFor every item", prompt).group(1))
+        return json.dumps([{"id": item["id"], "answer": "yes", "explanation": "Synthetic verdict"} for item in items])
+
+    if '"answer": "yes" | "no"' in prompt:
+        return json.dumps({"answer": "yes", "explanation": "Synthetic verdict"})
+
+    return "Please look up the requested items."
+
+
+class PipelineBench:
+    """
+    Times gen-cases, validation and report generation against a synthetic server, with no network
+
+    Test cases are generated by TestGenerator with a replayed LLM, validated
+    by SuiteValidator on a pool of sessions to the synthetic server, and
+    aggregated by the reporter. Every stage records its
+    wall time, its tracemalloc peak and the process's max RSS so far.
+    """
+
+    def __init__(
+        self,
+        workdir: str,
+        tools: int = 500,
+        cases_per_tool: int = 20,
+        latency: float = 0,
+        payload: int = 256,
+        error_rate: float = 0.05,
+        concurrency: int = 8,
+        recording: Optional[str] = None,
+        record: bool = False,
+        seed: int = 0,
+        transport: str = "stdio"
+    ):
+        """
+        Args:
+            workdir: Folder for the config, the suite and the results
+            tools: Number of synthetic tools
+            cases_per_tool: numTestsPerTool of the generated suite
+            latency: Mean seconds the synthetic server spends in a call
+            payload: Bytes of data in each tool result
+            error_rate: Probability of a tool call failing
+            concurrency: LLM requests and server sessions in flight
+            recording: JSONL LLM recording to replay, or to write with `record` (llm_recording.jsonl in workdir by default)
+            record: Call the configured LLM and record its responses instead of replaying
+            seed: Seed of the synthetic server's latency and failure draws
+            transport: stdio to spawn a server per session, http or sse to share one local server process
+        """
+        self.workdir = os.path.abspath(workdir)
+        self.tools = tools
+        self.cases_per_tool = cases_per_tool
+        self.concurrency = concurrency
+        if record and not recording:
+            recording = os.path.join(self.workdir, LLM_RECORDING_JSONL)
+        self.recording = recording and os.path.abspath(recording)
+        self.record = record
+        self.srv_config = server_config(tools, latency, payload, error_rate, seed)
+        self.transport = transport
+        self.settings = {
+            "tools": tools,
+            "cases_per_tool": cases_per_tool,
+            "latency": latency,
+            "payload": payload,
+            "error_rate": error_rate,
+            "concurrency": concurrency,
+            "transport": transport,
+            "llm": "record" if record else ("replay" if recording else "synthetic")
+        }
+        self.stages = {}
+        self.llm = None
+
+    @contextmanager
+    def stage(self, name: str):
+        print(f"\n=== {name} ===")
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        stats = {}
+        yield stats
+        stats["seconds"] = time.perf_counter() - start
+        stats["peak_traced_mb"] = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        # ru_maxrss is in KiB on Linux
+        stats["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        self.stages[name] = stats
+
+    async def serve_http(self) -> asyncio.subprocess.Process:
+        """
+        Start the synthetic server on a free local port, and point the config at its URL
+        """
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        process = await asyncio.create_subprocess_exec(
+            self.srv_config["command"], *self.srv_config["args"], "--transport", self.transport, "--port", str(port)
+        )
+        for _ in range(100):
+            try:
+                _, writer = await asyncio.open_connection("127.0.0.1", port)
+                writer.close()
+                break
+            except OSError:
+                await asyncio.sleep(0.1)
+        else:
+            process.kill()
+            await process.wait()
+            raise RuntimeError(f"Synthetic {self.transport} server did not start on port {port}")
+        self.srv_config = {"url": server_url(self.transport, port)}
+        return process
+
+    async def run(self) -> dict:
+        os.makedirs(self.workdir, exist_ok=True)
+        process = await self.serve_http() if self.transport != "stdio" else None
+        try:
+            return await self._run()
+        finally:
+            if process:
+                process.terminate()
+                await process.wait()
+
+    async def _run(self) -> dict:
+        config_path = os.path.join(self.workdir, "mcp-servers-bench.json")
+        with open(config_path, 'w', encoding='utf-8') as file:
+            json.dump({
+                "mcpServers": {SERVER_NAME: self.srv_config},
+                "numTestsPerTool": self.cases_per_tool,
+                "maxConcurrency": self.concurrency,
+                "validationSessions": self.concurrency,
+                "callTimeout": CALL_TIMEOUT,
+                "endToEnd": {"enabled": False},
+                "llmCache": {"mode": "off"}
+            }, file, indent=4)
+
+        cwd = os.getcwd()
+        # suites are written to .logs under the working directory
+        os.chdir(self.workdir)
+        tracemalloc.start()
+        try:
+            testcase_path = await self.generate(config_path)
+            valpath = await self.validate(config_path, testcase_path)
+            with self.stage("report"):
+                run_report(valpath)
+        finally:
+            tracemalloc.stop()
+            os.chdir(cwd)
+
+        return {
+            "timestamp": datetime.datetime.utcnow().isoformat(),
+            "settings": self.settings,
+            "stages": self.stages
+        }
+
+    async def generate(self, config_path: str) -> str:
+        with self.stage("gen-cases") as stats:
+            generator = TestGenerator(config_path=config_path)
+            if self.record:
+                self.llm = ReplayLLMClient(self.recording, "record", llm=generator.llm)
+            else:
+                self.llm = ReplayLLMClient(self.recording, "replay", fallback=synthetic_llm_response)
+            generator.llm = generator.scheduler.llm = self.llm
+            generator.readsc = SyntheticSource(self.tools)
+            if not all(await generator.run()):
+                raise RuntimeError("Test generation failed for the synthetic server")
+
+            folder = list_suite_folders(SERVER_NAME)[-1]
+            testcase_path = os.path.join(folder, TESTCASES_JSON)
+            stats["cases"] = sum(1 for _ in iter_testcases(testcase_path))
+        return testcase_path
+
+    async def validate(self, config_path: str, testcase_path: str) -> str:
+        with self.stage("val-cases") as stats:
+            validator = SuiteValidator(
+                config_path=config_path, testcase_path=testcase_path, server_name=SERVER_NAME, llm=self.llm
+            )
+            valpath = await validator.run()
+            stats["cases"] = validator.validated
+            stats["timeouts"] = validator.timeouts
+            stats["judge_calls"] = validator.judge.calls
+        return valpath
+
+
+def compare_with_baseline(results: dict, baseline: dict, threshold: float = 0.1) -> List[str]:
+    """
+    List the stages that got slower or use more memory than in the baseline
+
+    Args:
+        threshold: Relative change tolerated before a stage is reported
+    """
+    regressions = []
+    for name, current in results["stages"].items():
+        previous = baseline.get("stages", {}).get(name)
+        if not previous:
+            continue
+        for metric, unit in (("seconds", "s"), ("peak_traced_mb", "MB"), ("max_rss_mb", "MB")):
+            before, after = previous.get(metric), current.get(metric)
+            if before and after > before * (1 + threshold):
+                regressions.append(f"{name}: {metric} {before:.2f}{unit} -> {after:.2f}{unit}")
+    return regressions
+
+
+def print_results(results: dict):
+    settings = results["settings"]
+    print(
+        f"\nPipeline benchmark: {settings['tools']} tools x {settings['cases_per_tool']} cases, "
+        f"{settings['llm']} LLM, concurrency {settings['concurrency']}, {settings.get('transport', 'stdio')} transport"
+    )
+    print(f"{'stage':<14}{'cases':>8}{'seconds':>10}{'cases/s':>10}{'peak MB':>10}{'max RSS MB':>12}")
+    for name, stats in results["stages"].items():
+        cases = stats.get("cases")
+        rate = f"{cases / stats['seconds']:.1f}" if cases and stats["seconds"] else ""
+        print(
+            f"{name:<14}{cases if cases is not None else '':>8}{stats['seconds']:>10.2f}{rate:>10}"
+            f"{stats['peak_traced_mb']:>10.1f}{stats['max_rss_mb']:>12.1f}"
+        )
+
+
+async def run_pipeline_bench(workdir: str, **options) -> dict:
+    """
+    Run the offline pipeline benchmark and write its results
+
+    Args:
+        workdir: Folder for the synthetic config, suites and results
+        options: PipelineBench settings, plus output, baseline and threshold
+    """
+    output = options.pop("output", None) or os.path.join(workdir, PIPELINE_RESULTS_JSON)
+    baseline_path = options.pop("baseline", None)
+    threshold = options.pop("threshold", 0.1)
+
+    results = await PipelineBench(workdir, **options).run()
+    print_results(results)
+
+    if baseline_path:
+        with open(baseline_path, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        regressions = compare_with_baseline(results, baseline, threshold)
+        results["regressions"] = regressions
+        if regressions:
+            print("\nRegressions against baseline:")
+            print("\n".join(f"  {line}" for line in regressions))
+        else:
+            print("\nNo regressions against baseline")
+
+    directory = os.path.dirname(os.path.abspath(output))
+    os.makedirs(directory, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, ensure_ascii=False, indent=4)
+    print(f"Pipeline benchmark results are saved into {output}")
+    return results
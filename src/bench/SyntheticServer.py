@@ -0,0 +1,161 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import sys
+import mcp.types as types
+from mcp.server.lowlevel import Server
+from mcp.server.stdio import stdio_server
+
+SERVER_NAME = "synthetic"
+INPUT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "query": {"type": "string", "maxLength": 200, "description": "Text echoed back in the result"},
+        "count": {"type": "integer", "minimum": 1, "maximum": 100, "description": "Number of items to return"}
+    },
+    "required": ["query"]
+}
+# source shown to the generator for every tool, the server itself has no per-tool functions
+TOOL_SOURCE = '''@mcp.tool(name="{name}")
+async def {name}(query: str, count: int = 1) -> str:
+    """Return `count` synthetic items for `query` as a JSON object."""
+    await asyncio.sleep(LATENCY)
+    if random.random() < ERROR_RATE:
+        raise RuntimeError("Injected failure of {name}")
+    return json.dumps({{"tool": "{name}", "query": query, "count": count, "data": "x" * PAYLOAD}})
+'''
+
+
+def tool_name(index: int) -> str:
+    return f"synthetic_tool_{index:04d}"
+
+
+def server_config(tools: int, latency: float = 0, payload: int = 256, error_rate: float = 0, seed: int = 0) -> dict:
+    """
+    `mcpServers` entry that starts this script with the given settings
+    """
+    return {
+        "command": sys.executable,
+        "args": [
+            os.path.abspath(__file__),
+            "--tools", str(tools),
+            "--latency", str(latency),
+            "--payload", str(payload),
+            "--error-rate", str(error_rate),
+            "--seed", str(seed)
+        ],
+        "env": {}
+    }
+
+
+def server_url(transport: str, port: int, host: str = "127.0.0.1") -> str:
+    """
+    URL of this script served with `--transport http` or `--transport sse`
+    """
+    return f"http://{host}:{port}/{'sse' if transport == 'sse' else 'mcp/'}"
+
+
+def tool_sources(tools: int) -> dict:
+    """
+    Source code of every tool keyed by tool name, as ReadSourceCode.get_code returns it
+    """
+    return {tool_name(index): TOOL_SOURCE.format(name=tool_name(index)) for index in range(tools)}
+
+
+def build_server(tools: int, latency: float, payload: int, error_rate: float, seed: int):
+    """
+    Build a server whose tools share one input schema
+
+    Every call sleeps around `latency` seconds, fails with probability
+    `error_rate`, and otherwise returns a JSON object carrying `payload`
+    bytes of data.
+    """
+    server = Server(SERVER_NAME)
+    rng = random.Random(seed)
+    definitions = [
+        types.Tool(
+            name=tool_name(index),
+            description=f"Synthetic tool {index} returning {payload} bytes of data",
+            inputSchema=INPUT_SCHEMA
+        )
+        for index in range(tools)
+    ]
+
+    @server.list_tools()
+    async def list_tools():
+        return definitions
+
+    @server.call_tool()
+    async def call_tool(name: str, arguments: dict):
+        if latency:
+            # +-50% jitter, so percentiles are not all the same value
+            await asyncio.sleep(latency * rng.uniform(0.5, 1.5))
+        if rng.random() < error_rate:
+            raise RuntimeError(f"Injected failure of {name}")
+        body = {"tool": name, "query": arguments.get("query"), "count": arguments.get("count", 1), "data": "x" * payload}
+        return [types.TextContent(type="text", text=json.dumps(body))]
+
+    return server
+
+
+async def serve(args):
+    server = build_server(args.tools, args.latency, args.payload, args.error_rate, args.seed)
+    if args.transport == "stdio":
+        async with stdio_server() as (read_stream, write_stream):
+            await server.run(read_stream, write_stream, server.create_initialization_options())
+        return
+
+    import uvicorn
+    from starlette.applications import Starlette
+    from starlette.responses import Response
+    from starlette.routing import Mount, Route
+
+    if args.transport == "sse":
+        from mcp.server.sse import SseServerTransport
+        transport = SseServerTransport("/messages/")
+
+        async def handle_sse(request):
+            async with transport.connect_sse(request.scope, request.receive, request._send) as (read_stream, write_stream):
+                await server.run(read_stream, write_stream, server.create_initialization_options())
+            return Response()
+
+        app = Starlette(routes=[
+            Route("/sse", endpoint=handle_sse, methods=["GET"]),
+            Mount("/messages/", app=transport.handle_post_message)
+        ])
+    else:
+        from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+        manager = StreamableHTTPSessionManager(app=server)
+
+        async def handle_mcp(scope, receive, send):
+            await manager.handle_request(scope, receive, send)
+
+        @contextlib.asynccontextmanager
+        async def lifespan(app):
+            async with manager.run():
+                yield
+
+        app = Starlette(routes=[Mount("/mcp", app=handle_mcp)], lifespan=lifespan)
+
+    config = uvicorn.Config(app, host=args.host, port=args.port, log_level="warning")
+    await uvicorn.Server(config).serve()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Synthetic MCP server")
+    parser.add_argument("--tools", type=int, default=10, help="Number of tools")
+    parser.add_argument("--latency", type=float, default=0, help="Mean seconds spent in each call")
+    parser.add_argument("--payload", type=int, default=256, help="Bytes of data in each result")
+    parser.add_argument("--error-rate", type=float, default=0, help="Probability of a call failing")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the latency and failure draws")
+    parser.add_argument("--transport", choices=["stdio", "http", "sse"], default="stdio", help="Transport to serve on")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Address to listen on with http or sse")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on with http or sse")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(serve(parse_args()))
@@ -0,0 +1,146 @@
+import asyncio
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+import httpx
+import mcp.types as types
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+from ..type.types_def import ToolDefinition
+
+try:
+    from mcp.client.streamable_http import streamable_http_client
+except ImportError:
+    # older mcp releases only have the factory based streamablehttp_client
+    from mcp.client.streamable_http import streamablehttp_client
+    streamable_http_client = None
+
+# seconds allowed for connecting and sending a request
+HTTP_TIMEOUT = 30
+# seconds an open event stream may stay silent, call timeouts are left to callTimeout
+SSE_READ_TIMEOUT = 300
+
+
+class HTTPMCPClient:
+    """
+    MCP client over the streamable HTTP or the SSE transport, a drop-in for the stdio MCPClient
+
+    The transports and the session are the mcp SDK's, so protocol details such
+    as session ids, server requests and notifications are handled there. Any
+    number of calls can be in flight on a session. Tool calls are not retried,
+    since a call the server has received may not be safe to repeat. The
+    sessions of a server on one event loop share a single httpx client, and
+    so its connection pool; the last session to clean up closes it.
+    """
+
+    # (event loop, server name, url) -> [httpx client, sessions using it]
+    shared_clients: Dict[tuple, list] = {}
+
+    def __init__(self, name: str, config: dict):
+        """
+        Args:
+            name: Name of the MCP server
+            config: Server entry from `mcpServers` with a `url`, and optionally `transport`
+                ("streamable-http" or "sse", by default "sse" for URLs ending in /sse),
+                `headers`, `maxConnections` and `http2`
+        """
+        self.name = name
+        self.config = config
+        self.url = config["url"]
+        self.transport = config.get("transport") or (
+            "sse" if urlparse(self.url).path.rstrip("/").endswith("/sse") else "streamable-http"
+        )
+        self.headers = dict(config.get("headers") or {})
+        self.max_connections = config.get("maxConnections")
+        self.http2 = config.get("http2", False)
+        self.session: Optional[ClientSession] = None
+        self.http: Optional[httpx.AsyncClient] = None
+        self.exit_stack = AsyncExitStack()
+
+    def http_client(self) -> httpx.AsyncClient:
+        """
+        httpx client shared by the sessions of the server, with its `maxConnections` and `http2`
+        """
+        limits = httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections or 20)
+        return httpx.AsyncClient(
+            headers=self.headers,
+            timeout=httpx.Timeout(HTTP_TIMEOUT, read=SSE_READ_TIMEOUT),
+            limits=limits,
+            http2=self.http2
+        )
+
+    def acquire_http_client(self) -> httpx.AsyncClient:
+        key = (asyncio.get_running_loop(), self.name, self.url)
+        entry = self.shared_clients.get(key)
+        if entry is None:
+            entry = self.shared_clients[key] = [self.http_client(), 0]
+        entry[1] += 1
+        return entry[0]
+
+    async def release_http_client(self) -> None:
+        key = (asyncio.get_running_loop(), self.name, self.url)
+        entry = self.shared_clients.get(key)
+        self.http = None
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] <= 0:
+            del self.shared_clients[key]
+            await entry[0].aclose()
+
+    @asynccontextmanager
+    async def borrow_http_client(self, headers=None, timeout=None, auth=None):
+        """
+        `httpx_client_factory` for the SDK transports, which close the client they are given
+        """
+        yield self.http
+
+    async def initialize(self) -> None:
+        self.http = self.acquire_http_client()
+        # registered first, so it runs after the session and the transport are closed
+        self.exit_stack.push_async_callback(self.release_http_client)
+        if self.transport == "sse":
+            read, write = await self.exit_stack.enter_async_context(sse_client(
+                self.url, headers=self.headers, timeout=HTTP_TIMEOUT, sse_read_timeout=SSE_READ_TIMEOUT,
+                httpx_client_factory=self.borrow_http_client
+            ))
+        elif streamable_http_client:
+            read, write, _ = await self.exit_stack.enter_async_context(
+                streamable_http_client(self.url, http_client=self.http)
+            )
+        else:
+            read, write, _ = await self.exit_stack.enter_async_context(streamablehttp_client(
+                self.url, headers=self.headers, timeout=HTTP_TIMEOUT, sse_read_timeout=SSE_READ_TIMEOUT,
+                httpx_client_factory=self.borrow_http_client
+            ))
+        self.session = await self.exit_stack.enter_async_context(ClientSession(read, write))
+        await self.session.initialize()
+
+    async def list_tools(self) -> List[ToolDefinition]:
+        if self.session is None:
+            raise RuntimeError(f"Server {self.name} not initialized")
+        tools, cursor = [], None
+        while True:
+            result = await self.session.list_tools(cursor)
+            tools.extend(ToolDefinition(tool.name, tool.description, tool.inputSchema) for tool in result.tools)
+            cursor = result.nextCursor
+            if not cursor:
+                return tools
+
+    async def execute_tool(self, tool_name: str, arguments: dict) -> types.CallToolResult:
+        """
+        Call a tool once
+
+        Returns:
+            The tool result, with `content` and `isError`
+        """
+        if self.session is None:
+            raise RuntimeError(f"Server {self.name} not initialized")
+        return await self.session.call_tool(tool_name, arguments)
+
+    async def cleanup(self) -> None:
+        try:
+            await self.exit_stack.aclose()
+        finally:
+            self.session = None
+            self.exit_stack = AsyncExitStack()
@@ -0,0 +1,370 @@
+import asyncio
+import os
+import signal
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from .HTTPMCPClient import HTTPMCPClient
+from .MCPClient import MCPClient
+from ..utils.tracing import tracer
+
+# environment variable tagging the processes of a stdio session, so a wedged session can be killed
+SESSION_ENV = "MCP_TESTKIT_SESSION"
+
+
+def create_client(name: str, srv_config: dict):
+    """
+    Client for a `mcpServers` entry, over HTTP or SSE when it has a `url`, over stdio otherwise
+    """
+    if srv_config.get("url"):
+        return HTTPMCPClient(name, srv_config)
+    return MCPClient(name, srv_config)
+
+
+def timeout_options(config: dict, name: str) -> dict:
+    """
+    Timeout settings of a server for MCPClientPool
+
+    `callTimeout`, `suiteTimeout` and `maxRestarts` of the server's `mcpServers`
+    entry take precedence over the top-level ones.
+    """
+    srv_config = config["mcpServers"][name]
+
+    def option(key: str, default=None):
+        return srv_config.get(key, config.get(key, default))
+
+    return {
+        "call_timeout": option("callTimeout", 60),
+        "deadline": option("suiteTimeout"),
+        "max_restarts": option("maxRestarts", 3)
+    }
+
+
+def kill_session_processes(token: str) -> int:
+    """
+    SIGKILL every process whose environment carries the session token
+
+    Children of the server inherit the token, so npx or uvx wrappers go too.
+    Needs /proc, elsewhere nothing is killed.
+
+    Returns:
+        Number of processes killed
+    """
+    marker = f"{SESSION_ENV}={token}".encode()
+    try:
+        pids = [int(name) for name in os.listdir("/proc") if name.isdigit()]
+    except OSError:
+        return 0
+    killed = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/environ", "rb") as file:
+                if marker not in file.read().split(b"\0"):
+                    continue
+            os.kill(pid, signal.SIGKILL)
+            killed += 1
+        except OSError:
+            # gone in the meantime, or not ours to read
+            continue
+    return killed
+
+
+class ToolCallTimeout(TimeoutError):
+    """
+    A case did not finish within the call timeout or the server deadline
+    """
+
+    def __init__(self, server: str, case: dict, timeout: Optional[float], deadline: bool = False):
+        self.server = server
+        self.case_id = case.get("id")
+        self.tool = case.get("toolName")
+        self.timeout = timeout
+        self.deadline = deadline
+        if deadline:
+            message = f"Server {server} deadline passed before tool {self.tool} finished"
+        else:
+            message = f"Tool {self.tool} of server {server} timed out after {timeout}s"
+        super().__init__(message)
+
+
+class MCPClientPool:
+    """
+    Pool of independently started sessions to the same MCP server
+
+    Each session lives in a task of its own, from initialize to cleanup, and
+    takes cases from a shared work queue whenever it is idle. Cases marked
+    `"parallelSafe": false` run afterwards one at a time, with no other case in
+    flight, since they may depend on or change shared server state.
+
+    A case running past `call_timeout`, or past the server's `deadline`, fails
+    with ToolCallTimeout. The server may still be stuck on it, so the session
+    kills its server and starts a fresh one before taking the next case. Once
+    the deadline has passed, the cases left fail right away. Stdio servers
+    are started with a SESSION_ENV token, and when a session's cleanup hangs
+    past `kill_timeout`, its processes are killed by that token.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        srv_config: dict,
+        size: int = 1,
+        client_factory: Callable = create_client,
+        call_timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+        max_restarts: int = 3,
+        kill_timeout: float = 10
+    ):
+        """
+        Args:
+            name: Name of the MCP server
+            srv_config: Server entry from `mcpServers`
+            size: Number of sessions, each one a separate server process for stdio servers
+                and a separate MCP session on a shared connection pool for HTTP servers
+            client_factory: Builds a client from (name, srv_config)
+            call_timeout: Seconds allowed for starting a session or running one case, None for no limit
+            deadline: Seconds from start allowed for all cases of the server, None for no limit
+            max_restarts: Restarts of a session after timeouts before it is given up
+            kill_timeout: Seconds allowed for a session's cleanup before its server processes are killed
+        """
+        self.name = name
+        self.srv_config = srv_config
+        self.size = max(1, size)
+        self.client_factory = client_factory
+        self.call_timeout = call_timeout
+        self.deadline = deadline
+        self.max_restarts = max_restarts
+        self.kill_timeout = kill_timeout
+        self.sessions = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self._deadline_at: Optional[float] = None
+        self._started = False
+        self._jobs: asyncio.Queue = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        # SESSION_ENV token of each running stdio client, keyed by id(client)
+        self._tokens: Dict[int, str] = {}
+
+    @classmethod
+    def from_config(
+        cls,
+        name: str,
+        config: dict,
+        size: int = 1,
+        client_factory: Callable = create_client
+    ) -> "MCPClientPool":
+        """
+        Build the pool of a server with the timeouts of the MCP config
+
+        See `timeout_options` for the keys read.
+        """
+        return cls(name, config["mcpServers"][name], size, client_factory, **timeout_options(config, name))
+
+    async def start(self):
+        """
+        Start every session concurrently, sessions failing to start are left out of the pool
+        """
+        loop = asyncio.get_running_loop()
+        if self.deadline:
+            self._deadline_at = loop.time() + self.deadline
+        ready = [loop.create_future() for _ in range(self.size)]
+        self._tasks = [asyncio.create_task(self._session(future)) for future in ready]
+        results = await asyncio.gather(*ready, return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                print(f"[{self.name}] Failed to start a session: {result or type(result).__name__}")
+        self.sessions = sum(1 for result in results if not isinstance(result, BaseException))
+        self._started = True
+        if not self.sessions:
+            await self.cleanup()
+            raise RuntimeError(f"No session of MCP server {self.name} could be started")
+        print(f"[{self.name}] Started {self.sessions} of {self.size} sessions")
+
+    async def _start_client(self):
+        srv_config, token = self.srv_config, None
+        if not srv_config.get("url"):
+            token = uuid.uuid4().hex
+            srv_config = dict(srv_config, env={**(srv_config.get("env") or {}), SESSION_ENV: token})
+        client = self.client_factory(self.name, srv_config)
+        if token:
+            self._tokens[id(client)] = token
+        try:
+            with tracer.span("server.initialize", server=self.name):
+                async with asyncio.timeout(self.call_timeout):
+                    await client.initialize()
+        except BaseException:
+            await self._stop_client(client)
+            raise
+        return client
+
+    async def _stop_client(self, client):
+        token = self._tokens.pop(id(client), None)
+        try:
+            # cleanup of a wedged server can hang as well, it is cancelled after kill_timeout
+            async with asyncio.timeout(self.kill_timeout):
+                await client.cleanup()
+        except TimeoutError:
+            killed = kill_session_processes(token) if token else 0
+            if killed:
+                print(f"[{self.name}] Session did not stop within {self.kill_timeout}s, killed {killed} server processes")
+            else:
+                print(f"[{self.name}] Session did not stop within {self.kill_timeout}s, abandoning it")
+        except Exception as error:
+            print(f"[{self.name}] Error cleaning up session: {error}")
+
+    def _remaining(self) -> Optional[float]:
+        if self._deadline_at is None:
+            return None
+        return self._deadline_at - asyncio.get_running_loop().time()
+
+    async def _session(self, ready: asyncio.Future):
+        client = None
+        restarts = 0
+        lost = False
+        try:
+            try:
+                client = await self._start_client()
+            except Exception as error:
+                ready.set_exception(error)
+                return
+            ready.set_result(True)
+
+            while True:
+                job = await self._jobs.get()
+                if job is None:
+                    return
+                case, handler, future = job
+                if future.cancelled():
+                    continue
+                remaining = self._remaining()
+                if remaining is not None and remaining <= 0:
+                    self.timeouts += 1
+                    future.set_exception(ToolCallTimeout(self.name, case, self.deadline, deadline=True))
+                    continue
+
+                limits = [limit for limit in (self.call_timeout, remaining) if limit is not None]
+                timer = asyncio.timeout(min(limits) if limits else None)
+                try:
+                    with tracer.span("case.run", server=self.name, tool=case.get("toolName")):
+                        async with timer:
+                            result = await handler(client, case)
+                    future.set_result(result)
+                    continue
+                except TimeoutError as error:
+                    if not timer.expired():
+                        future.set_exception(error)
+                        continue
+                except Exception as error:
+                    future.set_exception(error)
+                    continue
+
+                self.timeouts += 1
+                past_deadline = remaining is not None and (self.call_timeout is None or remaining < self.call_timeout)
+                future.set_exception(ToolCallTimeout(self.name, case, self.call_timeout, deadline=past_deadline))
+                # the server may still be busy with the call or wedged, so it is replaced
+                await self._stop_client(client)
+                client = None
+                if past_deadline:
+                    continue
+                if restarts >= self.max_restarts:
+                    print(f"[{self.name}] Giving up a session after {restarts} restarts")
+                    lost = True
+                    return
+                restarts += 1
+                self.restarts += 1
+                print(f"[{self.name}] Restarting a session after a timeout of case {case.get('id')}")
+                try:
+                    client = await self._start_client()
+                except Exception as error:
+                    print(f"[{self.name}] Failed to restart a session: {error or type(error).__name__}")
+                    lost = True
+                    return
+        finally:
+            if client is not None:
+                await self._stop_client(client)
+            if lost:
+                self._session_lost()
+
+    def _session_lost(self):
+        self.sessions -= 1
+        if self.sessions > 0:
+            return
+        # no session is left to take the queued cases
+        while not self._jobs.empty():
+            job = self._jobs.get_nowait()
+            if job and not job[2].done():
+                job[2].set_exception(RuntimeError(f"No session of MCP server {self.name} is left"))
+
+    def submit(self, case: dict, handler: Callable[[MCPClient, dict], Awaitable[Any]]) -> asyncio.Future:
+        """
+        Queue one case for the next idle session
+        """
+        future = asyncio.get_running_loop().create_future()
+        if self._started and not self.sessions:
+            future.set_exception(RuntimeError(f"No session of MCP server {self.name} is left"))
+            return future
+        self._jobs.put_nowait((case, handler, future))
+        return future
+
+    async def run(
+        self,
+        cases: List[dict],
+        handler: Callable[[MCPClient, dict], Awaitable[Any]]
+    ) -> List[Optional[Any]]:
+        """
+        Run a handler for every case on the pool's sessions
+
+        Args:
+            cases: Test cases to run
+            handler: Coroutine function executing one case on the given session
+
+        Returns:
+            Handler results in the order of `cases`, None where the handler raised,
+            the ToolCallTimeout where the case timed out
+        """
+        results: List[Optional[Any]] = [None] * len(cases)
+        parallel = [index for index, case in enumerate(cases) if case.get("parallelSafe", True)]
+        serial = [index for index, case in enumerate(cases) if not case.get("parallelSafe", True)]
+
+        def collect(index: int, result):
+            if isinstance(result, ToolCallTimeout):
+                if not result.deadline:
+                    print(f"[{self.name}] Case {cases[index].get('id')} timed out: {result}")
+                results[index] = result
+            elif isinstance(result, BaseException):
+                print(f"[{self.name}] Error running case {cases[index].get('id')}: {result}")
+            else:
+                results[index] = result
+
+        outcomes = await asyncio.gather(
+            *(self.submit(cases[index], handler) for index in parallel),
+            return_exceptions=True
+        )
+        for index, result in zip(parallel, outcomes):
+            collect(index, result)
+
+        for index in serial:
+            outcome = (await asyncio.gather(self.submit(cases[index], handler), return_exceptions=True))[0]
+            collect(index, outcome)
+
+        missed = sum(1 for result in results if isinstance(result, ToolCallTimeout) and result.deadline)
+        if missed:
+            print(f"[{self.name}] {missed} cases did not finish before the server deadline of {self.deadline}s")
+        return results
+
+    async def cleanup(self):
+        """
+        Stop every session once its current case is done
+        """
+        for _ in self._tasks:
+            self._jobs.put_nowait(None)
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.sessions = 0
+        self._started = False
+
+    async def __aenter__(self) -> "MCPClientPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.cleanup()
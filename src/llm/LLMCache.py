@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Iterator, List, Optional
+
+CACHE_MODES = ("readwrite", "readonly", "off")
+SAMPLING_PARAMS = ("temperature", "top_p", "max_tokens", "seed")
+# seconds between two eviction scans of the cache directory
+EVICT_INTERVAL = 60
+
+
+class CachedLLMClient:
+    """
+    Wrapper around an LLM client that serves repeated prompts from an on-disk cache
+
+    Entries are keyed by a hash of the model name, the prompt messages and the
+    sampling params, so any change to a prompt or to the model is a cache miss.
+    Every entry is written to a temporary file and moved into place with
+    os.replace, which lets several processes share one cache directory.
+    """
+
+    def __init__(
+        self,
+        llm,
+        cache_dir: str = os.path.join(".cache", "llm"),
+        max_size_mb: float = 512,
+        max_age_days: float = 30,
+        mode: str = "readwrite"
+    ):
+        """
+        Args:
+            llm: Client providing get_response(messages)
+            cache_dir: Directory holding the cache entries
+            max_size_mb: Least recently used entries are evicted above this size
+            max_age_days: Entries older than this are treated as misses and evicted
+            mode: "readwrite", "readonly" (never write) or "off" (bypass the cache)
+        """
+        if mode not in CACHE_MODES:
+            raise ValueError(f"LLM cache mode should be one of {CACHE_MODES}, got {mode}")
+        self.llm = llm
+        self.cache_dir = cache_dir
+        self.max_size = max_size_mb * 1024 * 1024
+        self.max_age = max_age_days * 24 * 3600
+        self.mode = mode
+        self.hits = 0
+        self.misses = 0
+        self._evict_lock = threading.Lock()
+        self._last_evict = 0.0
+
+    @classmethod
+    def from_config(cls, llm, cache_config: Optional[dict] = None) -> "CachedLLMClient":
+        """
+        Build the cache from the `llmCache` section of the MCP config
+
+        The LLM_CACHE environment variable overrides the configured mode.
+        """
+        cache_config = cache_config or {}
+        return cls(
+            llm,
+            cache_dir=cache_config.get("path", os.path.join(".cache", "llm")),
+            max_size_mb=cache_config.get("maxSizeMB", 512),
+            max_age_days=cache_config.get("maxAgeDays", 30),
+            mode=os.getenv("LLM_CACHE") or cache_config.get("mode", "readwrite")
+        )
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+    def get_response(self, messages: List[dict]) -> str:
+        cached = self.cached(messages)
+        return cached if cached is not None else self.fetch(messages)
+
+    def cached(self, messages: List[dict]) -> Optional[str]:
+        """
+        The cached response to a prompt without calling the LLM, None on a miss or with the cache off
+        """
+        if self.mode == "off":
+            return None
+        cached = self._read(self.cache_key(messages))
+        if cached is not None:
+            self.hits += 1
+        return cached
+
+    def fetch(self, messages: List[dict]) -> str:
+        """
+        Call the LLM without looking the prompt up, and cache the response
+
+        For callers that already missed with `cached`, so the disk is read once per call.
+        """
+        if self.mode != "off":
+            self.misses += 1
+        response = self.llm.get_response(messages)
+        if response and self.mode == "readwrite":
+            self._write(self.cache_key(messages), response)
+        return response
+
+    def stream_response(self, messages: List[dict]) -> Iterator[str]:
+        """
+        Stream the response chunk by chunk, cached responses come back as a single chunk
+        """
+        cached = self.cached(messages)
+        if cached is not None:
+            yield cached
+            return
+        yield from self.fetch_stream(messages)
+
+    def fetch_stream(self, messages: List[dict]) -> Iterator[str]:
+        """
+        Stream the response without looking the prompt up, and cache it once complete
+
+        Clients without a stream_response of their own are called through get_response.
+        """
+        if self.mode != "off":
+            self.misses += 1
+        stream = getattr(self.llm, "stream_response", None)
+        chunks = []
+        for chunk in (stream(messages) if stream else [self.llm.get_response(messages)]):
+            if chunk:
+                chunks.append(chunk)
+                yield chunk
+
+        response = "".join(chunks)
+        if response and self.mode == "readwrite":
+            self._write(self.cache_key(messages), response)
+
+    def cache_key(self, messages: List[dict]) -> str:
+        params = {name: getattr(self.llm, name) for name in SAMPLING_PARAMS if hasattr(self.llm, name)}
+        payload = {
+            "model": getattr(self.llm, "model", None) or os.getenv("LLM_MODEL"),
+            "messages": messages,
+            "params": params
+        }
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _read(self, key: str) -> Optional[str]:
+        path = self._entry_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            # missing, or removed by another process's eviction in the meantime
+            return None
+
+        if time.time() - entry.get("created", 0) > self.max_age:
+            if self.mode == "readwrite":
+                self._remove(path)
+            return None
+
+        if self.mode == "readwrite":
+            # mtime records the last use and drives LRU eviction
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return entry.get("response")
+
+    def _write(self, key: str, response: str):
+        path = self._entry_path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump({"created": time.time(), "response": response}, file, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as err:
+            print(f"Failed to write LLM cache entry {key}: {err}")
+            return
+        if time.time() - self._last_evict > EVICT_INTERVAL:
+            self.evict()
+
+    def evict(self):
+        """
+        Remove expired entries, then the least recently used ones until the cache fits in max_size
+        """
+        if not self._evict_lock.acquire(blocking=False):
+            return
+        try:
+            now = time.time()
+            self._last_evict = now
+            entries = []
+            total_size = 0
+            for root, _, files in os.walk(self.cache_dir):
+                for name in files:
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    if now - stat.st_mtime > self.max_age:
+                        self._remove(path)
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+                    total_size += stat.st_size
+
+            if total_size <= self.max_size:
+                return
+            for _, size, path in sorted(entries):
+                self._remove(path)
+                total_size -= size
+                if total_size <= self.max_size:
+                    break
+        finally:
+            self._evict_lock.release()
+
+    @staticmethod
+    def _remove(path: str):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,212 @@
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from ..utils.token_count import estimate_message_tokens, estimate_tokens
+
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504, 529}
+RETRYABLE_NAMES = ("ratelimit", "timeout", "apiconnection", "serviceunavailable", "overloaded", "internalserver")
+RETRYABLE_TEXT = ("429", "rate limit", "rate_limit", "too many requests", "timed out", "timeout", "overloaded",
+                  "temporarily unavailable", "connection reset", "502", "503", "504")
+
+
+class TokenBucket:
+    """
+    Allows `per_minute` units per minute, with bursts of up to a minute's worth
+
+    The level may go negative when usage is only known afterwards, such as
+    completion tokens; later acquisitions then wait until it is paid back.
+    """
+
+    def __init__(self, per_minute: float):
+        self.rate = per_minute / 60
+        self.capacity = per_minute
+        self.level = per_minute
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float):
+        # a request larger than the bucket waits for a full bucket instead of forever
+        amount = min(amount, self.capacity)
+        # the lock keeps waiters in arrival order
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.level >= amount:
+                    self.level -= amount
+                    return
+                await asyncio.sleep((amount - self.level) / self.rate)
+
+    def debit(self, amount: float):
+        self._refill()
+        self.level -= amount
+
+
+class LLMScheduler:
+    """
+    Single gate in front of the LLM client for every concurrent caller
+
+    Responses the client has cached are returned without taking any budget,
+    and a miss goes to the client's `fetch`, which skips a second lookup.
+    Calls wait for a concurrency slot and for room in the requests-per-minute
+    and tokens-per-minute buckets. Prompt tokens are reserved up front, and
+    completion tokens are charged once the response is known. Retryable
+    errors (rate limits, timeouts, 5xx) are retried with exponential backoff
+    and full jitter, honouring Retry-After when the error carries one. A
+    rate limit also pauses every other caller for the same delay, so a burst
+    does not keep hitting the provider.
+    """
+
+    def __init__(
+        self,
+        llm,
+        max_concurrency: int = 4,
+        requests_per_minute: float = 0,
+        tokens_per_minute: float = 0,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0
+    ):
+        """
+        Args:
+            llm: Client providing get_response(messages) and optionally stream_response(messages)
+            max_concurrency: Number of calls in flight
+            requests_per_minute: Request limit of the provider, 0 for none
+            tokens_per_minute: Prompt plus completion token limit of the provider, 0 for none
+            max_retries: Retries of a call after a retryable error
+            base_delay: Backoff ceiling in seconds of the first retry, doubled on every retry
+            max_delay: Upper bound of the backoff ceiling
+        """
+        self.llm = llm
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.paused_until = 0.0
+        self.calls = 0
+        self.retries = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    @classmethod
+    def from_config(cls, llm, max_concurrency: int = 4, rate_config: Optional[dict] = None) -> "LLMScheduler":
+        """
+        Build the scheduler from the `rateLimits` section of the MCP config
+        """
+        rate_config = rate_config or {}
+        return cls(
+            llm,
+            max_concurrency=max_concurrency,
+            requests_per_minute=rate_config.get("requestsPerMinute", 0),
+            tokens_per_minute=rate_config.get("tokensPerMinute", 0),
+            max_retries=rate_config.get("maxRetries", 5),
+            base_delay=rate_config.get("baseDelay", 1.0),
+            max_delay=rate_config.get("maxDelay", 60.0)
+        )
+
+    @asynccontextmanager
+    async def slot(self, messages: List[dict]):
+        """
+        Hold a concurrency slot and rate limit room for one call
+
+        Yields a usage dict; set its `completion_tokens` before leaving so they are charged.
+        """
+        prompt_tokens = estimate_message_tokens(messages)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": 0}
+        async with self.semaphore:
+            pause = self.paused_until - time.monotonic()
+            if pause > 0:
+                await asyncio.sleep(pause)
+            if self.requests:
+                await self.requests.acquire(1)
+            if self.tokens:
+                await self.tokens.acquire(prompt_tokens)
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            try:
+                yield usage
+            finally:
+                self.completion_tokens += usage["completion_tokens"]
+                if self.tokens:
+                    self.tokens.debit(usage["completion_tokens"])
+
+    async def cached(self, messages: List[dict]) -> Optional[str]:
+        lookup = getattr(self.llm, "cached", None)
+        return await asyncio.to_thread(lookup, messages) if callable(lookup) else None
+
+    async def get_response(self, messages: List[dict]) -> str:
+        """
+        Call the LLM in a worker thread, retrying retryable errors
+        """
+        cached = await self.cached(messages)
+        if cached is not None:
+            return cached
+
+        # the lookup is done, a caching client calls the LLM straight away
+        call = getattr(self.llm, "fetch", self.llm.get_response)
+        attempt = 0
+        while True:
+            try:
+                async with self.slot(messages) as usage:
+                    response = await asyncio.to_thread(call, messages)
+                    usage["completion_tokens"] = estimate_tokens(response or "")
+                    return response
+            except Exception as error:
+                if attempt >= self.max_retries or not self.is_retryable(error):
+                    raise
+                delay = self.backoff(attempt, error)
+                attempt += 1
+                self.retries += 1
+                print(f"LLM call failed ({error}), retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+    def backoff(self, attempt: int, error: Exception) -> float:
+        retry_after = self.retry_after(error)
+        if retry_after is not None:
+            delay = min(self.max_delay, retry_after)
+        else:
+            # full jitter spreads out the callers that failed together
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if self.status_code(error) == 429 or "rate" in type(error).__name__.lower():
+            self.paused_until = max(self.paused_until, time.monotonic() + delay)
+        return delay
+
+    @staticmethod
+    def status_code(error: Exception) -> Optional[int]:
+        for holder in (error, getattr(error, "response", None)):
+            for attribute in ("status_code", "status", "http_status"):
+                value = getattr(holder, attribute, None)
+                if isinstance(value, int):
+                    return value
+        return None
+
+    @staticmethod
+    def retry_after(error: Exception) -> Optional[float]:
+        headers = getattr(getattr(error, "response", None), "headers", None)
+        if not headers:
+            return None
+        try:
+            value = headers.get("retry-after") or headers.get("Retry-After")
+            return float(value) if value is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    def is_retryable(self, error: Exception) -> bool:
+        status = self.status_code(error)
+        if status is not None:
+            return status in RETRYABLE_STATUS
+        if isinstance(error, (TimeoutError, ConnectionError)):
+            return True
+        name = type(error).__name__.lower()
+        if any(part in name for part in RETRYABLE_NAMES):
+            return True
+        message = str(error).lower()
+        return any(text in message for text in RETRYABLE_TEXT)
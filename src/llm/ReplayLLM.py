@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from typing import Callable, Dict, List, Optional
+
+# test case ids are uuid4s that change on every run
+UUID_PATTERN = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+
+class ReplayLLMClient:
+    """
+    Record/replay LLM backend for offline runs
+
+    In record mode every call goes to the wrapped client and the response is
+    appended to a JSONL recording; in replay mode responses come from the
+    recording only. Test case ids are masked in the lookup key, and the ids in
+    a replayed response are mapped by position to the ids of the new prompt.
+    Prompts missing from the recording are answered by `fallback` if given.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        mode: str = "replay",
+        llm=None,
+        fallback: Optional[Callable[[List[dict]], str]] = None
+    ):
+        """
+        Args:
+            path: JSONL recording, None to keep nothing
+            mode: "record" or "replay"
+            llm: Client providing get_response(messages), required to record
+            fallback: Answers prompts missing from the recording, KeyError is raised without it
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown replay mode: {mode}")
+        if mode == "record" and llm is None:
+            raise ValueError("Recording needs an LLM client")
+        self.path = path
+        self.mode = mode
+        self.llm = llm
+        self.fallback = fallback
+        self.recording: Dict[str, dict] = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if path and os.path.isfile(path):
+            self._load()
+
+    def _load(self):
+        with open(self.path, 'r', encoding='utf-8') as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                    self.recording[entry["key"]] = entry
+                except (ValueError, KeyError, TypeError):
+                    # a torn last line of an interrupted recording
+                    continue
+
+    @staticmethod
+    def key(messages: List[dict]) -> str:
+        masked = UUID_PATTERN.sub("<id>", json.dumps(messages, sort_keys=True, ensure_ascii=False))
+        return hashlib.sha256(masked.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def prompt_ids(messages: List[dict]) -> List[str]:
+        ids = []
+        for message in messages:
+            for found in UUID_PATTERN.findall(str(message.get("content", ""))):
+                if found not in ids:
+                    ids.append(found)
+        return ids
+
+    def get_response(self, messages: List[dict]) -> str:
+        key = self.key(messages)
+        if self.mode == "record":
+            response = self.llm.get_response(messages)
+            self._record(key, messages, response)
+            return response
+
+        entry = self.recording.get(key)
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            if self.fallback is None:
+                raise KeyError("Prompt is missing from the LLM recording")
+            return self.fallback(messages)
+
+        with self._lock:
+            self.hits += 1
+        response = entry["response"]
+        for recorded, current in zip(entry["ids"], self.prompt_ids(messages)):
+            response = response.replace(recorded, current)
+        return response
+
+    def stream_response(self, messages: List[dict]):
+        yield self.get_response(messages)
+
+    def _record(self, key: str, messages: List[dict], response: str):
+        entry = {"key": key, "ids": self.prompt_ids(messages), "response": response}
+        with self._lock:
+            self.recording[key] = entry
+            if self.path:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.path, 'a', encoding='utf-8') as file:
+                    file.write(json.dumps(entry, ensure_ascii=False) + "\n")
@@ -8,4 +8,20 @@ Parameters to include:
 
 Craft a single, fluent sentence that naturally incorporates these parameter values as if you're asking for help with this specific task. Make it sound like a real user request rather than a technical specification.
 
-Natural language request:"""
\ No newline at end of file
+Natural language request:"""
+
+eval_prompt_batch = """Create natural, conversational requests for an AI assistant to perform each of the following test scenarios:
+
+Tool: {tool.name} - {tool.description}
+
+Test scenarios (each with its id, purpose and parameters to include):
+{test_cases}
+
+For each scenario, craft a single, fluent sentence that naturally incorporates its parameter values as if you're asking for help with this specific task. Make it sound like a real user request rather than a technical specification.
+
+Return a JSON object that maps every scenario id to its natural language request:
+```json
+{{
+  "<scenario id>": "Natural language request"
+}}
+```"""
@@ -1,3 +1,11 @@
+# categories asked for in tool_prompt's {case_mix}
+tool_case_mix = """    - Happy Path (80%): Normal, expected usage scenarios with valid inputs
+    - Error Cases (20%): Invalid or edge case inputs that should trigger proper error handling """
+
+# used when missing, mistyped and out-of-range parameters are already covered by schema cases
+tool_case_mix_happy_path = """    - Happy Path (100%): Normal, expected usage scenarios with valid and meaningful inputs
+    - Do not generate cases for missing required parameters, wrong parameter types, values outside an enum or out-of-range values; these are generated separately"""
+
 tool_prompt = """
 You are an expert in generating comprehensive test cases for tools accessed through MCP (Model Context Protocol) servers on Linux operating systems. Your task is to create diverse, realistic test cases that thoroughly validate tool functionality.
 ## Tool Definition
@@ -9,8 +17,7 @@ Tool Source Code: {tool_function_str}
 
 ## Instructions
 1. Generate {tests_per_tool} diverse test cases covering these categories:
-    - Happy Path (80%): Normal, expected usage scenarios with valid inputs
-    - Error Cases (20%): Invalid or edge case inputs that should trigger proper error handling 
+{case_mix}
 
 2. For each test case, provide these fields:
     - `description`: A concise explanation of the scenario and its test intent.
@@ -44,3 +44,74 @@ Answer "yes" if the final output meets the test case's expectations; answer "no"
 ```
 """
 
+
+
+val_prompt_tool_batch = """You are an expert evaluator responsible for assessing whether MCP tools executed correctly for given queries. For each item below, the validation rule serves as the expected criterion to validate the tool's output.
+
+**Items:**
+{items}
+
+For every item, did the tool execute correctly and produce output that meets the expectations defined by its validation rule? Answer "yes" or "no" and provide a brief explanation.
+
+Output format, one entry per item id:
+```json
+[
+  {{
+    "id": "item id",
+    "answer": "yes" | "no",
+    "explanation": "Explanation of the result"
+  }}
+]
+```"""
+
+
+val_prompt_eval_batch = """You are an expert evaluator specializing in assessing test cases for tools accessed via MCP (Model Context Protocol) servers on Linux operating systems. Your core responsibility is to verify whether the final output of each chat session (which executes MCP tools) aligns with the expected output of the corresponding test case.
+
+### 1. Test Case Category Definition
+Each item has an `expect_type`:
+- **success (Happy-path cases)**: These cases represent normal, expected usage scenarios with valid inputs— the chat session should execute tools without errors and return results that match expected behavior.
+- **error (Error cases)**: These cases involve invalid inputs or edge cases— the chat session should trigger proper error handling (e.g., return error prompts, avoid abnormal crashes) instead of normal results.
+
+### 2. Test Cases
+Each item has its id, the user query, the expect_type, the expected output and the chat session's final output:
+{items}
+
+### 3. Evaluation Task
+For every item, focus on two key points to evaluate:
+1. Whether the chat session's tool execution process matches the case type (e.g., happy-path cases should have no execution errors; error cases should trigger error handling).
+2. Whether the chat session's final output is consistent with the expected output (including result content for happy-path cases, or error prompt logic for error cases).
+
+Answer "yes" if the final output meets the test case's expectations; answer "no" otherwise. Provide a brief explanation to support each judgment.
+
+### 4. Output Format, one entry per item id
+```json
+[
+  {{
+    "id": "item id",
+    "answer": "yes" | "no",
+    "explanation": "Clear explanation of why the final output meets/does not meet expectations"
+  }}
+]
+```"""
+
+val_prompt_chat = """You are a helpful assistant with access to these tools:
+
+{tools_description}
+Choose the appropriate tool based on the user's question. If no tool is needed, reply directly.
+
+IMPORTANT: When you need to use a tool, you must ONLY respond with the exact JSON object format below, nothing else:
+{{
+    "tool": "tool-name",
+    "arguments": {{
+        "argument-name": "value"
+    }}
+}}
+
+After receiving a tool's response:
+1. Transform the raw data into a natural, conversational response
+2. Keep responses concise but informative
+3. Focus on the most relevant information
+4. Use appropriate context from the user's question
+5. Avoid simply repeating the raw data
+
+Please use only the tools that are explicitly defined above."""
@@ -0,0 +1,249 @@
+import html
+import json
+import os
+from collections import Counter
+from typing import Dict, List, Optional
+from ..utils.stats import LatencyHistogram
+from ..utils.suite_store import RULE_RESULT_KEYS, SHARD_SUFFIX, SUITE_TIMESTAMP, TIME_KEYS, TOOL_KEYS, iter_records
+
+REPORT_JSON = "report.json"
+REPORT_HTML = "report.html"
+
+
+class ToolStats:
+    """
+    Running aggregate of one tool's validation results
+    """
+
+    def __init__(self, max_reasons: int):
+        self.max_reasons = max_reasons
+        self.total = 0
+        self.passed = 0
+        self.timeouts = 0
+        self.times = LatencyHistogram()
+        self.reasons: Counter = Counter()
+
+    def add(self, passed: bool, execution_time: Optional[float], reasons: List[str], timed_out: bool = False):
+        self.total += 1
+        self.passed += passed
+        self.timeouts += timed_out
+        if execution_time is not None:
+            self.times.add(execution_time)
+        for reason in reasons:
+            reason = reason[:200]
+            if reason in self.reasons or len(self.reasons) < self.max_reasons:
+                self.reasons[reason] += 1
+            else:
+                self.reasons["(other reasons)"] += 1
+
+    def to_dict(self) -> dict:
+        return {
+            "total": self.total,
+            "passed": self.passed,
+            "failed": self.total - self.passed,
+            "pass_rate": self.passed / self.total if self.total else 0.0,
+            "timeouts": self.timeouts,
+            "execution_time": self.times.summary(),
+            "failure_reasons": dict(self.reasons.most_common())
+        }
+
+
+class Reporter:
+    """
+    Streams validation results into per-server and per-tool statistics
+
+    Results are read one record at a time, and each tool only keeps counters,
+    a latency histogram and its most frequent failure reasons, so memory does
+    not grow with the number of cases.
+    """
+
+    def __init__(self, max_reasons: int = 20):
+        self.max_reasons = max_reasons
+        self.stats: Dict[str, Dict[str, ToolStats]] = {}
+
+    def aggregate(self, valpath: str) -> "Reporter":
+        """
+        Add every record of a validation results file (JSON array or JSONL)
+        """
+        default_server = server_from_path(valpath)
+        for record in iter_records(valpath):
+            if isinstance(record, dict):
+                self.add(record, default_server)
+        return self
+
+    def add(self, record: dict, default_server: str = "unknown"):
+        server = record.get("server") or default_server
+        tool = next((record[key] for key in TOOL_KEYS if record.get(key)), "unknown")
+        execution_time = next((record[key] for key in TIME_KEYS if isinstance(record.get(key), (int, float))), None)
+
+        rule_results = next((record[key] for key in RULE_RESULT_KEYS if isinstance(record.get(key), list)), [])
+        failed_rules = [
+            result for result in rule_results
+            if isinstance(result, dict) and result.get("passed") is False
+        ]
+        if isinstance(record.get("passed"), bool):
+            passed = record["passed"]
+        else:
+            passed = bool(rule_results) and not failed_rules
+
+        reasons = []
+        if not passed:
+            reasons = [
+                str(result.get("reason") or result.get("message") or (result.get("rule") or {}).get("message") or "")
+                for result in failed_rules
+            ]
+            reasons = [reason for reason in reasons if reason] or [str(record.get("reason") or record.get("error") or "unknown")]
+
+        server_stats = self.stats.setdefault(server, {})
+        if tool not in server_stats:
+            server_stats[tool] = ToolStats(self.max_reasons)
+        server_stats[tool].add(passed, execution_time, reasons, record.get("timeout") is True)
+
+    def to_dict(self) -> dict:
+        servers = {}
+        for server, tools in sorted(self.stats.items()):
+            total = sum(stats.total for stats in tools.values())
+            passed = sum(stats.passed for stats in tools.values())
+            servers[server] = {
+                "total": total,
+                "passed": passed,
+                "pass_rate": passed / total if total else 0.0,
+                "tools": {tool: stats.to_dict() for tool, stats in sorted(tools.items())}
+            }
+        return {"servers": servers}
+
+
+def server_from_path(valpath: str) -> str:
+    """
+    Server name from a `<server>_<timestamp>` results folder, or a shard folder of one
+    """
+    folder = SHARD_SUFFIX.sub("", os.path.basename(os.path.dirname(os.path.abspath(valpath))))
+    name, _, timestamp = folder.rpartition("_")
+    return name if name and SUITE_TIMESTAMP.fullmatch(timestamp) else "unknown"
+
+
+def compare_reports(report: dict, previous: dict, threshold: float = 0.1) -> List[dict]:
+    """
+    Find tools that started failing, pass less often, or run slower than in a previous report
+
+    Args:
+        threshold: Tolerated pass rate drop (absolute) and p95 execution time increase (relative)
+    """
+    regressions = []
+    for server, server_report in report["servers"].items():
+        previous_tools = previous.get("servers", {}).get(server, {}).get("tools", {})
+        for tool, current in server_report["tools"].items():
+            before = previous_tools.get(tool)
+            if not before:
+                continue
+            if before["failed"] == 0 and current["failed"] > 0:
+                regressions.append({"server": server, "tool": tool, "kind": "started failing",
+                                    "before": before["pass_rate"], "after": current["pass_rate"]})
+            elif current["pass_rate"] < before["pass_rate"] - threshold:
+                regressions.append({"server": server, "tool": tool, "kind": "pass rate dropped",
+                                    "before": before["pass_rate"], "after": current["pass_rate"]})
+            p95_before = before["execution_time"]["p95"]
+            p95_after = current["execution_time"]["p95"]
+            if p95_before and p95_after > p95_before * (1 + threshold):
+                regressions.append({"server": server, "tool": tool, "kind": "slower",
+                                    "before": p95_before, "after": p95_after})
+    return regressions
+
+
+def print_report(report: dict):
+    for server, server_report in report["servers"].items():
+        print(f"\n{server}: {server_report['passed']}/{server_report['total']} passed ({server_report['pass_rate']:.1%})")
+        print(f"{'tool':<32}{'cases':>7}{'pass%':>8}{'p50 s':>9}{'p95 s':>9}{'p99 s':>9}  top failure reason")
+        for tool, stats in server_report["tools"].items():
+            times = stats["execution_time"]
+            reason = next(iter(stats["failure_reasons"]), "")
+            print(
+                f"{tool:<32}{stats['total']:>7}{stats['pass_rate'] * 100:>8.1f}"
+                f"{times['p50']:>9.2f}{times['p95']:>9.2f}{times['p99']:>9.2f}  {reason[:60]}"
+            )
+
+    for regression in report.get("regressions", []):
+        if regression["kind"] == "slower":
+            change = f"p95 {regression['before']:.2f}s -> {regression['after']:.2f}s"
+        else:
+            change = f"pass rate {regression['before']:.1%} -> {regression['after']:.1%}"
+        print(f"REGRESSION {regression['server']}/{regression['tool']}: {regression['kind']}, {change}")
+
+
+def render_html(report: dict) -> str:
+    rows = []
+    for server, server_report in report["servers"].items():
+        rows.append(
+            f"<h2>{html.escape(server)}: {server_report['passed']}/{server_report['total']} passed "
+            f"({server_report['pass_rate']:.1%})</h2>"
+        )
+        rows.append("<table><tr><th>Tool</th><th>Cases</th><th>Pass rate</th><th>p50 (s)</th>"
+                    "<th>p95 (s)</th><th>p99 (s)</th><th>Failure reasons</th></tr>")
+        for tool, stats in server_report["tools"].items():
+            times = stats["execution_time"]
+            reasons = "<br>".join(
+                f"{count} &times; {html.escape(reason)}" for reason, count in stats["failure_reasons"].items()
+            )
+            css = "fail" if stats["failed"] else "pass"
+            rows.append(
+                f"<tr class='{css}'><td>{html.escape(tool)}</td><td>{stats['total']}</td>"
+                f"<td>{stats['pass_rate']:.1%}</td><td>{times['p50']:.2f}</td><td>{times['p95']:.2f}</td>"
+                f"<td>{times['p99']:.2f}</td><td>{reasons}</td></tr>"
+            )
+        rows.append("</table>")
+
+    if report.get("regressions"):
+        rows.append("<h2>Regressions</h2><ul>")
+        for regression in report["regressions"]:
+            rows.append(
+                f"<li>{html.escape(regression['server'])}/{html.escape(regression['tool'])}: "
+                f"{regression['kind']} ({regression['before']:.3g} &rarr; {regression['after']:.3g})</li>"
+            )
+        rows.append("</ul>")
+
+    return (
+        "<!DOCTYPE html><html><head><meta charset='utf-8'><title>mcp-testkit report</title><style>"
+        "body{font-family:sans-serif}table{border-collapse:collapse}td,th{border:1px solid #ccc;padding:4px 8px}"
+        "tr.fail{background:#fdecea}tr.pass{background:#edf7ed}"
+        "</style></head><body><h1>mcp-testkit report</h1>" + "".join(rows) + "</body></html>"
+    )
+
+
+def load_report(path: str) -> dict:
+    """
+    Load a report.json, or aggregate validation results into a report
+    """
+    if os.path.basename(path) == REPORT_JSON:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    return Reporter().aggregate(path).to_dict()
+
+
+def run_report(valpath: str, prevpath: str = None, output_dir: str = None, threshold: float = 0.1) -> dict:
+    """
+    Aggregate a validation results file, compare it with a previous run and write the report
+
+    Args:
+        valpath: validation_results.json or its JSONL equivalent
+        prevpath: Previous run's validation results, or the report.json written for it
+        output_dir: Folder for report.json and report.html, by default the folder of valpath
+        threshold: Tolerance used to flag regressions
+    """
+    report = Reporter().aggregate(valpath).to_dict()
+
+    if prevpath:
+        previous = load_report(prevpath)
+        report["regressions"] = compare_reports(report, previous, threshold)
+
+    print_report(report)
+
+    output_dir = output_dir or os.path.dirname(os.path.abspath(valpath))
+    os.makedirs(output_dir, exist_ok=True)
+    json_path = os.path.join(output_dir, REPORT_JSON)
+    html_path = os.path.join(output_dir, REPORT_HTML)
+    with open(json_path, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=4)
+    with open(html_path, 'w', encoding='utf-8') as file:
+        file.write(render_html(report))
+    print(f"\nReport is saved into {json_path} and {html_path}")
+    return report
@@ -0,0 +1,193 @@
+import math
+import os
+from typing import Dict, List, Optional
+from ..reporter.Reporter import REPORT_JSON, load_report
+from ..type.types_def import ToolDefinition
+from ..utils.suite_store import VALIDATION_RESULTS_JSON, list_suite_folders
+
+
+class BudgetAllocator:
+    """
+    Splits a server's test case budget over its tools instead of a flat numTestsPerTool
+
+    Each tool is weighted by the complexity of its input schema (parameters,
+    nesting, enums and constraints) and by its failure rate in the server's
+    latest validation results. The server keeps numTestsPerTool cases per
+    tool on average, each tool getting between `min_tests` and `max_tests`.
+    With a token budget, the estimated generation cost of all servers is
+    kept within it. The budget is split over the servers by `reserve`
+    before they run concurrently, so a server's allocation does not depend
+    on which server lists its tools first.
+    """
+
+    def __init__(
+        self,
+        min_tests: int = 2,
+        max_tests: Optional[int] = None,
+        token_budget: int = 0,
+        tokens_per_case: int = 250,
+        prompt_tokens: int = 8000,
+        history: Optional[str] = None
+    ):
+        """
+        Args:
+            min_tests: Fewest cases of a tool
+            max_tests: Most cases of a tool, by default three times numTestsPerTool
+            token_budget: Estimated tokens all servers may spend on generation, 0 for no limit
+            tokens_per_case: Estimated completion and query tokens of one case
+            prompt_tokens: Estimated prompt tokens of one tool, at most promptTokenBudget
+            history: Validation results or report.json to take failure rates from,
+                by default the server's latest validation results under .logs
+        """
+        self.min_tests = min_tests
+        self.max_tests = max_tests
+        self.token_budget = token_budget
+        self.remaining_tokens = token_budget
+        # token budget of each reserved server, servers not reserved draw on remaining_tokens
+        self.reserved: Dict[str, int] = {}
+        self.tokens_per_case = tokens_per_case
+        self.prompt_tokens = prompt_tokens
+        self.history = history
+
+    @classmethod
+    def from_config(cls, budget_config: Optional[dict] = None, prompt_tokens: int = 8000) -> Optional["BudgetAllocator"]:
+        """
+        Build the allocator from the `testBudget` section of the MCP config, None if it is not enabled
+        """
+        if not budget_config or not budget_config.get("enabled", True):
+            return None
+        return cls(
+            min_tests=budget_config.get("minTestsPerTool", 2),
+            max_tests=budget_config.get("maxTestsPerTool"),
+            token_budget=budget_config.get("tokenBudget", 0),
+            tokens_per_case=budget_config.get("tokensPerCase", 250),
+            prompt_tokens=prompt_tokens,
+            history=budget_config.get("history")
+        )
+
+    @staticmethod
+    def schema_complexity(schema) -> float:
+        """
+        Rough count of the things a test could get wrong about a schema
+        """
+        if not isinstance(schema, dict):
+            return 0.0
+        score = 0.0
+        for prop in (schema.get("properties") or {}).values():
+            if not isinstance(prop, dict):
+                continue
+            score += 1
+            score += 0.5 * sum(1 for key in ("enum", "minimum", "maximum", "minLength", "maxLength", "pattern", "format")
+                               if key in prop)
+            score += BudgetAllocator.schema_complexity(prop)
+            score += BudgetAllocator.schema_complexity(prop.get("items"))
+            for option in prop.get("anyOf") or prop.get("oneOf") or []:
+                score += 0.5 + BudgetAllocator.schema_complexity(option)
+        score += 0.5 * len(schema.get("required") or [])
+        return score
+
+    def failure_rates(self, server_name: str) -> Dict[str, float]:
+        path = self.history
+        if not path:
+            for folder in reversed(list_suite_folders(server_name)):
+                for name in (REPORT_JSON, VALIDATION_RESULTS_JSON):
+                    if os.path.isfile(os.path.join(folder, name)):
+                        path = os.path.join(folder, name)
+                        break
+                if path:
+                    break
+        if not path:
+            return {}
+        try:
+            report = load_report(path)
+        except (OSError, ValueError) as error:
+            print(f"[{server_name}] Cannot read validation history {path}: {error}")
+            return {}
+        tools = report.get("servers", {}).get(server_name, {}).get("tools", {})
+        return {tool: 1 - stats["pass_rate"] for tool, stats in tools.items() if stats.get("total")}
+
+    def reserve(self, server_names: List[str]):
+        """
+        Split the remaining token budget evenly over the servers, in their config order
+        """
+        if not self.token_budget or not server_names:
+            return
+        share, extra = divmod(self.remaining_tokens, len(server_names))
+        for index, name in enumerate(server_names):
+            self.reserved[name] = share + (1 if index < extra else 0)
+        self.remaining_tokens = 0
+
+    def allocate(self, tools: List[ToolDefinition], tests_per_tool: int, server_name: str) -> Dict[str, int]:
+        """
+        Number of test cases to generate for each tool of a server
+
+        Returns:
+            Cases keyed by tool name
+        """
+        if not tools:
+            return {}
+        max_tests = self.max_tests or 3 * tests_per_tool
+        min_tests = min(self.min_tests, max_tests)
+        failures = self.failure_rates(server_name)
+        weights = [
+            (1 + math.log1p(self.schema_complexity(tool.input_schema))) * (1 + failures.get(tool.name, 0))
+            for tool in tools
+        ]
+
+        total = tests_per_tool * len(tools)
+        if self.token_budget:
+            remaining = self.reserved.get(server_name, self.remaining_tokens)
+            affordable = (remaining - self.prompt_tokens * len(tools)) // self.tokens_per_case
+            total = max(min_tests * len(tools), min(total, affordable))
+
+        counts = self._distribute(total, weights, min_tests, max_tests)
+        if self.token_budget:
+            spent = self.prompt_tokens * len(tools) + self.tokens_per_case * sum(counts)
+            if server_name in self.reserved:
+                self.reserved[server_name] -= spent
+            else:
+                self.remaining_tokens -= spent
+        allocation = {tool.name: count for tool, count in zip(tools, counts)}
+        print(f"[{server_name}] Allocated {sum(counts)} test cases over {len(tools)} tools "
+              f"({min(counts)} to {max(counts)} per tool)")
+        return allocation
+
+    @staticmethod
+    def _distribute(total: int, weights: List[float], low: int, high: int) -> List[int]:
+        """
+        Split `total` proportionally to `weights` within [low, high], by largest remainder
+        """
+        total = max(low * len(weights), min(total, high * len(weights)))
+        counts = [low] * len(weights)
+        fixed = [False] * len(weights)
+        # tools clamped at `high` give their share back to the others
+        while True:
+            free = [index for index in range(len(weights)) if not fixed[index]]
+            spare = total - sum(counts[index] for index in range(len(weights)) if fixed[index])
+            weight_sum = sum(weights[index] for index in free) or 1
+            shares = {index: spare * weights[index] / weight_sum for index in free}
+            over = [index for index in free if shares[index] > high]
+            if not over:
+                break
+            for index in over:
+                counts[index] = high
+                fixed[index] = True
+
+        for index in free:
+            counts[index] = max(low, math.floor(shares[index]))
+        leftover = total - sum(counts)
+        by_remainder = sorted(free, key=lambda index: shares[index] - math.floor(shares[index]), reverse=True)
+        for index in by_remainder:
+            if leftover <= 0:
+                break
+            if counts[index] < high:
+                counts[index] += 1
+                leftover -= 1
+        # raising small shares to `low` can overshoot, take it back from the largest counts, clamped ones included
+        while leftover < 0:
+            index = max(range(len(counts)), key=lambda index: counts[index])
+            if counts[index] <= low:
+                break
+            counts[index] -= 1
+            leftover += 1
+        return counts
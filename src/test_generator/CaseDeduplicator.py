@@ -0,0 +1,138 @@
+import hashlib
+import json
+import random
+import re
+from typing import Any, List, Optional, Tuple
+from ..type.types_def import TestCase
+
+DEDUP_REPORT = "dedup_report.json"
+# Mersenne prime for the (a * x + b) mod p hash family
+_PRIME = (1 << 61) - 1
+
+
+class CaseDeduplicator:
+    """
+    Drops near-duplicate test cases of a tool before they are saved
+
+    Two cases are duplicates when they expect the same status and either
+    have the same input up to key order and integral floats, or have inputs
+    that only differ in the case and whitespace of strings and descriptions
+    whose MinHash similarity reaches `threshold`. Inputs with different
+    strings are never merged, since "*.py" and "*.md" are different
+    arguments to a tool, however the cases are described.
+    Each cluster keeps the case with the most validation rules, the earliest
+    one on ties.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 64, shingle_size: int = 4):
+        """
+        Args:
+            threshold: Estimated Jaccard similarity of description shingles above which cases are merged
+            num_perm: Number of MinHash permutations
+            shingle_size: Characters per description shingle
+        """
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = random.Random(0)
+        self._permutations = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+    @classmethod
+    def from_config(cls, dedup_config: Optional[dict] = None) -> Optional["CaseDeduplicator"]:
+        """
+        Build the deduplicator from the `dedup` section of the MCP config, None if it is disabled
+        """
+        dedup_config = dedup_config or {}
+        if not dedup_config.get("enabled", True):
+            return None
+        return cls(threshold=dedup_config.get("threshold", 0.8))
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        return re.sub(r"\s+", " ", text.strip().casefold())
+
+    def canonical_input(self, value: Any, normalize_strings: bool = False) -> Any:
+        if isinstance(value, dict):
+            return {key: self.canonical_input(item, normalize_strings) for key, item in value.items()}
+        if isinstance(value, list):
+            return [self.canonical_input(item, normalize_strings) for item in value]
+        if isinstance(value, str):
+            return self.normalize_text(value) if normalize_strings else value
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+        return value
+
+    def input_key(self, test_case: TestCase, normalize_strings: bool = False) -> str:
+        canonical = json.dumps(
+            [test_case.expect.get("status"), self.canonical_input(test_case.input, normalize_strings)],
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+    def signature(self, text: str) -> List[int]:
+        text = self.normalize_text(text)
+        shingles = {text[i:i + self.shingle_size] for i in range(max(1, len(text) - self.shingle_size + 1))}
+        hashes = [int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), "big")
+                  for shingle in shingles]
+        return [min((a * value + b) % _PRIME for value in hashes) for a, b in self._permutations]
+
+    @staticmethod
+    def similarity(first: List[int], second: List[int]) -> float:
+        return sum(1 for x, y in zip(first, second) if x == y) / len(first)
+
+    def deduplicate(self, test_cases: List[TestCase]) -> Tuple[List[TestCase], List[dict]]:
+        """
+        Keep one representative per cluster of duplicate cases
+
+        Args:
+            test_cases: Cases of a single tool
+
+        Returns:
+            The kept cases in their original order, and one report entry per dropped case
+        """
+        clusters: List[List[Tuple[int, str]]] = []   # (case index, reason it joined)
+        by_input = {}
+        by_shape = {}
+        for index, test_case in enumerate(test_cases):
+            exact = self.input_key(test_case)
+            if exact in by_input:
+                clusters[by_input[exact]].append((index, "same input"))
+                continue
+
+            shape = self.input_key(test_case, normalize_strings=True)
+            signature = self.signature(test_case.description)
+            match = None
+            for cluster_index, other_signature in by_shape.get(shape, []):
+                score = self.similarity(signature, other_signature)
+                if score >= self.threshold:
+                    match = (cluster_index, f"similar description ({score:.2f})")
+                    break
+            if match:
+                clusters[match[0]].append((index, match[1]))
+                by_input[exact] = match[0]
+                continue
+
+            by_input[exact] = len(clusters)
+            by_shape.setdefault(shape, []).append((len(clusters), signature))
+            clusters.append([(index, "")])
+
+        kept, dropped = [], []
+        for cluster in clusters:
+            representative = max(
+                (index for index, _ in cluster),
+                key=lambda index: (len(test_cases[index].expect.get("validation_rules") or []), -index)
+            )
+            kept.append(representative)
+            for index, reason in cluster:
+                if index == representative:
+                    continue
+                dropped.append({
+                    "id": test_cases[index].id,
+                    "toolName": test_cases[index].toolName,
+                    "description": test_cases[index].description,
+                    "input": test_cases[index].input,
+                    "reason": reason or "duplicate of a later case with more validation rules",
+                    "keptId": test_cases[representative].id,
+                    "keptDescription": test_cases[representative].description
+                })
+        return [test_cases[index] for index in sorted(kept)], dropped
@@ -0,0 +1,228 @@
+import json
+import re
+import uuid
+from typing import Any, List, Optional, Tuple
+from ..type.types_def import ToolDefinition, TestCase
+
+INVALID_ENUM_VALUE = "__not_a_valid_option__"
+# values of another JSON type that argument validation will not coerce
+WRONG_TYPE_VALUES = {
+    "string": {"unexpected": "object"},
+    "integer": "not-a-number",
+    "number": "not-a-number",
+    "boolean": "not-a-boolean",
+    "array": "not-an-array",
+    "object": "not-an-object"
+}
+# values of the string formats a sample can satisfy, other formats are not guessed
+FORMAT_SAMPLES = {
+    "date": "2024-01-01",
+    "date-time": "2024-01-01T00:00:00Z",
+    "time": "00:00:00Z",
+    "email": "user@example.com",
+    "hostname": "example.com",
+    "ipv4": "127.0.0.1",
+    "ipv6": "::1",
+    "uri": "https://example.com",
+    "uri-reference": "https://example.com",
+    "url": "https://example.com",
+    "uuid": "00000000-0000-4000-8000-000000000000"
+}
+# strings tried in turn for a property with a pattern
+PATTERN_CANDIDATES = ["example", "a", "1", "example.txt", "/tmp/example", "A1", "0"]
+
+
+class SchemaCaseGenerator:
+    """
+    Derives boundary and invalid-input test cases from a tool's input schema without the LLM
+
+    Each case changes a single field of an otherwise valid input: a missing
+    required field, a value of the wrong type, an enum value outside the
+    options, or a number or string at and beyond its bounds. Inputs outside
+    the schema are expected to fail with an error status, whatever the error
+    says; inputs on the bounds are expected to succeed. Tools whose required
+    fields have a pattern or format no sample satisfies get no cases, and
+    string length bounds are not taken as valid inputs for such fields.
+    """
+
+    def __init__(self, max_cases_per_tool: int = 10):
+        """
+        Args:
+            max_cases_per_tool: Cap on synthesized cases per tool, invalid inputs come first
+        """
+        self.max_cases_per_tool = max_cases_per_tool
+
+    @classmethod
+    def from_config(cls, schema_config: Optional[dict] = None) -> Optional["SchemaCaseGenerator"]:
+        """
+        Build the generator from the `schemaCases` section of the MCP config, None if it is not enabled
+        """
+        if not schema_config or not schema_config.get("enabled", True):
+            return None
+        return cls(max_cases_per_tool=schema_config.get("maxCasesPerTool", 10))
+
+    def generate(self, tool: ToolDefinition) -> List[TestCase]:
+        schema = tool.input_schema if isinstance(tool.input_schema, dict) else {}
+        properties = schema.get("properties") or {}
+        required = [name for name in schema.get("required") or [] if name in properties]
+        if not properties:
+            return []
+
+        try:
+            baseline = {name: self.sample_value(properties[name]) for name in required}
+        except ValueError as err:
+            print(f"Skipping schema cases of {tool.name}: {err}")
+            return []
+        invalid: List[Tuple[str, dict]] = []
+        boundary: List[Tuple[str, dict]] = []
+
+        for name in required:
+            invalid.append((f"Missing required parameter '{name}'", _without(baseline, name)))
+
+        for name, prop in properties.items():
+            prop_type = _type_of(prop)
+            if prop_type in WRONG_TYPE_VALUES:
+                invalid.append((
+                    f"Parameter '{name}' of the wrong type (expected {prop_type})",
+                    dict(baseline, **{name: WRONG_TYPE_VALUES[prop_type]})
+                ))
+
+            if prop.get("enum"):
+                invalid.append((f"Parameter '{name}' outside its allowed values", dict(baseline, **{name: INVALID_ENUM_VALUE})))
+                for value in prop["enum"]:
+                    boundary.append((f"Parameter '{name}' set to allowed value {json.dumps(value)}", dict(baseline, **{name: value})))
+                continue
+
+            for description, value, valid in self._bounds(prop, prop_type):
+                case_input = dict(baseline, **{name: value})
+                (boundary if valid else invalid).append((f"Parameter '{name}' {description}", case_input))
+
+        cases, seen = [], set()
+        for status, candidates in (("error", invalid), ("success", boundary)):
+            for description, case_input in candidates:
+                case = self._case(tool, description, case_input, status)
+                # a bound can coincide with the baseline input, ids are derived from the input
+                if case.id not in seen:
+                    seen.add(case.id)
+                    cases.append(case)
+        return cases[:self.max_cases_per_tool]
+
+    def _bounds(self, prop: dict, prop_type: Optional[str]) -> List[Tuple[str, Any, bool]]:
+        """
+        (description, value, valid) for the numeric range or string length limits of a property
+        """
+        bounds = []
+        if prop_type in ("integer", "number"):
+            step = 1 if prop_type == "integer" else 0.5
+            if "minimum" in prop:
+                bounds.append((f"at its minimum {prop['minimum']}", prop["minimum"], True))
+                bounds.append((f"below its minimum {prop['minimum']}", prop["minimum"] - step, False))
+            if "exclusiveMinimum" in prop and not isinstance(prop["exclusiveMinimum"], bool):
+                bounds.append((f"equal to its exclusive minimum {prop['exclusiveMinimum']}", prop["exclusiveMinimum"], False))
+            if "maximum" in prop:
+                bounds.append((f"at its maximum {prop['maximum']}", prop["maximum"], True))
+                bounds.append((f"above its maximum {prop['maximum']}", prop["maximum"] + step, False))
+            if "exclusiveMaximum" in prop and not isinstance(prop["exclusiveMaximum"], bool):
+                bounds.append((f"equal to its exclusive maximum {prop['exclusiveMaximum']}", prop["exclusiveMaximum"], False))
+        elif prop_type == "string":
+            # a string of a's at a length bound is only known to be valid without a pattern or format
+            free = not prop.get("pattern") and not prop.get("format")
+            if prop.get("minLength"):
+                if free:
+                    bounds.append((f"at its minimum length {prop['minLength']}", "a" * prop["minLength"], True))
+                bounds.append((f"shorter than its minimum length {prop['minLength']}", "a" * (prop["minLength"] - 1), False))
+            if "maxLength" in prop:
+                if free:
+                    bounds.append((f"at its maximum length {prop['maxLength']}", "a" * prop["maxLength"], True))
+                bounds.append((f"longer than its maximum length {prop['maxLength']}", "a" * (prop["maxLength"] + 1), False))
+        return bounds
+
+    def sample_value(self, prop: dict) -> Any:
+        """
+        A value satisfying the property's schema
+
+        Raises:
+            ValueError: If the property is a string with a pattern or format no sample satisfies
+        """
+        if "default" in prop:
+            return prop["default"]
+        if prop.get("enum"):
+            return prop["enum"][0]
+        if prop.get("examples"):
+            return prop["examples"][0]
+        if "const" in prop:
+            return prop["const"]
+
+        prop_type = _type_of(prop)
+        if prop_type == "string":
+            return _sample_string(prop)
+        if prop_type in ("integer", "number"):
+            low = prop.get("minimum", prop.get("exclusiveMinimum", 0) + 1 if "exclusiveMinimum" in prop else 1)
+            high = prop.get("maximum", prop.get("exclusiveMaximum", low + 1) - 1 if "exclusiveMaximum" in prop else low)
+            return min(low, high)
+        if prop_type == "boolean":
+            return True
+        if prop_type == "array":
+            items = prop.get("items") if isinstance(prop.get("items"), dict) else {}
+            return [self.sample_value(items) for _ in range(prop.get("minItems", 0))]
+        if prop_type == "object":
+            nested = prop.get("properties") or {}
+            return {name: self.sample_value(nested[name]) for name in prop.get("required") or [] if name in nested}
+        return "example"
+
+    def _case(self, tool: ToolDefinition, description: str, case_input: dict, status: str) -> TestCase:
+        validation_rules = []
+        # servers word argument errors differently, so invalid inputs only expect the error status
+        if status == "success" and isinstance(getattr(tool, "output_schema", None), dict):
+            validation_rules.append({
+                "type": "schema",
+                "value": tool.output_schema,
+                "message": "Response must match the tool's output schema"
+            })
+
+        raw_input = json.dumps(case_input, sort_keys=True, ensure_ascii=False)
+        return TestCase(
+            # stable ids, so regenerating an unchanged tool gives the same cases
+            id=str(uuid.uuid5(uuid.NAMESPACE_URL, f"{tool.name}:{raw_input}")),
+            toolName=tool.name,
+            description=f"Schema {'error' if status == 'error' else 'boundary'} case: {description}",
+            query=f"Use the {tool.name} tool with these arguments: {raw_input}",
+            input=case_input,
+            expect={"status": status, "validation_rules": validation_rules}
+        )
+
+
+def _type_of(prop: dict) -> Optional[str]:
+    prop_type = prop.get("type")
+    if isinstance(prop_type, list):
+        prop_type = next((item for item in prop_type if item != "null"), None)
+    if prop_type is None and prop.get("anyOf"):
+        prop_type = next((_type_of(option) for option in prop["anyOf"] if option.get("type") != "null"), None)
+    return prop_type
+
+
+def _sample_string(prop: dict) -> str:
+    min_length, max_length = prop.get("minLength", 0), prop.get("maxLength")
+    pattern, string_format = prop.get("pattern"), prop.get("format")
+    if string_format:
+        if string_format not in FORMAT_SAMPLES:
+            raise ValueError(f"no sample for string format '{string_format}'")
+        candidates = [FORMAT_SAMPLES[string_format]]
+    else:
+        candidates = ["a" * max(min_length, min(max_length if max_length is not None else 7, 7)) or "example"]
+        if pattern:
+            candidates += PATTERN_CANDIDATES
+    for candidate in candidates:
+        if len(candidate) < min_length or (max_length is not None and len(candidate) > max_length):
+            continue
+        try:
+            if pattern and not re.search(pattern, candidate):
+                continue
+        except re.error:
+            raise ValueError(f"pattern '{pattern}' is not a valid regular expression")
+        return candidate
+    raise ValueError(f"no sample satisfies pattern '{pattern}'" if pattern else "no sample satisfies the string bounds")
+
+
+def _without(values: dict, name: str) -> dict:
+    return {key: value for key, value in values.items() if key != name}
@@ -1,68 +1,181 @@
+import asyncio
 import json
-import datetime
 import uuid
 import re
 import os
-from typing import List
+import threading
+from contextlib import aclosing
+from typing import AsyncIterator, List, Optional
 from ..llm.LLM import LLMClient
+from ..llm.LLMCache import CachedLLMClient
+from ..llm.LLMScheduler import LLMScheduler
 from ..type.types_def import ToolDefinition, TestCase
-from ..prompts.tool_prompt import tool_prompt
-from ..prompts.eval_prompt import eval_prompt
+from ..prompts.tool_prompt import tool_prompt, tool_case_mix, tool_case_mix_happy_path
+from ..prompts.eval_prompt import eval_prompt, eval_prompt_batch
 from ..client.Client import Configuration
 from ..client.MCPClient import MCPClient
+from ..client.MCPClientPool import create_client
 from ..utils.read_source_code import ReadSourceCode
+from ..utils.json_stream import JSONArrayStreamParser
+from ..utils.source_compactor import compact_tool_source
+from ..utils.suite_db import SuiteDatabase
+from ..utils.suite_store import TESTCASES_JSON, TestSuiteWriter, create_suite_folder, find_unfinished_suite
+from ..utils.token_count import estimate_message_tokens, estimate_tokens
+from ..utils.tool_fingerprint import FINGERPRINTS_FILE, fingerprint_tool, find_previous_suite, load_previous_suite
+from ..utils.tracing import tracer
+from .BudgetAllocator import BudgetAllocator
+from .CaseDeduplicator import DEDUP_REPORT, CaseDeduplicator
+from .SchemaCaseGenerator import SchemaCaseGenerator
 
 class TestGenerator:
     """
     Generator for test cases using Large Language Model
     """
     
-    def __init__(self, api_key: str = None, config_path: str = None):
+    def __init__(
+        self,
+        api_key: str = None,
+        config_path: str = None,
+        incremental: bool = False,
+        resume: bool = False
+    ):
         """
         Create a new test generator
         
         Args:
             api_key: API key for the language model
+            incremental: Reuse the previous suite's cases for tools whose fingerprint is unchanged
+            resume: Continue each server's interrupted suite, skipping the tools already written
         """
         Config_class = Configuration()
         self.config = Config_class.load_config(config_path)
-        self.llm = LLMClient(api_key)
+        self.llm = CachedLLMClient.from_config(LLMClient(api_key), self.config.get("llmCache"))
         self.readsc = ReadSourceCode(config_path)
+        # cap on in-flight LLM requests shared by every tool being generated
+        self.max_concurrency = self.config.get("maxConcurrency", 4)
+        # every LLM call goes through the scheduler's concurrency, rate limits and retries
+        self.scheduler = LLMScheduler.from_config(self.llm, self.max_concurrency, self.config.get("rateLimits"))
+        # seconds allowed for one server from initialize to save, None disables the limit
+        self.server_timeout = self.config.get("serverTimeout", 1800)
+        # seconds allowed for a single call to a server, so a wedged server fails fast
+        self.call_timeout = self.config.get("callTimeout", 60)
+        # ask for all queries of a tool in one LLM call instead of one call per case
+        self.batch_queries = self.config.get("batchQueries", True)
+        # estimated tokens allowed for a tool prompt, the tool source is compacted to fit
+        self.prompt_token_budget = self.config.get("promptTokenBudget", 8000)
+        # spread the cases over tools by schema complexity and failure history, within a token budget
+        self.budget = BudgetAllocator.from_config(self.config.get("testBudget"), self.prompt_token_budget)
+        # parse test cases while the LLM is still streaming them and start their queries right away
+        self.stream_responses = self.config.get("streamResponses", False)
+        # derive boundary and invalid-input cases from the input schema, the LLM then only writes happy paths
+        self.schema_cases = SchemaCaseGenerator.from_config(self.config.get("schemaCases"))
+        # drop near-duplicate LLM cases, each would cost a tool execution and judging in val-cases
+        self.deduplicator = CaseDeduplicator.from_config(self.config.get("dedup"))
+        # optional SQLite store the saved suites are also written to
+        self.suite_db = SuiteDatabase.from_config(self.config.get("suiteDatabase"))
+        self.suite_db_lock = asyncio.Lock()
+        self.incremental = incremental
+        self.resume = resume
+        # tool fingerprints of each server's latest generation, saved next to its test cases
+        self.fingerprints = {}
+        # cases dropped as duplicates per server, saved as dedup_report.json
+        self.dropped_cases = {}
+
     async def run(self):
         # load config
 
-        servers = [MCPClient(name, srv_config) for name, srv_config in self.config["mcpServers"].items()]
+        servers = [create_client(name, srv_config) for name, srv_config in self.config["mcpServers"].items()]
         tests_per_tool = self.config["numTestsPerTool"]
-        for server in servers:
 
+        # servers are independent, so a slow or hanging one only delays itself
+        server_semaphore = asyncio.Semaphore(self.config.get("maxServerConcurrency", 4))
+        if self.budget:
+            self.budget.reserve([server.name for server in servers])
+        try:
+            results = await asyncio.gather(
+                *(self.run_server(server, tests_per_tool, server_semaphore) for server in servers)
+            )
+        finally:
+            if self.suite_db:
+                self.suite_db.close()
+
+        failed = [server.name for server, ok in zip(servers, results) if not ok]
+        if failed:
+            print(f"Test generation failed for servers: {', '.join(failed)}")
+        return results
+
+    async def run_server(self, server: MCPClient, tests_per_tool: int, semaphore: asyncio.Semaphore) -> bool:
+        """
+        Generate and save test cases for a single MCP server
+
+        Args:
+            server: MCP server client, cleaned up before returning
+            tests_per_tool: Number of tests to generate per tool
+            semaphore: Limits how many servers are processed at once
+
+        Returns:
+            True if the test cases were saved
+        """
+        async with semaphore:
             # connect server
             print("\n========================================")
             print(f"Testing server: {server.name}")
             print("========================================\n")
-            await server.initialize()  
-            
-            # Get available tools
-            tools = await server.list_tools()
-            if not tools:
-                Warning('No tools found in the MCP server. Nothing to test.')
-            print(f"Found {len(tools)} tools:")
-            print("\n".join([f"{tool.format_for_llm()}" for tool in tools]))
+            writer = None
+            call_timeout = self.config["mcpServers"][server.name].get("callTimeout", self.call_timeout)
+            try:
+                async with asyncio.timeout(self.server_timeout):
+                    with tracer.span("server.initialize", server=server.name):
+                        async with asyncio.timeout(call_timeout):
+                            await server.initialize()
 
-            # Generate tests
-            print(f"Generating {tests_per_tool} tests per tool...")
-            test_cases = await self.generate_tests_for_each_server(tools, tests_per_tool,server.name)
-            print(f"Generated {len(test_cases)} test cases in total.")   
+                    # Get available tools
+                    with tracer.span("server.list_tools", server=server.name):
+                        async with asyncio.timeout(call_timeout):
+                            tools = await server.list_tools()
+                    if not tools:
+                        Warning('No tools found in the MCP server. Nothing to test.')
+                    print(f"[{server.name}] Found {len(tools)} tools:")
+                    print("\n".join([f"{tool.format_for_llm()}" for tool in tools]))
 
-            self.save_to_file(server.name, test_cases)
+                    folder = self.resume and find_unfinished_suite(server.name)
+                    if folder:
+                        print(f"[{server.name}] Resuming interrupted suite {folder}")
+                    writer = TestSuiteWriter(folder or create_suite_folder(server.name))
 
-            await server.cleanup()
+                    # Generate tests
+                    print(f"[{server.name}] Generating {tests_per_tool} tests per tool...")
+                    test_cases = await self.generate_tests_for_each_server(tools, tests_per_tool, server.name, writer)
+                    print(f"[{server.name}] Generated {len(test_cases)} test cases in total.")
 
+                    saved = self.save_to_file(server.name, test_cases, writer.folder)
+                    if saved and self.suite_db:
+                        await self.record_suite(server.name, test_cases, writer.folder)
+                    return saved
+
+            except TimeoutError:
+                print(f"Testing server {server.name} timed out (serverTimeout {self.server_timeout}s, callTimeout {call_timeout}s)")
+            except Exception as error:
+                print(f"Error testing server {server.name}: {error}")
+            finally:
+                if writer:
+                    writer.close()
+                try:
+                    # a wedged server may not stop either, it is abandoned after the call timeout
+                    async with asyncio.timeout(call_timeout):
+                        await server.cleanup()
+                except TimeoutError:
+                    print(f"Server {server.name} did not stop within {call_timeout}s, abandoning it")
+                except Exception as error:
+                    print(f"Error cleaning up server {server.name}: {error}")
+            return False
 
     async def generate_tests_for_each_server(
         self, 
         tools: List[ToolDefinition], 
         tests_per_tool: int,
-        server_name: str
+        server_name: str,
+        writer: Optional[TestSuiteWriter] = None
     ) -> List[TestCase]:
         """
         Generate test cases for the given tools
@@ -71,70 +184,382 @@ class TestGenerator:
             server_name: Name of the MCP server
             tools: Tool definitions to generate tests for
             config: Tester configuration
+            writer: Suite writer receiving each tool's cases as soon as the tool is done,
+                tools it already holds are not generated again
             
         Returns:
             List of generated test cases
         """
-        all_tests: List[TestCase] = []
         tool_functions = self.readsc.get_code(server_name)
-        for tool in tools:
+        allocation = self.budget.allocate(tools, tests_per_tool, server_name) if self.budget else {}
+        tool_tests = {tool.name: allocation.get(tool.name, tests_per_tool) for tool in tools}
+        fingerprints = {
+            tool.name: fingerprint_tool(
+                tool,
+                tool_functions.get(tool.name),
+                {
+                    "tests_per_tool": tool_tests[tool.name],
+                    "tool_prompt": tool_prompt,
+                    "prompt_token_budget": self.prompt_token_budget,
+                    "schema_cases": vars(self.schema_cases) if self.schema_cases else None
+                }
+            )
+            for tool in tools
+        }
+        previous_fingerprints, previous_cases = {}, {}
+        if self.incremental:
+            previous_fingerprints, previous_cases = self.load_previous_suite(server_name)
+
+        # tools whose LLM generation failed are left out of the fingerprints, so the next incremental run retries them
+        failed_tools = set()
+
+        async def generate(tool: ToolDefinition) -> List[TestCase]:
+            if writer and tool.name in writer.completed:
+                print(f"[{server_name}] Tool {tool.name} was already generated, skipping")
+                return [TestCase(**case) for case in writer.completed[tool.name]]
+
+            if previous_cases.get(tool.name) and previous_fingerprints.get(tool.name) == fingerprints[tool.name]:
+                print(f"[{server_name}] Tool {tool.name} is unchanged, reusing {len(previous_cases[tool.name])} test cases")
+                test_cases = [TestCase(**case) for case in previous_cases[tool.name]]
+            else:
+                with tracer.span("tool.generate", server=server_name, tool=tool.name) as span:
+                    test_cases = await self.generate_tests_for_tool(tool, tool_tests[tool.name], tool_functions)
+                    span["cases"] = len(test_cases)
+                if not test_cases:
+                    failed_tools.add(tool.name)
+                if self.deduplicator and len(test_cases) > 1:
+                    with tracer.span("tool.dedup", server=server_name, tool=tool.name):
+                        test_cases, dropped = self.deduplicator.deduplicate(test_cases)
+                    if dropped:
+                        print(f"[{server_name}] Dropped {len(dropped)} near-duplicate cases of {tool.name}")
+                        self.dropped_cases.setdefault(server_name, []).extend(dropped)
+                if self.schema_cases:
+                    with tracer.span("tool.schema_cases", server=server_name, tool=tool.name):
+                        schema_cases = self.schema_cases.generate(tool)
+                    print(f"Derived {len(schema_cases)} schema cases for {tool.name}")
+                    test_cases = test_cases + schema_cases
+
+            # a failed tool is not marked completed, even with schema cases, so --resume retries it
+            if writer and test_cases and tool.name not in failed_tools:
+                writer.write_tool(tool.name, self.testcases_to_dict(test_cases))
+            return test_cases
+
+        results = await asyncio.gather(*(generate(tool) for tool in tools))
+
+        self.fingerprints[server_name] = {
+            tool.name: fingerprints[tool.name]
+            for tool, test_cases in zip(tools, results)
+            if test_cases and tool.name not in failed_tools
+        }
+
+        # gather keeps the order of `tools`, so testcases.json stays grouped per tool
+        all_tests: List[TestCase] = []
+        for test_cases in results:
+            all_tests.extend(test_cases)
+        return all_tests
+
+    async def stream_response_async(self, messages: List[dict]) -> AsyncIterator[str]:
+        """
+        Stream the LLM's response chunk by chunk without blocking the event loop
+
+        The blocking `stream_response` iterator is consumed in a worker thread and
+        holds one of the scheduler's slots until the response is complete. Streams
+        are not retried, since their chunks may already have been used. Once the
+        consumer stops early, the thread stops reading at the next chunk and
+        closes the stream.
+        """
+        cached = await self.scheduler.cached(messages)
+        if cached is not None:
+            yield cached
+            return
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+        stop = threading.Event()
+
+        def produce():
+            # the cache was looked up above, a caching client skips its own lookup
+            stream = getattr(self.llm, "fetch_stream", self.llm.stream_response)(messages)
             try:
-                print(f"Generating tests for tool interface: {tool.name}")
-                
-                tool_prompt_formatted = self.create_tool_prompt(tool, tests_per_tool, tool_functions[tool.name])
-                
-                response = self.llm.get_response(
-                    [{"role": "user", "content": tool_prompt_formatted}]
-
-                )
-                
-                if response:
-                    test_cases = self.parse_response(response, tool.name)
-                    
-                    # Generate natural language queries for each test case
-                    for test_case in test_cases:
-                        print(f"Generating natural language query for {tool.name}")
-                        eval_prompt_formatted = self.create_eval_prompt(tool, test_case)
-                        try:
-                            test_case.query = self.llm.get_response(
-                                [{"role":"user","content": eval_prompt_formatted}]
-                            )
-                        except Exception as err:
-                            print(f"Failed to generate natural language query for {tool.name}: {err}")
-                            test_case.query = ''
-                    
-                    all_tests.extend(test_cases)
-                    print(f"Generated {len(test_cases)} tests for {tool.name}")
-                
-                else:
+                for chunk in stream:
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, chunk)
+            except Exception as err:
+                loop.call_soon_threadsafe(queue.put_nowait, err)
+            finally:
+                close = getattr(stream, "close", None)
+                if close:
+                    close()
+                loop.call_soon_threadsafe(queue.put_nowait, done)
+
+        async with self.scheduler.slot(messages) as usage:
+            with tracer.span("llm.stream_response", "llm", prompt_tokens=usage["prompt_tokens"]) as span:
+                producer = asyncio.create_task(asyncio.to_thread(produce))
+                completion_tokens = 0
+                try:
+                    while True:
+                        item = await queue.get()
+                        if item is done:
+                            break
+                        if isinstance(item, Exception):
+                            raise item
+                        completion_tokens += estimate_tokens(item)
+                        span["completion_tokens"] = usage["completion_tokens"] = completion_tokens
+                        yield item
+                    await producer
+                finally:
+                    # the consumer raised, was cancelled or stopped early
+                    stop.set()
+
+    def load_previous_suite(self, server_name: str):
+        """
+        Load the fingerprints and test cases of the server's latest fingerprinted suite
+
+        Returns:
+            Fingerprints keyed by tool name and test case dicts grouped by tool name,
+            both empty if there is no usable previous suite
+        """
+        folder = find_previous_suite(server_name)
+        if not folder:
+            print(f"[{server_name}] No previous suite with fingerprints found, generating every tool")
+            return {}, {}
+        try:
+            fingerprints, cases_by_tool = load_previous_suite(folder)
+        except Exception as error:
+            print(f"[{server_name}] Failed to load previous suite {folder}, generating every tool: {error}")
+            return {}, {}
+        print(f"[{server_name}] Incremental generation based on {folder}")
+        return fingerprints, cases_by_tool
+
+    async def generate_tests_for_tool(
+        self,
+        tool: ToolDefinition,
+        tests_per_tool: int,
+        tool_functions: dict
+    ) -> List[TestCase]:
+        """
+        Generate test cases and natural language queries for a single tool
+
+        Args:
+            tool: Tool definition to generate tests for
+            tests_per_tool: Number of tests to generate per tool
+            tool_functions: Source code of the server's tools keyed by tool name
+
+        Returns:
+            List of generated test cases, empty if generation failed
+        """
+        try:
+            print(f"Generating tests for tool interface: {tool.name}")
+
+            tool_prompt_formatted = self.create_tool_prompt(tool, tests_per_tool, tool_functions[tool.name])
+
+            if self.stream_responses:
+                test_cases = await self.generate_tests_streaming(tool, tool_prompt_formatted)
+                print(f"Generated {len(test_cases)} tests for {tool.name}")
+                return test_cases
+
+            response = await self.get_response_async(
+                [{"role": "user", "content": tool_prompt_formatted}]
+            )
+
+            if not response:
+                print(f"No response received for {tool.name}")
+                return []
+
+            with tracer.span("parse_response", tool=tool.name):
+                test_cases = self.parse_response(response, tool.name)
+
+            # Generate natural language queries for each test case
+            await self.generate_queries(tool, test_cases)
+
+            print(f"Generated {len(test_cases)} tests for {tool.name}")
+            return test_cases
+
+        except Exception as error:
+            print(f"Error generating tests for tool {tool.name}: {error}")
+            return []
+
+    async def generate_tests_streaming(self, tool: ToolDefinition, tool_prompt_formatted: str) -> List[TestCase]:
+        """
+        Generate a tool's test cases from a streamed LLM response
+
+        Each case is validated as soon as its object is complete. With batchQueries
+        the queries of all cases are generated in one call once the stream ends,
+        otherwise each case's query is generated while the rest of the response
+        is still arriving.
+
+        Returns:
+            List of generated test cases, in response order
+        """
+        parser = JSONArrayStreamParser()
+        chunks = []
+        test_cases: List[TestCase] = []
+        query_tasks = []
+        index = 0
+        try:
+            stream = self.stream_response_async([{"role": "user", "content": tool_prompt_formatted}])
+            async with aclosing(stream):
+                async for chunk in stream:
+                    chunks.append(chunk)
+                    for test in parser.feed(chunk):
+                        test_case = self.build_test_case(test, index, tool.name)
+                        index += 1
+                        if test_case:
+                            test_cases.append(test_case)
+                            if not self.batch_queries:
+                                query_tasks.append(asyncio.create_task(self.generate_query(tool, test_case)))
+
+            if not test_cases:
+                # not a plain JSON array, e.g. a single object, let parse_response recover it
+                response = "".join(chunks)
+                if not response:
                     print(f"No response received for {tool.name}")
-                    
-            except Exception as error:
-                print(f"Error generating tests for tool {tool.name}: {error}")
-        
-        return all_tests
-    
+                    return []
+                with tracer.span("parse_response", tool=tool.name):
+                    test_cases = self.parse_response(response, tool.name)
+                await self.generate_queries(tool, test_cases)
+                return test_cases
+
+            if self.batch_queries:
+                await self.generate_queries(tool, test_cases)
+            else:
+                await asyncio.gather(*query_tasks)
+            return test_cases
+        finally:
+            # the stream failed or generation was cancelled, queries still running are no longer needed
+            pending = [task for task in query_tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def generate_queries(self, tool: ToolDefinition, test_cases: List[TestCase]):
+        """
+        Fill in the natural language queries of a tool's test cases
+
+        In batch mode one prompt covers every case; cases missing from the batched
+        answer fall back to a query of their own.
+        """
+        queries = {}
+        if self.batch_queries and len(test_cases) > 1:
+            queries = await self.generate_queries_batch(tool, test_cases)
+
+        missing = []
+        for test_case in test_cases:
+            if queries.get(test_case.id):
+                test_case.query = queries[test_case.id]
+            else:
+                missing.append(test_case)
+
+        if queries and missing:
+            print(f"[{tool.name}] Batched query generation missed {len(missing)} cases, generating them one by one")
+        await asyncio.gather(*(self.generate_query(tool, test_case) for test_case in missing))
+
+    async def generate_queries_batch(self, tool: ToolDefinition, test_cases: List[TestCase]) -> dict:
+        """
+        Generate the natural language queries of several test cases with one LLM call
+
+        Returns:
+            Queries keyed by test case id, empty if the response could not be used
+        """
+        print(f"Generating natural language queries for {len(test_cases)} {tool.name} cases in one batch")
+        eval_prompt_formatted = self.create_batch_eval_prompt(tool, test_cases)
+        # the prompt numbers the scenarios, see create_batch_eval_prompt
+        case_ids = {str(number): case.id for number, case in enumerate(test_cases, 1)}
+        try:
+            response = await self.get_response_async(
+                [{"role":"user","content": eval_prompt_formatted}]
+            )
+            json_match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', response)
+            queries = json.loads(json_match.group(1) if json_match else response)
+        except Exception as err:
+            print(f"Failed to generate batched natural language queries for {tool.name}: {err}")
+            return {}
+
+        if not isinstance(queries, dict):
+            print(f"[{tool.name}] Batched queries are not a JSON object. Raw response: {response}")
+            return {}
+        return {
+            case_ids[str(number)]: query.strip() for number, query in queries.items()
+            if str(number) in case_ids and isinstance(query, str) and query.strip()
+        }
+
+    async def generate_query(self, tool: ToolDefinition, test_case: TestCase):
+        """
+        Fill in the natural language query of a test case
+        """
+        print(f"Generating natural language query for {tool.name}")
+        eval_prompt_formatted = self.create_eval_prompt(tool, test_case)
+        try:
+            test_case.query = await self.get_response_async(
+                [{"role":"user","content": eval_prompt_formatted}]
+            )
+        except Exception as err:
+            print(f"Failed to generate natural language query for {tool.name}: {err}")
+            test_case.query = ''
+
+    async def get_response_async(self, messages: List[dict]) -> str:
+        """
+        Call the LLM without blocking the event loop
+
+        The blocking `LLMClient.get_response` runs in a worker thread behind the
+        scheduler, which keeps to `maxConcurrency` and the configured rate limits
+        and retries retryable errors.
+        """
+        if not tracer.enabled:
+            return await self.scheduler.get_response(messages)
+        with tracer.span("llm.get_response", "llm", prompt_tokens=estimate_message_tokens(messages)) as span:
+            response = await self.scheduler.get_response(messages)
+            span["completion_tokens"] = estimate_tokens(response or "")
+            return response
+
     def create_tool_prompt(self, tool: ToolDefinition, tests_per_tool: int, tool_function_str: str) -> str:
         """
         Create a prompt for the LLM to generate test cases for testing tool exeucation
         
+        The tool source is compacted so the whole prompt fits in `promptTokenBudget`.
+        
         Args:
             tool: Tool definition to generate tests for
             tests_per_tool: Number of tests to generate per tool
+            tool_function_str: Source code of the tool
             
         Returns:
             Formatted prompt string
         """
         # Extract input schema properties safely
-        input_properties = {}
-        if tool.input_schema and hasattr(tool.input_schema, 'properties'):
-            input_properties = json.dumps(input_properties, indent=2)
+        input_schema = tool.input_schema or {}
+        if not isinstance(input_schema, dict):
+            input_schema = {
+                "properties": getattr(input_schema, 'properties', None),
+                "required": getattr(input_schema, 'required', None)
+            }
+        parameters = {"properties": input_schema.get("properties") or {}}
+        if input_schema.get("required"):
+            parameters["required"] = input_schema["required"]
+        input_properties = json.dumps(parameters, indent=2, ensure_ascii=False, default=str)
+        case_mix = tool_case_mix_happy_path if self.schema_cases else tool_case_mix
+        
+        prompt_without_source = tool_prompt.format(
+                                tool=tool,
+                                input_properties=input_properties,
+                                tests_per_tool=tests_per_tool,
+                                case_mix=case_mix,
+                                tool_function_str=""
+                            )
+        source_budget = self.prompt_token_budget - estimate_tokens(prompt_without_source)
+        compacted_source = compact_tool_source(tool_function_str, tool.name, source_budget)
+        if len(compacted_source) < len(tool_function_str or ""):
+            print(f"[{tool.name}] Compacted tool source from ~{estimate_tokens(tool_function_str)} "
+                  f"to ~{estimate_tokens(compacted_source)} tokens")
         
         formatted_prompt = tool_prompt.format(
                                 tool=tool,
                                 input_properties=input_properties,
                                 tests_per_tool=tests_per_tool,
-                                tool_function_str=tool_function_str
+                                case_mix=case_mix,
+                                tool_function_str=compacted_source
                             )
         return formatted_prompt
         
@@ -158,6 +583,24 @@ class TestGenerator:
         return formatted_prompt
 
 
+    def create_batch_eval_prompt(self, tool: ToolDefinition, test_cases: List[TestCase]) -> str:
+        """
+        Create a prompt for the LLM to generate the queries of several test cases at once
+
+        Args:
+            tool: Tool definition the test cases belong to
+            test_cases: Test cases to generate natural language queries for
+
+        Returns:
+            Formatted prompt string, the scenarios are numbered from 1 in the order of `test_cases`
+        """
+        # case ids are new uuids on every run, numbers keep the prompt and its LLM cache key stable
+        scenarios = [
+            {"id": str(number), "purpose": case.description, "parameters": case.input}
+            for number, case in enumerate(test_cases, 1)
+        ]
+        return eval_prompt_batch.format(tool=tool, test_cases=json.dumps(scenarios, indent=2, ensure_ascii=False))
+
     def parse_response(self, response_text: str, tool_name: str) -> List[TestCase]:
         """
         Parse LLM's response into test cases
@@ -204,42 +647,9 @@ class TestGenerator:
             valid_test_cases: List[TestCase] = []
             
             for index, test in enumerate(parsed_json):
-                # Basic validation for essential fields
-                if not isinstance(test, dict):
-                    print(f"[{tool_name}] Test case at index {index} is not a valid object. Skipping.")
-                    continue
-                
-                if not test.get('description') or not isinstance(test['description'], str):
-                    print(f"[{tool_name}] Test case at index {index} is missing or has an invalid 'description'. Skipping: {json.dumps(test)}")
-                    continue
-                
-                if 'input' not in test or not isinstance(test['input'], dict):
-                    print(f"[{tool_name}] Test case \"{test['description']}\" is missing or has invalid 'inputs'. Skipping: {json.dumps(test)}")
-                    continue
-                
-                if not test.get('expect') or not isinstance(test['expect'], dict):
-                    print(f"[{tool_name}] Test case \"{test['description']}\" is missing or has invalid 'expect'. Skipping: {json.dumps(test)}")
-                    continue
-                
-                expected_outcome = test['expect']
-                if (not expected_outcome.get('status') or 
-                    expected_outcome['status'] not in ['success', 'error']):
-                    print(f"[{tool_name}] Test case \"{test['description']}\" has missing or invalid 'expectedOutcome.status'. Skipping: {json.dumps(test)}")
-                    continue
-
-                # Create test case
-                test_case = TestCase(
-                    id=str(uuid.uuid4()),
-                    toolName=tool_name,
-                    description=test['description'],
-                    query='',
-                    input=test['input'],
-                    expect={
-                        "status":expected_outcome['status'],
-                        "validation_rules": expected_outcome.get('validationRules', []) or []
-                    }
-                    )
-                valid_test_cases.append(test_case)
+                test_case = self.build_test_case(test, index, tool_name)
+                if test_case:
+                    valid_test_cases.append(test_case)
             return valid_test_cases
             
         except Exception as error:
@@ -249,6 +659,54 @@ class TestGenerator:
             return []
 
 
+    def build_test_case(self, test, index: int, tool_name: str) -> Optional[TestCase]:
+        """
+        Validate one test case object from the LLM's response
+
+        Args:
+            test: Parsed test case object
+            index: Position of the test case in the response
+            tool_name: Name of the tool being tested
+
+        Returns:
+            The test case, or None if it is missing essential fields
+        """
+        # Basic validation for essential fields
+        if not isinstance(test, dict):
+            print(f"[{tool_name}] Test case at index {index} is not a valid object. Skipping.")
+            return None
+        
+        if not test.get('description') or not isinstance(test['description'], str):
+            print(f"[{tool_name}] Test case at index {index} is missing or has an invalid 'description'. Skipping: {json.dumps(test)}")
+            return None
+        
+        if 'input' not in test or not isinstance(test['input'], dict):
+            print(f"[{tool_name}] Test case \"{test['description']}\" is missing or has invalid 'inputs'. Skipping: {json.dumps(test)}")
+            return None
+        
+        if not test.get('expect') or not isinstance(test['expect'], dict):
+            print(f"[{tool_name}] Test case \"{test['description']}\" is missing or has invalid 'expect'. Skipping: {json.dumps(test)}")
+            return None
+        
+        expected_outcome = test['expect']
+        if (not expected_outcome.get('status') or 
+            expected_outcome['status'] not in ['success', 'error']):
+            print(f"[{tool_name}] Test case \"{test['description']}\" has missing or invalid 'expectedOutcome.status'. Skipping: {json.dumps(test)}")
+            return None
+
+        # Create test case
+        return TestCase(
+            id=str(uuid.uuid4()),
+            toolName=tool_name,
+            description=test['description'],
+            query='',
+            input=test['input'],
+            expect={
+                "status":expected_outcome['status'],
+                "validation_rules": expected_outcome.get('validationRules', []) or []
+            }
+            )
+
     def testcases_to_dict(self, testcases: List[TestCase])-> List:
         res = []
         for case in testcases:
@@ -262,26 +720,41 @@ class TestGenerator:
             })
         return res
 
-    def save_to_file(self, server_name: str, testcases: List[TestCase]):
+    async def record_suite(self, server_name: str, testcases: List[TestCase], folder: str):
+        """
+        Store a saved suite in the suite database without blocking the event loop
+        """
+        # servers finish concurrently, but the connection takes one writer at a time
+        async with self.suite_db_lock:
+            run_id = await asyncio.to_thread(
+                self.suite_db.record_suite, server_name, self.testcases_to_dict(testcases), folder
+            )
+        print(f"{server_name} test cases are stored as run {run_id} in {self.suite_db.path}")
+
+    def save_to_file(self, server_name: str, testcases: List[TestCase], folerpath: str = None):
         """
         save test cases (array of JSON) to file
+
+        Writing testcases.json marks the suite folder as finished.
         """
         testcases = self.testcases_to_dict(testcases)
         try:
             if not isinstance(testcases, list):
                 raise ValueError("input data should be an array of JSON")
             
-            current_timestamp = datetime.datetime.utcnow().isoformat()
-            safe_timestamp = current_timestamp.replace(":", "-").replace(".", "-")
-            
-            folerpath = os.path.join(".logs",f'{server_name}_{safe_timestamp}')
-            if not os.path.exists(folerpath):
-                os.mkdir(folerpath)
+            if not folerpath:
+                folerpath = create_suite_folder(server_name)
             
-            filename = f"testcases.json"
-            filepath = os.path.join(folerpath,filename)
+            filepath = os.path.join(folerpath, TESTCASES_JSON)
             with open(filepath, 'w', encoding='utf-8') as file:
                 json.dump(testcases, file, ensure_ascii=False, indent=4)
+            if self.fingerprints.get(server_name):
+                with open(os.path.join(folerpath, FINGERPRINTS_FILE), 'w', encoding='utf-8') as file:
+                    json.dump(self.fingerprints[server_name], file, indent=4)
+            if self.dropped_cases.get(server_name):
+                with open(os.path.join(folerpath, DEDUP_REPORT), 'w', encoding='utf-8') as file:
+                    json.dump(self.dropped_cases[server_name], file, ensure_ascii=False, indent=4)
+                print(f"{len(self.dropped_cases[server_name])} dropped duplicate cases are listed in {DEDUP_REPORT}")
             print(f"{server_name} test cases are successfully saved into {filepath}")
             return True
         
@@ -0,0 +1,123 @@
+import json
+import re
+from typing import Any, List
+
+# opening bracket of an array whose first element is an object or an array, as test case arrays are
+ARRAY_START = re.compile(r"\[\s*[\[{]")
+
+
+class JSONArrayStreamParser:
+    """
+    Incremental parser yielding the elements of a JSON array as soon as they are complete
+
+    Text chunks are fed as they arrive from the LLM. Leading prose and a ```json
+    fence are skipped, without a fence the array starts at the first `[` that
+    opens an object or array element; everything after the array's closing
+    bracket is ignored. Only object and array elements are yielded, which is
+    what test cases are. Elements that are not valid JSON are skipped and logged.
+    """
+
+    def __init__(self, skip_prefix: bool = True):
+        """
+        Args:
+            skip_prefix: Skip prose and a code fence ahead of the array, disable for plain JSON files
+        """
+        self.skip_prefix = skip_prefix
+        self.buffer = ""
+        self.pos = 0            # next character of buffer to scan
+        self.started = False    # inside the top-level array
+        self.done = False       # top-level array closed, or the text is not an array
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.element_start = None
+
+    def feed(self, chunk: str) -> List[Any]:
+        """
+        Consume a chunk of text
+
+        Returns:
+            Elements completed by this chunk, in order
+        """
+        if self.done:
+            return []
+        self.buffer += chunk
+        if not self.started and not self._find_start():
+            return []
+
+        elements = []
+        buffer = self.buffer
+        i = self.pos
+        while i < len(buffer):
+            char = buffer[i]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == "\\":
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in "{[":
+                if self.depth == 1:
+                    self.element_start = i
+                self.depth += 1
+            elif char in "}]":
+                self.depth -= 1
+                if self.depth == 1 and self.element_start is not None:
+                    element = buffer[self.element_start:i + 1]
+                    try:
+                        elements.append(json.loads(element))
+                    except json.JSONDecodeError as error:
+                        print(f"Skipping an array element that is not valid JSON ({error}): {element[:200]}")
+                    self.element_start = None
+                elif self.depth == 0:
+                    self.done = True
+                    break
+            i += 1
+
+        # drop consumed text, keeping the element still being received
+        keep_from = self.element_start if self.element_start is not None else i
+        self.buffer = buffer[keep_from:]
+        self.pos = i - keep_from
+        if self.element_start is not None:
+            self.element_start = 0
+        return elements
+
+    def _find_start(self) -> bool:
+        """
+        Skip up to the opening bracket of the array, once enough text has arrived to find it
+        """
+        fence = self.buffer.find("```") if self.skip_prefix else -1
+        if fence != -1:
+            line_end = self.buffer.find("\n", fence)
+            if line_end == -1:
+                return False
+            start = line_end + 1
+        elif self.skip_prefix:
+            if self.buffer.lstrip()[:1] == "{":
+                # a bare object, its nested arrays are not the elements we are after
+                self.done = True
+                return False
+            # prose ahead of an unfenced array, or of a fence that has not arrived yet
+            match = ARRAY_START.search(self.buffer)
+            if not match:
+                return False
+            start = match.start()
+        else:
+            start = 0
+
+        stripped = self.buffer[start:].lstrip()
+        if not stripped:
+            return False
+        if stripped[0] != "[":
+            # not an array, leave it to the non-streaming parser
+            self.done = True
+            return False
+
+        self.started = True
+        self.depth = 1
+        self.buffer = stripped[1:]
+        self.pos = 0
+        return True
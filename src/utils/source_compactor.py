@@ -0,0 +1,149 @@
+import ast
+from typing import Dict, List, Optional, Set
+from .token_count import CHARS_PER_TOKEN, estimate_tokens
+
+# source tokens kept even when the rest of the prompt leaves no room for them
+MIN_SOURCE_TOKENS = 200
+
+
+def compact_tool_source(source: str, tool_name: str, token_budget: int) -> str:
+    """
+    Shrink a tool's source code to fit a prompt token budget
+
+    Source that already fits is returned unchanged. Otherwise only the tool's function and the module-level helpers, constants and
+    imports it uses are kept, the tool first. Comments are always dropped.
+    While still over budget, helper docstrings, the tool's docstring and helper
+    bodies are removed in that order, and as a last resort the text is cut.
+
+    Args:
+        source: Source code of the tool, or of the whole server module
+        tool_name: Name of the MCP tool
+        token_budget: Estimated tokens the source may take in the prompt, at least MIN_SOURCE_TOKENS
+
+    Returns:
+        The compacted source, source that cannot be parsed is only cut to the budget
+    """
+    if not source:
+        return source or ""
+    token_budget = max(token_budget, MIN_SOURCE_TOKENS)
+    if estimate_tokens(source) <= token_budget:
+        return source
+    try:
+        module = ast.parse(source)
+    except SyntaxError:
+        return _truncate(source, token_budget)
+
+    definitions = _module_definitions(module)
+    tool_node = _find_tool(module, tool_name)
+    if tool_node is None:
+        # not a module we can slice, keep every statement
+        nodes = list(module.body)
+        helpers = []
+    else:
+        helpers = _used_definitions(tool_node, definitions)
+        # the tool comes first so that a truncated prompt still shows it, imports matter least
+        imports = [node for node in module.body if node in helpers and isinstance(node, (ast.Import, ast.ImportFrom))]
+        nodes = [tool_node] + [node for node in module.body if node in helpers and node not in imports] + imports
+
+    def render() -> str:
+        return "\n\n".join(ast.unparse(node) for node in nodes)
+
+    text = render()
+    if estimate_tokens(text) <= token_budget:
+        return text
+
+    for step in (
+        lambda: [_strip_docstrings(node) for node in helpers],
+        lambda: [_strip_docstrings(node) for node in nodes],
+        lambda: [_strip_body(node) for node in helpers]
+    ):
+        step()
+        text = render()
+        if estimate_tokens(text) <= token_budget:
+            return text
+    return _truncate(text, token_budget)
+
+
+def _find_tool(module: ast.Module, tool_name: str) -> Optional[ast.AST]:
+    """
+    Find the function registered as the tool, by its name or a decorator's name= argument
+    """
+    by_name = None
+    for node in module.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for decorator in node.decorator_list:
+            if isinstance(decorator, ast.Call):
+                for keyword in decorator.keywords:
+                    if keyword.arg == "name" and isinstance(keyword.value, ast.Constant) and keyword.value.value == tool_name:
+                        return node
+        if node.name == tool_name:
+            by_name = node
+    return by_name
+
+
+def _module_definitions(module: ast.Module) -> Dict[str, ast.AST]:
+    definitions = {}
+    for node in module.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            definitions[node.name] = node
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                definitions[(alias.asname or alias.name).split(".")[0]] = node
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                for name in ast.walk(target):
+                    if isinstance(name, ast.Name):
+                        definitions[name.id] = node
+    return definitions
+
+
+def _used_definitions(tool_node: ast.AST, definitions: Dict[str, ast.AST]) -> List[ast.AST]:
+    """
+    Module-level definitions the tool uses, directly or through other helpers
+    """
+    used: List[ast.AST] = []
+    seen: Set[int] = {id(tool_node)}
+    queue = [tool_node]
+    while queue:
+        node = queue.pop()
+        for name in ast.walk(node):
+            if not isinstance(name, ast.Name):
+                continue
+            definition = definitions.get(name.id)
+            if definition is None or id(definition) in seen:
+                continue
+            seen.add(id(definition))
+            used.append(definition)
+            if not isinstance(definition, (ast.Import, ast.ImportFrom)):
+                queue.append(definition)
+    return used
+
+
+def _strip_docstrings(node: ast.AST):
+    for child in ast.walk(node):
+        if not isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        body = child.body
+        if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+                and isinstance(body[0].value.value, str):
+            child.body = body[1:] or [ast.Expr(ast.Constant(...))]
+
+
+def _strip_body(node: ast.AST):
+    """
+    Keep only the signature of a helper function, and of the methods of a helper class
+    """
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        node.body = [ast.Expr(ast.Constant(...))]
+    elif isinstance(node, ast.ClassDef):
+        for child in node.body:
+            _strip_body(child)
+
+
+def _truncate(text: str, token_budget: int) -> str:
+    limit = token_budget * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    return text[:limit] + "\n# ... source truncated to fit the prompt budget"
@@ -0,0 +1,76 @@
+import math
+from typing import Dict, List
+
+
+def percentile(sorted_values: List[float], p: float) -> float:
+    """
+    Nearest-rank percentile of already sorted values
+
+    Args:
+        sorted_values: Values in ascending order
+        p: Percentile between 0 and 100
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def latency_summary(values: List[float]) -> Dict[str, float]:
+    """
+    Summarize latencies in seconds with mean, max and p50/p95/p99
+    """
+    ordered = sorted(values)
+    return {
+        "mean": sum(ordered) / len(ordered) if ordered else 0.0,
+        "p50": percentile(ordered, 50),
+        "p95": percentile(ordered, 95),
+        "p99": percentile(ordered, 99),
+        "max": ordered[-1] if ordered else 0.0
+    }
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed histogram giving percentiles in constant memory
+
+    Bucket bounds grow by `precision` per bucket, so any reported percentile is
+    within that relative error of the exact value.
+    """
+
+    def __init__(self, precision: float = 0.01, min_value: float = 1e-6):
+        self.log_base = math.log1p(precision)
+        self.min_value = min_value
+        self.buckets: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float):
+        value = max(value, self.min_value)
+        bucket = int(math.log(value / self.min_value) / self.log_base)
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, p: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(p / 100 * self.count))
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                # upper bound of the bucket, capped by the largest value seen
+                return min(self.min_value * math.exp((bucket + 1) * self.log_base), self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max
+        }
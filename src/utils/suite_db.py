@@ -0,0 +1,322 @@
+import datetime
+import json
+import os
+import sqlite3
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional
+from .suite_store import (
+    RULE_RESULT_KEYS, SHARD_SUFFIX, SUITE_TIMESTAMP, TESTCASES_JSON, TESTCASES_JSONL, TIME_KEYS, TOOL_KEYS, VALIDATION_RESULTS_JSON,
+    iter_records, iter_testcases
+)
+
+BATCH_SIZE = 1000
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,                 -- 'suite' or 'validation'
+    server TEXT NOT NULL,
+    folder TEXT,
+    created_at TEXT NOT NULL,           -- ISO 8601, UTC
+    UNIQUE (kind, folder)
+);
+CREATE INDEX IF NOT EXISTS runs_server ON runs (server, kind, created_at);
+
+CREATE TABLE IF NOT EXISTS testcases (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    case_id TEXT NOT NULL,
+    server TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    status TEXT,
+    created_at TEXT NOT NULL,
+    record TEXT NOT NULL,
+    PRIMARY KEY (run_id, position)
+);
+CREATE INDEX IF NOT EXISTS testcases_lookup ON testcases (server, tool, status, created_at);
+CREATE INDEX IF NOT EXISTS testcases_case ON testcases (case_id);
+
+CREATE TABLE IF NOT EXISTS results (
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    case_id TEXT,
+    server TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    passed INTEGER,
+    execution_time REAL,
+    created_at TEXT NOT NULL,
+    record TEXT NOT NULL,
+    PRIMARY KEY (run_id, position)
+);
+CREATE INDEX IF NOT EXISTS results_lookup ON results (server, tool, passed, created_at);
+CREATE INDEX IF NOT EXISTS results_case ON results (case_id);
+
+CREATE TABLE IF NOT EXISTS rule_results (
+    run_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    rule_index INTEGER NOT NULL,
+    rule_type TEXT,
+    passed INTEGER,
+    reason TEXT,
+    PRIMARY KEY (run_id, position, rule_index),
+    FOREIGN KEY (run_id, position) REFERENCES results (run_id, position) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS rule_results_failed ON rule_results (rule_type, passed);
+"""
+
+
+class SuiteDatabase:
+    """
+    Indexed SQLite store for test suites and validation results
+
+    Every suite and every validation run becomes a row of `runs`, its cases
+    and results are inserted in batches within one transaction. The full
+    records are kept as JSON next to the indexed columns, so a run can be
+    exported back to the .logs/<server>_<timestamp>/ JSON layout.
+    """
+
+    def __init__(self, path: str = os.path.join(".logs", "suites.db")):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        # async callers write from worker threads, one at a time
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        # WAL lets readers query while a run is being written
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute("PRAGMA foreign_keys=ON")
+        self.connection.executescript(SCHEMA)
+
+    @classmethod
+    def from_config(cls, db_config: Optional[dict] = None) -> Optional["SuiteDatabase"]:
+        """
+        Open the database of the `suiteDatabase` section of the MCP config, None if it is not configured
+        """
+        if not db_config or not db_config.get("enabled", True):
+            return None
+        return cls(db_config.get("path", os.path.join(".logs", "suites.db")))
+
+    def close(self):
+        self.connection.close()
+
+    @staticmethod
+    def folder_time(folder: Optional[str]) -> str:
+        """
+        Creation time of a `<server>_<timestamp>` or shard folder, the current time for other folders
+        """
+        timestamp = SHARD_SUFFIX.sub("", os.path.basename(os.path.normpath(folder or ""))).rpartition("_")[2]
+        if SUITE_TIMESTAMP.fullmatch(timestamp):
+            # isoformat() leaves out the microseconds when they are zero
+            for layout in ("%Y-%m-%dT%H-%M-%S-%f", "%Y-%m-%dT%H-%M-%S"):
+                try:
+                    return datetime.datetime.strptime(timestamp, layout).isoformat()
+                except ValueError:
+                    continue
+        return datetime.datetime.utcnow().isoformat()
+
+    def _create_run(self, kind: str, server: str, folder: Optional[str]) -> tuple:
+        folder = folder and os.path.abspath(folder)
+        created_at = self.folder_time(folder)
+        # writing the same folder again replaces its previous import
+        self.connection.execute("DELETE FROM runs WHERE kind = ? AND folder = ?", (kind, folder))
+        cursor = self.connection.execute(
+            "INSERT INTO runs (kind, server, folder, created_at) VALUES (?, ?, ?, ?)",
+            (kind, server, folder, created_at)
+        )
+        return cursor.lastrowid, created_at
+
+    def record_suite(self, server: str, testcases: Iterable[dict], folder: Optional[str] = None) -> int:
+        """
+        Store a generated suite
+
+        Returns:
+            Id of the new run
+        """
+        with self.connection:
+            run_id, created_at = self._create_run("suite", server, folder)
+            rows = (
+                (run_id, position, case.get("id"), server, case.get("toolName") or "unknown",
+                 (case.get("expect") or {}).get("status"), created_at, json.dumps(case, ensure_ascii=False))
+                for position, case in enumerate(testcases)
+            )
+            for batch in _batches(rows):
+                self.connection.executemany("INSERT INTO testcases VALUES (?, ?, ?, ?, ?, ?, ?, ?)", batch)
+        return run_id
+
+    def record_results(self, server: str, records: Iterable[dict], folder: Optional[str] = None) -> int:
+        """
+        Store the results of a validation run, with one row per validation rule
+
+        Returns:
+            Id of the new run
+        """
+        with self.connection:
+            run_id, created_at = self._create_run("validation", server, folder)
+            result_rows, rule_rows = [], []
+            for position, record in enumerate(records):
+                if not isinstance(record, dict):
+                    continue
+                rule_results = next((record[key] for key in RULE_RESULT_KEYS if isinstance(record.get(key), list)), [])
+                passed = record.get("passed")
+                if not isinstance(passed, bool):
+                    passed = bool(rule_results) and all(
+                        isinstance(result, dict) and result.get("passed") is not False for result in rule_results
+                    )
+                result_rows.append((
+                    run_id, position, record.get("id"), record.get("server") or server,
+                    next((record[key] for key in TOOL_KEYS if record.get(key)), "unknown"),
+                    int(passed),
+                    next((record[key] for key in TIME_KEYS if isinstance(record.get(key), (int, float))), None),
+                    created_at, json.dumps(record, ensure_ascii=False, default=str)
+                ))
+                for rule_index, result in enumerate(rule_results):
+                    if isinstance(result, dict):
+                        rule = result.get("rule") if isinstance(result.get("rule"), dict) else {}
+                        rule_rows.append((
+                            run_id, position, rule_index, rule.get("type"),
+                            None if result.get("passed") is None else int(bool(result.get("passed"))),
+                            str(result.get("reason") or result.get("message") or "")
+                        ))
+                if len(result_rows) >= BATCH_SIZE:
+                    self._flush_results(result_rows, rule_rows)
+            self._flush_results(result_rows, rule_rows)
+        return run_id
+
+    def _flush_results(self, result_rows: List[tuple], rule_rows: List[tuple]):
+        self.connection.executemany("INSERT INTO results VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", result_rows)
+        self.connection.executemany("INSERT INTO rule_results VALUES (?, ?, ?, ?, ?, ?)", rule_rows)
+        result_rows.clear()
+        rule_rows.clear()
+
+    def import_folder(self, folder: str, server: Optional[str] = None) -> List[int]:
+        """
+        Import the suite and validation results of an existing `<server>_<timestamp>` folder
+
+        Returns:
+            Ids of the runs created
+        """
+        server = server or SHARD_SUFFIX.sub("", os.path.basename(os.path.normpath(folder))).rpartition("_")[0] or "unknown"
+        run_ids = []
+        if any(os.path.isfile(os.path.join(folder, name)) for name in (TESTCASES_JSON, TESTCASES_JSONL)):
+            run_ids.append(self.record_suite(server, iter_testcases(folder), folder))
+        results_path = os.path.join(folder, VALIDATION_RESULTS_JSON)
+        if os.path.isfile(results_path):
+            run_ids.append(self.record_results(server, iter_records(results_path), folder))
+        return run_ids
+
+    def query_cases(
+        self,
+        server: Optional[str] = None,
+        tool: Optional[str] = None,
+        status: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        last_runs: Optional[int] = None
+    ) -> Iterator[dict]:
+        """
+        Test cases matching every given filter, newest run first
+
+        Args:
+            status: Expected status, "success" or "error"
+            since, until: ISO 8601 bounds of the suite creation time
+            last_runs: Only look at the newest suites of each server
+        """
+        yield from self._query("testcases", "suite", {"server": server, "tool": tool, "status": status},
+                               since, until, last_runs)
+
+    def query_results(
+        self,
+        server: Optional[str] = None,
+        tool: Optional[str] = None,
+        passed: Optional[bool] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        last_runs: Optional[int] = None
+    ) -> Iterator[dict]:
+        """
+        Validation results matching every given filter, newest run first
+
+        Args:
+            passed: Only passing (True) or failing (False) cases
+            since, until: ISO 8601 bounds of the validation run time
+            last_runs: Only look at the newest validation runs of each server
+        """
+        yield from self._query("results", "validation", {
+            "server": server, "tool": tool, "passed": None if passed is None else int(passed)
+        }, since, until, last_runs)
+
+    def _query(self, table: str, kind: str, filters: dict, since, until, last_runs) -> Iterator[dict]:
+        conditions, params = [], []
+        for column, value in filters.items():
+            if value is not None:
+                conditions.append(f"t.{column} = ?")
+                params.append(value)
+        if since:
+            conditions.append("t.created_at >= ?")
+            params.append(since)
+        if until:
+            conditions.append("t.created_at <= ?")
+            params.append(until)
+        if last_runs:
+            conditions.append(
+                "t.run_id IN (SELECT id FROM runs r WHERE r.kind = ? AND r.server = t.server "
+                "ORDER BY r.created_at DESC LIMIT ?)"
+            )
+            params.extend([kind, last_runs])
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        cursor = self.connection.execute(
+            f"SELECT t.run_id, t.created_at, t.record FROM {table} t {where} "
+            f"ORDER BY t.created_at DESC, t.run_id DESC, t.position",
+            params
+        )
+        for row in cursor:
+            record = json.loads(row["record"])
+            record.setdefault("run_id", row["run_id"])
+            record.setdefault("created_at", row["created_at"])
+            yield record
+
+    def list_runs(self, server: Optional[str] = None, kind: Optional[str] = None) -> List[dict]:
+        conditions, params = [], []
+        if server:
+            conditions.append("server = ?")
+            params.append(server)
+        if kind:
+            conditions.append("kind = ?")
+            params.append(kind)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self.connection.execute(f"SELECT * FROM runs {where} ORDER BY created_at DESC, id DESC", params)
+        return [dict(row) for row in rows]
+
+    def export_run(self, run_id: int, folder: str) -> str:
+        """
+        Write a run back as testcases.json or validation_results.json
+
+        Returns:
+            Path of the written file
+        """
+        run = self.connection.execute("SELECT kind FROM runs WHERE id = ?", (run_id,)).fetchone()
+        if run is None:
+            raise ValueError(f"No run with id {run_id}")
+        table, filename = ("testcases", TESTCASES_JSON) if run["kind"] == "suite" else ("results", VALIDATION_RESULTS_JSON)
+
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, filename)
+        cursor = self.connection.execute(f"SELECT record FROM {table} WHERE run_id = ? ORDER BY position", (run_id,))
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write("[")
+            for index, row in enumerate(cursor):
+                file.write(",\n" if index else "\n")
+                file.write(row["record"])
+            file.write("\n]\n")
+        print(f"Run {run_id} is exported to {path}")
+        return path
+
+
+def _batches(rows: Iterable[tuple]) -> Iterator[List[tuple]]:
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, BATCH_SIZE))
+        if not batch:
+            return
+        yield batch
@@ -0,0 +1,190 @@
+import datetime
+import json
+import os
+import re
+from typing import Dict, Iterator, List, Optional
+from .json_stream import JSONArrayStreamParser
+
+TESTCASES_JSON = "testcases.json"
+TESTCASES_JSONL = "testcases.jsonl"
+VALIDATION_RESULTS_JSON = "validation_results.json"
+COMPLETED_TOOLS = "completed_tools.jsonl"
+# suite folders are named <server_name>_<timestamp>
+SUITE_TIMESTAMP = re.compile(r"\d{4}-\d{2}-\d{2}T[\d-]+")
+# val-cases --shard folders are named <server_name>_<timestamp>_shard-<i>-of-<N>, so they are not taken for suites
+SHARD_SUFFIX = re.compile(r"_shard-\d+-of-\d+$")
+# field names the validation results have used for the same information
+TOOL_KEYS = ("toolName", "tool_name", "tool")
+TIME_KEYS = ("execution_time", "executionTime", "duration", "elapsed")
+RULE_RESULT_KEYS = ("validation_results", "validationResults", "rule_results")
+
+
+def create_suite_folder(server_name: str, logs_dir: str = ".logs", suffix: str = "") -> str:
+    """
+    Create a new timestamped suite folder for a server, its name ending in `suffix`
+    """
+    current_timestamp = datetime.datetime.utcnow().isoformat()
+    safe_timestamp = current_timestamp.replace(":", "-").replace(".", "-")
+    folder = os.path.join(logs_dir, f'{server_name}_{safe_timestamp}{suffix}')
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+def list_suite_folders(server_name: str, logs_dir: str = ".logs") -> List[str]:
+    """
+    List a server's suite folders, oldest first
+    """
+    if not os.path.isdir(logs_dir):
+        return []
+    prefix = f"{server_name}_"
+    names = [
+        name for name in os.listdir(logs_dir)
+        if name.startswith(prefix) and SUITE_TIMESTAMP.fullmatch(name[len(prefix):])
+    ]
+    # ISO timestamps sort chronologically
+    names.sort(key=lambda name: name[len(prefix):])
+    return [os.path.join(logs_dir, name) for name in names]
+
+
+def suite_server(server_names: List[str], testcase_path: str) -> str:
+    """
+    Server a suite belongs to, from its `<server_name>_<timestamp>` or shard folder, or the only configured server
+
+    Raises:
+        ValueError: The server cannot be told from the folder name
+    """
+    suite_folder = os.path.basename(os.path.normpath(
+        testcase_path if os.path.isdir(testcase_path) else os.path.dirname(os.path.abspath(testcase_path))
+    ))
+    matches = [name for name in server_names if suite_folder.startswith(f"{name}_")]
+    if len(server_names) == 1:
+        matches = list(server_names)
+    if len(matches) != 1:
+        raise ValueError("Cannot tell which server the test cases belong to, please pass --server")
+    return matches[0]
+
+
+def find_unfinished_suite(server_name: str, logs_dir: str = ".logs") -> Optional[str]:
+    """
+    Find the newest suite folder of a server whose generation was interrupted
+
+    A suite is finished once its testcases.json has been written.
+    """
+    for folder in reversed(list_suite_folders(server_name, logs_dir)):
+        if os.path.isfile(os.path.join(folder, TESTCASES_JSONL)):
+            if os.path.isfile(os.path.join(folder, TESTCASES_JSON)):
+                return None
+            return folder
+    return None
+
+
+def iter_testcases(path: str) -> Iterator[dict]:
+    """
+    Iterate over the test cases of a suite without loading the whole suite into memory
+
+    Args:
+        path: testcases.jsonl, testcases.json, or a suite folder (its JSONL file is preferred)
+    """
+    if os.path.isdir(path):
+        jsonl_path = os.path.join(path, TESTCASES_JSONL)
+        path = jsonl_path if os.path.isfile(jsonl_path) else os.path.join(path, TESTCASES_JSON)
+
+    yield from iter_records(path)
+
+
+def iter_records(path: str) -> Iterator[dict]:
+    """
+    Iterate over the records of a JSON array file or a JSONL file in bounded memory
+    """
+    if not path.endswith(".jsonl"):
+        parser = JSONArrayStreamParser(skip_prefix=False)
+        with open(path, 'r', encoding='utf-8') as file:
+            while True:
+                chunk = file.read(1 << 16)
+                if not chunk:
+                    break
+                yield from parser.feed(chunk)
+        if not parser.started:
+            # not a JSON array, fall back to loading the whole document
+            with open(path, 'r', encoding='utf-8') as file:
+                document = json.load(file)
+            yield from document if isinstance(document, list) else [document]
+        return
+
+    with open(path, 'r', encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # last line cut short by a crash
+                continue
+
+
+class TestSuiteWriter:
+    """
+    Append-only JSONL writer for a suite, durable after every tool
+
+    A tool's cases are appended to testcases.jsonl and fsynced before the tool is
+    recorded in completed_tools.jsonl. On resume, cases of tools missing from
+    that index are discarded, so an interrupted tool is regenerated from scratch.
+    """
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.testcases_path = os.path.join(folder, TESTCASES_JSONL)
+        self.index_path = os.path.join(folder, COMPLETED_TOOLS)
+        # test case dicts of the tools already written, keyed by tool name
+        self.completed: Dict[str, List[dict]] = {}
+        self._load()
+        self._testcases_file = open(self.testcases_path, 'a', encoding='utf-8')
+        self._index_file = open(self.index_path, 'a', encoding='utf-8')
+
+    def _load(self):
+        if not os.path.isfile(self.index_path):
+            return
+        completed_tools = set()
+        with open(self.index_path, 'r', encoding='utf-8') as file:
+            for line in file:
+                try:
+                    completed_tools.add(json.loads(line)["tool"])
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    continue
+
+        for case in iter_testcases(self.testcases_path) if os.path.isfile(self.testcases_path) else []:
+            if case.get("toolName") in completed_tools:
+                self.completed.setdefault(case["toolName"], []).append(case)
+
+        # rewrite both files without the partial writes of the interrupted tool
+        self._rewrite(self.testcases_path, [case for cases in self.completed.values() for case in cases])
+        self._rewrite(self.index_path, [{"tool": tool, "count": len(cases)} for tool, cases in self.completed.items()])
+
+    @staticmethod
+    def _rewrite(path: str, records: List[dict]):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as file:
+            for record in records:
+                file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+
+    def write_tool(self, tool_name: str, testcases: List[dict]):
+        """
+        Durably append a finished tool's test cases and mark the tool as completed
+        """
+        for case in testcases:
+            self._testcases_file.write(json.dumps(case, ensure_ascii=False) + "\n")
+        self._testcases_file.flush()
+        os.fsync(self._testcases_file.fileno())
+
+        self._index_file.write(json.dumps({"tool": tool_name, "count": len(testcases)}) + "\n")
+        self._index_file.flush()
+        os.fsync(self._index_file.fileno())
+        self.completed[tool_name] = testcases
+
+    def close(self):
+        self._testcases_file.close()
+        self._index_file.close()
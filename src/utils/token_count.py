@@ -0,0 +1,24 @@
+import json
+import math
+from typing import List
+
+# average characters per token of common BPE tokenizers on English text and code
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens of a text without loading the model's tokenizer
+    """
+    if not text:
+        return 0
+    # CJK characters are usually a token each
+    wide = sum(1 for char in text if ord(char) > 0x2E80)
+    return math.ceil((len(text) - wide) / CHARS_PER_TOKEN) + wide
+
+
+def estimate_message_tokens(messages: List[dict]) -> int:
+    """
+    Estimate the prompt tokens of a chat request
+    """
+    return sum(estimate_tokens(json.dumps(message.get("content"), ensure_ascii=False)) + 4 for message in messages)
@@ -0,0 +1,55 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+from .suite_store import iter_testcases, list_suite_folders
+
+FINGERPRINTS_FILE = "fingerprints.json"
+
+
+def fingerprint_tool(tool, source: str, extra: Optional[dict] = None) -> str:
+    """
+    Hash everything a tool's generated test cases depend on
+
+    Args:
+        tool: Tool definition, its name, description and input schema are hashed
+        source: Tool source code as returned by ReadSourceCode.get_code
+        extra: Generation settings that should also invalidate the cases when changed
+
+    Returns:
+        Hex digest identifying this version of the tool
+    """
+    payload = {
+        "name": tool.name,
+        "description": tool.description,
+        "input_schema": tool.input_schema,
+        "source": source,
+        "extra": extra or {}
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def find_previous_suite(server_name: str, logs_dir: str = ".logs") -> Optional[str]:
+    """
+    Find the newest suite folder of a server that was saved with tool fingerprints
+    """
+    for folder in reversed(list_suite_folders(server_name, logs_dir)):
+        if os.path.isfile(os.path.join(folder, FINGERPRINTS_FILE)):
+            return folder
+    return None
+
+
+def load_previous_suite(folder: str) -> Tuple[Dict[str, str], Dict[str, List[dict]]]:
+    """
+    Load the tool fingerprints and the test cases of a previous suite
+
+    Returns:
+        Fingerprints keyed by tool name, and test case dicts grouped by tool name
+    """
+    with open(os.path.join(folder, FINGERPRINTS_FILE), 'r', encoding='utf-8') as file:
+        fingerprints = json.load(file)
+    cases_by_tool: Dict[str, List[dict]] = {}
+    for case in iter_testcases(folder):
+        cases_by_tool.setdefault(case["toolName"], []).append(case)
+    return fingerprints, cases_by_tool
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List
+from .stats import latency_summary
+
+
+class Tracer:
+    """
+    Collects timing spans of the pipeline phases
+
+    Spans are cheap no-ops until the tracer is enabled. Each asyncio task gets
+    a lane of its own, so concurrent tools and servers show up side by side in
+    trace viewers such as Perfetto or chrome://tracing.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.events: List[tuple] = []   # (name, category, start, duration, lane, attributes)
+        self._origin = time.perf_counter()
+        self._origin_wall = time.time()
+        self._lanes: Dict[int, int] = {}
+
+    def enable(self):
+        self.enabled = True
+        self.events = []
+        self._origin = time.perf_counter()
+        self._origin_wall = time.time()
+
+    @contextmanager
+    def span(self, name: str, category: str = "pipeline", **attributes):
+        """
+        Time the enclosed block
+
+        Yields the span's attribute dict, so values known only afterwards, such
+        as completion tokens, can be added to it.
+        """
+        if not self.enabled:
+            yield attributes
+            return
+        start = time.perf_counter()
+        try:
+            yield attributes
+        except BaseException as error:
+            attributes["error"] = repr(error)
+            raise
+        finally:
+            self.events.append((name, category, start, time.perf_counter() - start, self._lane(), attributes))
+
+    def _lane(self) -> int:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        key = id(task) if task else threading.get_ident()
+        return self._lanes.setdefault(key, len(self._lanes) + 1)
+
+    def to_chrome_trace(self) -> dict:
+        return {
+            "displayTimeUnit": "ms",
+            "traceEvents": [
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": (start - self._origin) * 1e6,
+                    "dur": duration * 1e6,
+                    "pid": os.getpid(),
+                    "tid": lane,
+                    "args": attributes
+                }
+                for name, category, start, duration, lane, attributes in self.events
+            ]
+        }
+
+    def to_otlp(self) -> dict:
+        trace_id = os.urandom(16).hex()
+        spans = []
+        for name, category, start, duration, lane, attributes in self.events:
+            start_ns = int((self._origin_wall + start - self._origin) * 1e9)
+            spans.append({
+                "traceId": trace_id,
+                "spanId": os.urandom(8).hex(),
+                "name": name,
+                "kind": 1,
+                "startTimeUnixNano": str(start_ns),
+                "endTimeUnixNano": str(start_ns + int(duration * 1e9)),
+                "attributes": [
+                    {"key": key, "value": _otlp_value(value)}
+                    for key, value in dict(attributes, category=category, lane=lane).items()
+                ]
+            })
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "mcp-testkit"}}]},
+                "scopeSpans": [{"scope": {"name": "mcp-testkit"}, "spans": spans}]
+            }]
+        }
+
+    def export(self, path: str):
+        """
+        Write the spans as a Chrome trace, or as OTLP JSON if the path ends with .otlp.json
+        """
+        trace = self.to_otlp() if path.endswith(".otlp.json") else self.to_chrome_trace()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(trace, file, ensure_ascii=False, default=str)
+        print(f"Trace with {len(self.events)} spans is saved into {path}")
+
+    def summary(self) -> Dict[str, dict]:
+        groups: Dict[str, List[tuple]] = {}
+        for event in self.events:
+            groups.setdefault(event[0], []).append(event)
+        summary = {}
+        for name, events in groups.items():
+            durations = [event[3] for event in events]
+            summary[name] = {
+                "count": len(events),
+                "total": sum(durations),
+                "errors": sum(1 for event in events if "error" in event[5]),
+                "prompt_tokens": sum(event[5].get("prompt_tokens", 0) for event in events),
+                "completion_tokens": sum(event[5].get("completion_tokens", 0) for event in events),
+                **latency_summary(durations)
+            }
+        return summary
+
+    def print_summary(self):
+        summary = self.summary()
+        if not summary:
+            return
+        print(f"\n{'span':<28}{'count':>7}{'errors':>8}{'total s':>10}{'mean s':>9}{'p95 s':>9}{'max s':>9}{'tokens in/out':>18}")
+        for name, stats in sorted(summary.items(), key=lambda item: item[1]["total"], reverse=True):
+            tokens = f"{stats['prompt_tokens']}/{stats['completion_tokens']}" if stats["prompt_tokens"] else ""
+            print(
+                f"{name:<28}{stats['count']:>7}{stats['errors']:>8}{stats['total']:>10.2f}"
+                f"{stats['mean']:>9.3f}{stats['p95']:>9.3f}{stats['max']:>9.3f}{tokens:>18}"
+            )
+
+
+def _otlp_value(value) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+# process-wide tracer, enabled by the --trace option
+tracer = Tracer()
@@ -0,0 +1,261 @@
+import asyncio
+import json
+import re
+from typing import Callable, Dict, List, Optional
+from ..prompts.val_prompt import val_prompt_eval, val_prompt_eval_batch, val_prompt_tool, val_prompt_tool_batch
+from ..utils.token_count import estimate_tokens
+from ..utils.tracing import tracer
+
+ANSWERS = ("yes", "no")
+
+
+class BatchJudge:
+    """
+    Judges llm validation rules in batches instead of one LLM call per rule
+
+    Items are (tool, input, rule, output) records with an id. They are packed
+    into val_prompt_tool_batch prompts under a token budget, and the answer
+    array is matched back by id. Items missing from a batched answer, or
+    answered with anything but yes/no, are judged again with val_prompt_tool.
+    The final outputs of end-to-end chat sessions are judged the same way,
+    with val_prompt_eval_batch and val_prompt_eval.
+    """
+
+    def __init__(
+        self,
+        llm,
+        token_budget: int = 6000,
+        max_output_chars: int = 2000,
+        max_concurrency: int = 4,
+        scheduler=None
+    ):
+        """
+        Args:
+            llm: Client providing get_response(messages)
+            token_budget: Estimated prompt tokens allowed per batch
+            max_output_chars: Tool outputs longer than this are cut in the middle
+            max_concurrency: Number of judging calls in flight
+            scheduler: LLMScheduler shared with other LLM callers, used instead of max_concurrency
+        """
+        self.llm = llm
+        self.scheduler = scheduler
+        self.token_budget = token_budget
+        self.max_output_chars = max_output_chars
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.calls = 0
+
+    @staticmethod
+    def make_item(case: dict, rule_index: int, rule: dict, output: str) -> dict:
+        """
+        Build the judging item of one llm rule of a case
+        """
+        return {
+            "id": f"{case.get('id')}:{rule_index}",
+            "tool": case.get("toolName"),
+            "input": case.get("input"),
+            "validation_rule": rule.get("value"),
+            "output": output
+        }
+
+    @staticmethod
+    def make_session_item(case: dict, output: str) -> dict:
+        """
+        Build the judging item of a case's end-to-end chat session
+        """
+        expect = case.get("expect") or {}
+        expected = [
+            rule.get("message") or json.dumps(rule.get("value"), ensure_ascii=False)
+            for rule in expect.get("validation_rules") or []
+        ]
+        return {
+            "id": case.get("id"),
+            "query": case.get("query"),
+            "expect_type": expect.get("status", "success"),
+            "expected_output": "; ".join(expected),
+            "output": output
+        }
+
+    def truncate(self, output) -> str:
+        text = output if isinstance(output, str) else json.dumps(output, ensure_ascii=False)
+        if len(text) <= self.max_output_chars:
+            return text
+        half = self.max_output_chars // 2
+        return f"{text[:half]}\n...[{len(text) - 2 * half} characters truncated]...\n{text[-half:]}"
+
+    def pack(self, items: List[dict], batch_prompt: str = val_prompt_tool_batch) -> List[List[dict]]:
+        """
+        Split items into batches whose prompts stay within the token budget
+        """
+        base_tokens = estimate_tokens(batch_prompt)
+        batches, batch, batch_tokens = [], [], base_tokens
+        for item in items:
+            item_tokens = estimate_tokens(json.dumps(item, ensure_ascii=False))
+            if batch and batch_tokens + item_tokens > self.token_budget:
+                batches.append(batch)
+                batch, batch_tokens = [], base_tokens
+            batch.append(item)
+            batch_tokens += item_tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    async def judge(
+        self,
+        items: List[dict],
+        batch_prompt: str = val_prompt_tool_batch,
+        single_prompt: Optional[Callable[[dict], str]] = None
+    ) -> Dict[str, dict]:
+        """
+        Judge every item
+
+        Args:
+            items: Items with an id and an output
+            batch_prompt: Prompt template taking the JSON array of a batch as `items`
+            single_prompt: Builds the prompt of one item, by default with val_prompt_tool
+
+        Returns:
+            {"answer": "yes" | "no", "explanation": ...} keyed by item id, items
+            that could not be judged at all are missing
+        """
+        single_prompt = single_prompt or self.tool_prompt
+        items = [dict(item, output=self.truncate(item["output"])) for item in items]
+        batch_results = await asyncio.gather(
+            *(self._judge_batch(batch, batch_prompt) for batch in self.pack(items, batch_prompt))
+        )
+
+        verdicts: Dict[str, dict] = {}
+        for verdict in batch_results:
+            verdicts.update(verdict)
+
+        retry = [item for item in items if item["id"] not in verdicts]
+        if retry:
+            print(f"Judging {len(retry)} of {len(items)} items individually")
+        single_results = await asyncio.gather(*(self._judge_single(item, single_prompt) for item in retry))
+        for item, verdict in zip(retry, single_results):
+            if verdict:
+                verdicts[item["id"]] = verdict
+        return verdicts
+
+    async def judge_evaluations(self, evaluations: List[tuple]):
+        """
+        Judge the pending llm rules of several cases and record the verdicts
+
+        Args:
+            evaluations: (case, RuleEvaluation, output) of each case
+        """
+        items, targets = [], {}
+        for case, evaluation, output in evaluations:
+            for index, rule in evaluation.pending_llm_rules:
+                item = self.make_item(case, index, rule, output)
+                items.append(item)
+                targets[item["id"]] = (evaluation, index)
+        if not items:
+            return
+
+        verdicts = await self.judge(items)
+        for item_id, (evaluation, index) in targets.items():
+            verdict = verdicts.get(item_id)
+            if verdict:
+                evaluation.set_llm_result(index, verdict["answer"] == "yes", verdict["explanation"])
+            else:
+                evaluation.set_llm_result(index, False, "LLM judging failed")
+        print(f"Judged {len(items)} llm rules with {self.calls} LLM calls")
+
+    async def judge_sessions(self, sessions: List[tuple]) -> Dict[str, dict]:
+        """
+        Judge the final outputs of end-to-end chat sessions against their cases
+
+        Args:
+            sessions: (case, final output) of each chat session
+
+        Returns:
+            Verdicts keyed by case id, cases that could not be judged are missing
+        """
+        items = [self.make_session_item(case, output) for case, output in sessions]
+        if not items:
+            return {}
+        calls = self.calls
+        verdicts = await self.judge(items, val_prompt_eval_batch, self.eval_prompt)
+        print(f"Judged {len(items)} chat sessions with {self.calls - calls} LLM calls")
+        return verdicts
+
+    @staticmethod
+    def tool_prompt(item: dict) -> str:
+        return val_prompt_tool.format(
+            tool_name=item["tool"],
+            input=json.dumps(item["input"], ensure_ascii=False),
+            validation_rule=item["validation_rule"],
+            output=item["output"]
+        )
+
+    @staticmethod
+    def eval_prompt(item: dict) -> str:
+        from jinja2 import Template
+        expected = item["expected_output"]
+        return Template(val_prompt_eval).render(
+            query=item["query"],
+            expect_type=item["expect_type"],
+            expected_output=f"- **Expected Output**: {expected}" if expected else "",
+            output=item["output"]
+        )
+
+    async def _judge_batch(self, batch: List[dict], batch_prompt: str) -> Dict[str, dict]:
+        if len(batch) == 1:
+            # a batch of one is just as expensive as the single prompt
+            return {}
+        prompt = batch_prompt.format(items=json.dumps(batch, indent=2, ensure_ascii=False))
+        try:
+            parsed = self._parse_json(await self._get_response(prompt))
+        except Exception as err:
+            print(f"Batched judging of {len(batch)} items failed: {err}")
+            return {}
+
+        ids = {item["id"] for item in batch}
+        verdicts = {}
+        for entry in parsed if isinstance(parsed, list) else []:
+            verdict = self._verdict(entry)
+            if verdict and isinstance(entry, dict) and entry.get("id") in ids:
+                verdicts[entry["id"]] = verdict
+        return verdicts
+
+    async def _judge_single(self, item: dict, single_prompt: Callable[[dict], str]) -> Optional[dict]:
+        try:
+            verdict = self._verdict(self._parse_json(await self._get_response(single_prompt(item))))
+        except Exception as err:
+            print(f"Judging {item['id']} failed: {err}")
+            return None
+        if not verdict:
+            print(f"Judging {item['id']} gave an ambiguous answer")
+        return verdict
+
+    async def _get_response(self, prompt: str) -> str:
+        messages = [{"role": "user", "content": prompt}]
+        if self.scheduler:
+            self.calls += 1
+            return await self._traced(prompt, self.scheduler.get_response(messages))
+        async with self.semaphore:
+            self.calls += 1
+            return await self._traced(prompt, asyncio.to_thread(self.llm.get_response, messages))
+
+    @staticmethod
+    async def _traced(prompt: str, call) -> str:
+        if not tracer.enabled:
+            return await call
+        with tracer.span("llm.judge", "llm", prompt_tokens=estimate_tokens(prompt)) as span:
+            response = await call
+            span["completion_tokens"] = estimate_tokens(response or "")
+            return response
+
+    @staticmethod
+    def _parse_json(response: str):
+        json_match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', response)
+        return json.loads(json_match.group(1) if json_match else response)
+
+    @staticmethod
+    def _verdict(entry) -> Optional[dict]:
+        if not isinstance(entry, dict):
+            return None
+        answer = str(entry.get("answer", "")).strip().lower()
+        if answer not in ANSWERS:
+            return None
+        return {"answer": answer, "explanation": entry.get("explanation", "")}
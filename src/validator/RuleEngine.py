@@ -0,0 +1,235 @@
+import json
+from typing import Any, Dict, List, Optional
+from jsonschema import SchemaError
+from jsonschema.validators import validator_for
+from ..utils.tracing import tracer
+
+_UNPARSED = object()
+_NOT_JSON = object()
+
+
+class ParsedOutput:
+    """
+    Tool output shared by all rules of a case, parsed as JSON at most once
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self._json = _UNPARSED
+
+    @property
+    def json(self) -> Any:
+        if self._json is _UNPARSED:
+            try:
+                self._json = json.loads(self.text)
+            except (TypeError, ValueError):
+                self._json = _NOT_JSON
+        return self._json
+
+
+class ContainsMatcher:
+    """
+    Finds which needles of a case occur in the output
+
+    A case has a handful of needles, for which one substring check each is
+    faster than any combined pattern.
+    """
+
+    def __init__(self, needles: List[str]):
+        self.needles = list(dict.fromkeys(needle for needle in needles if needle))
+
+    def find(self, text: str) -> set:
+        return {needle for needle in self.needles if needle in text}
+
+
+class CompiledRules:
+    """
+    Validation rules of one case, compiled once when the suite is loaded
+    """
+
+    def __init__(self, rules: List[dict], engine: "RuleEngine"):
+        self.rules = rules
+        self.checks = []        # (rule index, check function) of deterministic rules
+        self.llm_rules = []     # (rule index, rule) of llm rules
+        needles = []
+        for index, rule in enumerate(rules):
+            rule_type = rule.get("type")
+            if rule_type == "contains":
+                needle = engine.normalize_text(rule.get("value"))
+                needles.append(needle)
+                self.checks.append((index, self._contains_check(needle)))
+            elif rule_type == "equals":
+                self.checks.append((index, self._equals_check(rule.get("value"))))
+            elif rule_type == "schema":
+                self.checks.append((index, self._schema_check(engine.schema_validator(rule.get("value")))))
+            elif rule_type == "llm":
+                self.llm_rules.append((index, rule))
+            else:
+                self.checks.append((index, self._unknown_check(rule_type)))
+        self.matcher = ContainsMatcher(needles)
+
+    @staticmethod
+    def _contains_check(needle: str):
+        def check(output: ParsedOutput, found: set):
+            if needle in found:
+                return True, ""
+            return False, f"Response does not contain '{needle}'"
+        return check
+
+    @staticmethod
+    def _equals_check(expected: Any):
+        def check(output: ParsedOutput, found: set):
+            if isinstance(expected, str):
+                if output.text.strip() == expected.strip():
+                    return True, ""
+            elif output.json is not _NOT_JSON and output.json == expected:
+                return True, ""
+            return False, f"Response does not equal {json.dumps(expected, ensure_ascii=False)}"
+        return check
+
+    @staticmethod
+    def _schema_check(validator):
+        def check(output: ParsedOutput, found: set):
+            if isinstance(validator, str):
+                return False, validator
+            if output.json is _NOT_JSON:
+                return False, "Response is not valid JSON"
+            error = next(validator.iter_errors(output.json), None)
+            if error is None:
+                return True, ""
+            return False, f"Response does not match schema: {error.message}"
+        return check
+
+    @staticmethod
+    def _unknown_check(rule_type: str):
+        def check(output: ParsedOutput, found: set):
+            return False, f"Unknown validation rule type: {rule_type}"
+        return check
+
+    def evaluate(self, output: str) -> "RuleEvaluation":
+        """
+        Evaluate the deterministic rules against a tool output
+
+        LLM rules are only handed back for judging when every deterministic rule
+        passed, otherwise they are marked as skipped.
+        """
+        with tracer.span("rules.evaluate", rules=len(self.checks)):
+            parsed = ParsedOutput(output if isinstance(output, str) else json.dumps(output, ensure_ascii=False))
+            found = self.matcher.find(parsed.text)
+            results: List[Optional[dict]] = [None] * len(self.rules)
+            failed = False
+            for index, check in self.checks:
+                passed, reason = check(parsed, found)
+                failed = failed or not passed
+                results[index] = {"rule": self.rules[index], "passed": passed, "reason": reason}
+
+        pending = []
+        for index, rule in self.llm_rules:
+            if failed:
+                results[index] = {"rule": rule, "passed": None, "reason": "Skipped, a deterministic rule already failed"}
+            else:
+                pending.append((index, rule))
+        return RuleEvaluation(self.rules, results, failed, pending)
+
+
+class RuleEvaluation:
+    """
+    Outcome of a case's deterministic rules
+
+    Attributes:
+        rules: Validation rules of the case
+        results: One result per rule in rule order, None for llm rules still to be judged
+        failed: Whether a deterministic rule failed
+        pending_llm_rules: (rule index, rule) of the llm rules that still need judging
+    """
+
+    def __init__(self, rules: List[dict], results: List[Optional[dict]], failed: bool, pending_llm_rules: List[tuple]):
+        self.rules = rules
+        self.results = results
+        self.failed = failed
+        self.pending_llm_rules = pending_llm_rules
+
+    def set_llm_result(self, index: int, passed: bool, reason: str):
+        self.results[index] = {"rule": self.rules[index], "passed": passed, "reason": reason}
+
+    def skip_llm_rules(self, reason: str):
+        """
+        Mark the pending llm rules as skipped, for a case that failed some other way
+        """
+        for index, rule in self.pending_llm_rules:
+            self.results[index] = {"rule": rule, "passed": None, "reason": reason}
+        self.pending_llm_rules = []
+
+    @property
+    def passed(self) -> Optional[bool]:
+        """
+        False once any rule failed, None while llm rules are pending, else True
+        """
+        if any(result and result["passed"] is False for result in self.results):
+            return False
+        if any(result is None for result in self.results):
+            return None
+        return True
+
+
+class RuleEngine:
+    """
+    Compiles the validation rules of a whole suite, sharing one validator per distinct JSON Schema
+    """
+
+    def __init__(self):
+        self._schema_validators: Dict[str, Any] = {}
+        self.compiled: Dict[str, CompiledRules] = {}
+
+    @staticmethod
+    def normalize_text(value: Any) -> str:
+        """
+        Turn a contains value into the substring to look for
+
+        Prompts ask for values such as `" 'Python 3.11 installed' "`, the outer
+        whitespace and single quotes are not part of the expected text.
+        """
+        if not isinstance(value, str):
+            return json.dumps(value, ensure_ascii=False)
+        text = value.strip()
+        if len(text) >= 2 and text[0] == text[-1] == "'":
+            text = text[1:-1].strip()
+        return text
+
+    def schema_validator(self, schema: Any):
+        """
+        Return the cached validator for a schema, or an error message if the schema is invalid
+        """
+        if isinstance(schema, str):
+            try:
+                schema = json.loads(schema)
+            except ValueError:
+                return "Validation rule schema is not valid JSON"
+        key = json.dumps(schema, sort_keys=True)
+        if key not in self._schema_validators:
+            try:
+                validator_class = validator_for(schema)
+                validator_class.check_schema(schema)
+                self._schema_validators[key] = validator_class(schema)
+            except (SchemaError, TypeError) as error:
+                self._schema_validators[key] = f"Validation rule schema is invalid: {getattr(error, 'message', error)}"
+        return self._schema_validators[key]
+
+    def compile_case(self, case: dict) -> CompiledRules:
+        rules = (case.get("expect") or {}).get("validation_rules") or []
+        compiled = CompiledRules(rules, self)
+        if case.get("id"):
+            self.compiled[case["id"]] = compiled
+        return compiled
+
+    def compile_suite(self, cases: List[dict]) -> Dict[str, CompiledRules]:
+        """
+        Compile every case of a suite
+
+        Returns:
+            Compiled rules keyed by case id
+        """
+        for case in cases:
+            self.compile_case(case)
+        print(f"Compiled validation rules of {len(cases)} cases, {len(self._schema_validators)} distinct schemas")
+        return self.compiled
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+from ..reporter.Reporter import load_report, server_from_path
+from ..utils.suite_store import TESTCASES_JSON, VALIDATION_RESULTS_JSON, create_suite_folder, iter_records, iter_testcases
+
+
+def parse_shard(spec: str) -> Tuple[int, int]:
+    """
+    Parse an `i/N` shard spec, shards are numbered from 1 to N
+
+    Returns:
+        (index, count) with a 0-based index
+    """
+    try:
+        index, count = (int(part) for part in spec.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/N, got {spec!r}")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Shard {spec} is out of range, expected 1 <= i <= N")
+    return index - 1, count
+
+
+def stable_hash(case_id: str) -> int:
+    """
+    Hash of a case id that is the same in every process, unlike hash()
+    """
+    return int.from_bytes(hashlib.sha256(str(case_id).encode('utf-8')).digest()[:8], "big")
+
+
+def assign_shards(cases: List[dict], count: int, tool_times: Optional[Dict[str, float]] = None) -> List[int]:
+    """
+    Assign every case to one of `count` shards, the same way on every node
+
+    Without history, a case goes to the shard its id hashes to. With the mean
+    execution time of each tool from a previous run, cases are placed
+    longest first onto the least loaded shard; tools missing from the history
+    count as the median known time.
+
+    Returns:
+        Shard index of each case, in the order of `cases`
+    """
+    if not tool_times:
+        return [stable_hash(case.get("id")) % count for case in cases]
+
+    known = sorted(tool_times.values())
+    default = known[len(known) // 2]
+    costs = [tool_times.get(case.get("toolName"), default) for case in cases]
+    # the hash breaks ties, so the order does not depend on the order of the suite file
+    order = sorted(range(len(cases)), key=lambda index: (-costs[index], stable_hash(cases[index].get("id"))))
+
+    loads = [0.0] * count
+    shards = [0] * len(cases)
+    for index in order:
+        shard = min(range(count), key=lambda candidate: (loads[candidate], candidate))
+        shards[index] = shard
+        loads[shard] += costs[index]
+    return shards
+
+
+def load_tool_times(path: str) -> Dict[str, float]:
+    """
+    Mean execution time of each tool from previous validation results or their report.json
+    """
+    report = load_report(path)
+    times = {}
+    for server_report in report.get("servers", {}).values():
+        for tool, stats in server_report.get("tools", {}).items():
+            mean = stats.get("execution_time", {}).get("mean")
+            if mean:
+                times[tool] = mean
+    return times
+
+
+def write_shard(testcase_path: str, spec: str, history: Optional[str] = None) -> str:
+    """
+    Write the cases of one shard into a results folder of its own
+
+    Args:
+        testcase_path: testcases.json, testcases.jsonl or their suite folder
+        spec: Shard as `i/N`
+        history: Previous validation results or report.json to balance shards by tool execution time
+
+    Returns:
+        Path of the shard's testcases file
+    """
+    index, count = parse_shard(spec)
+    cases = list(iter_testcases(testcase_path))
+    tool_times = {}
+    if history:
+        tool_times = load_tool_times(history)
+        if not tool_times:
+            print(f"No execution times found in {history}, sharding by case id only")
+    shards = assign_shards(cases, count, tool_times)
+    selected = [case for case, shard in zip(cases, shards) if shard == index]
+
+    # val-cases writes its results next to the cases, so every shard gets a folder of its own
+    suite_folder = testcase_path if os.path.isdir(testcase_path) else os.path.dirname(os.path.abspath(testcase_path))
+    server = server_from_path(os.path.join(suite_folder, TESTCASES_JSON))
+    if server != "unknown":
+        # the suffix keeps a shard from being taken for a suite of the server by --incremental or the budget
+        folder = create_suite_folder(server, os.path.dirname(suite_folder), f"_shard-{index + 1}-of-{count}")
+    else:
+        folder = os.path.join(suite_folder, f"shard-{index + 1}-of-{count}")
+        os.makedirs(folder, exist_ok=True)
+    shard_path = os.path.join(folder, TESTCASES_JSON)
+    with open(shard_path, 'w', encoding='utf-8') as file:
+        json.dump(selected, file, ensure_ascii=False, indent=4)
+    print(f"Shard {index + 1}/{count} has {len(selected)} of {len(cases)} test cases, saved into {shard_path}")
+    return shard_path
+
+
+def merge_results(paths: List[str], output: Optional[str] = None) -> str:
+    """
+    Combine the validation results of several shards into one validation_results.json
+
+    Records are streamed from each file, so memory does not grow with the
+    suite. A case reported by more than one shard is kept once. Records
+    without a server get the one their shard's results folder is named after.
+
+    Args:
+        paths: Validation results of the shards (JSON array or JSONL)
+        output: Merged file, by default validation_results.json in a new folder of the shards' server
+
+    Returns:
+        Path of the merged file
+    """
+    servers = {server_from_path(path) for path in paths}
+    if not output:
+        server = servers.pop() if len(servers) == 1 else "unknown"
+        output = os.path.join(
+            create_suite_folder(server) if server != "unknown" else os.getcwd(), VALIDATION_RESULTS_JSON
+        )
+    if os.path.abspath(output) in {os.path.abspath(path) for path in paths}:
+        raise ValueError("The merged file must not overwrite one of the shard results")
+
+    seen = set()
+    total = 0
+    with open(output, 'w', encoding='utf-8') as file:
+        file.write("[")
+        for path in paths:
+            server = server_from_path(path)
+            count = 0
+            for record in iter_records(path):
+                if not isinstance(record, dict):
+                    continue
+                case_id = record.get("id")
+                if case_id is not None:
+                    if case_id in seen:
+                        print(f"Case {case_id} appears in more than one shard, keeping the first result")
+                        continue
+                    seen.add(case_id)
+                if server != "unknown":
+                    record.setdefault("server", server)
+                file.write(",\n" if total else "\n")
+                json.dump(record, file, ensure_ascii=False)
+                total += 1
+                count += 1
+            print(f"Merged {count} results from {path}")
+        file.write("\n]\n")
+    print(f"{total} validation results are saved into {output}")
+    return output
@@ -0,0 +1,279 @@
+import asyncio
+import json
+import os
+import re
+import time
+from typing import Dict, List, Optional
+from ..client.Client import Configuration
+from ..client.MCPClientPool import MCPClientPool, ToolCallTimeout
+from ..llm.LLM import LLMClient
+from ..llm.LLMCache import CachedLLMClient
+from ..llm.LLMScheduler import LLMScheduler
+from ..prompts.val_prompt import val_prompt_chat
+from ..utils.suite_db import SuiteDatabase
+from ..utils.suite_store import VALIDATION_RESULTS_JSON, iter_testcases, suite_server
+from ..utils.tracing import tracer
+from .BatchJudge import BatchJudge
+from .RuleEngine import RuleEngine
+
+
+def tool_output(result) -> str:
+    """
+    Text of a call_tool result
+    """
+    content = getattr(result, "content", None)
+    if content is None:
+        return result if isinstance(result, str) else json.dumps(result, ensure_ascii=False, default=str)
+    return "\n".join(getattr(item, "text", "") for item in content)
+
+
+class SuiteValidator:
+    """
+    Runs a generated suite against its MCP server and checks every case's expectations
+
+    Cases run on an MCPClientPool, so several sessions execute tools at once
+    and the callTimeout, suiteTimeout and maxRestarts settings apply. The
+    validation rules of the whole suite are compiled once by RuleEngine, and
+    the llm rules left after the deterministic checks are judged in batches
+    by BatchJudge. End to end, the query of each case is also put to an LLM
+    chat session that calls the server's tools through the same pool, and the
+    final answers are judged in batches with val_prompt_eval_batch. Results
+    are written to validation_results.json next to the test cases, and to
+    the configured suiteDatabase.
+    """
+
+    def __init__(
+        self,
+        api_key: str = None,
+        config_path: str = None,
+        testcase_path: str = None,
+        server_name: Optional[str] = None,
+        llm=None
+    ):
+        """
+        Args:
+            api_key: API key for the language model
+            config_path: Path to the MCP config
+            testcase_path: testcases.json, testcases.jsonl or their suite folder
+            server_name: Server the cases belong to, by default the one the suite folder is named after
+            llm: Client judging llm rules, by default the configured LLMClient behind the LLM cache
+        """
+        self.config = Configuration().load_config(config_path)
+        self.testcase_path = testcase_path
+        self.server_name = server_name or suite_server(list(self.config["mcpServers"]), testcase_path)
+        self.llm = llm or CachedLLMClient.from_config(LLMClient(api_key), self.config.get("llmCache"))
+        self.scheduler = LLMScheduler.from_config(
+            self.llm, self.config.get("maxConcurrency", 4), self.config.get("rateLimits")
+        )
+        self.judge = BatchJudge(self.llm, scheduler=self.scheduler)
+        # sessions executing cases in parallel, each one a server process for stdio servers
+        self.sessions = self.config.get("validationSessions", 4)
+        end_to_end = self.config.get("endToEnd") or {}
+        self.end_to_end = end_to_end.get("enabled", True)
+        # tool calls allowed in one chat session before its last answer is taken as final
+        self.max_tool_calls = end_to_end.get("maxToolCalls", 5)
+        self.validated = 0
+        self.timeouts = 0
+
+    async def run(self) -> str:
+        """
+        Validate every case of the suite
+
+        Returns:
+            Path of the validation results
+        """
+        cases = list(iter_testcases(self.testcase_path))
+        print(f"Validating {len(cases)} test cases of {self.server_name}")
+        records = await self.validate(cases)
+        self.validated = len(records)
+
+        suite_folder = self.testcase_path if os.path.isdir(self.testcase_path) else os.path.dirname(self.testcase_path)
+        valpath = os.path.join(suite_folder, VALIDATION_RESULTS_JSON)
+        with open(valpath, 'w', encoding='utf-8') as file:
+            json.dump(records, file, ensure_ascii=False, indent=4, default=str)
+        passed = sum(1 for record in records if record.get("passed"))
+        print(f"{passed}/{len(records)} test cases passed, validation results are saved into {valpath}")
+        await self.record_results(records, suite_folder)
+        return valpath
+
+    async def record_results(self, records: List[dict], folder: str):
+        """
+        Store the validation results in the suite database without blocking the event loop
+        """
+        suite_db = SuiteDatabase.from_config(self.config.get("suiteDatabase"))
+        if not suite_db:
+            return
+        try:
+            run_id = await asyncio.to_thread(suite_db.record_results, self.server_name, records, folder)
+        finally:
+            suite_db.close()
+        print(f"{self.server_name} validation results are stored as run {run_id} in {suite_db.path}")
+
+    async def validate(self, cases: List[dict]) -> List[dict]:
+        """
+        Execute the cases and check their expected status and validation rules
+
+        Returns:
+            One validation record per case, in the order of `cases`
+        """
+        compiled = RuleEngine().compile_suite(cases)
+
+        async def execute(client, case: dict):
+            start = time.perf_counter()
+            result = await client.execute_tool(case["toolName"], case.get("input") or {})
+            return result, time.perf_counter() - start
+
+        pool = MCPClientPool.from_config(self.server_name, self.config, self.sessions)
+        async with pool:
+            with tracer.span("suite.execute", server=self.server_name, cases=len(cases)):
+                outcomes = await pool.run(cases, execute)
+            sessions = {}
+            if self.end_to_end:
+                with tracer.span("suite.end_to_end", server=self.server_name):
+                    sessions = await self.run_sessions(pool, cases)
+            self.timeouts = pool.timeouts
+
+        evaluations, records, checked = [], [], []
+        for case, outcome in zip(cases, outcomes):
+            record = {"id": case["id"], "toolName": case["toolName"], "server": self.server_name}
+            records.append(record)
+            if isinstance(outcome, ToolCallTimeout):
+                record.update(passed=False, timeout=True, error=str(outcome))
+                continue
+            if outcome is None:
+                record.update(passed=False, error="Tool call failed")
+                continue
+            result, record["execution_time"] = outcome
+            output = tool_output(result)
+            record["output"] = output
+            expected = (case.get("expect") or {}).get("status", "success")
+            actual = "error" if getattr(result, "isError", False) else "success"
+            evaluation = compiled[case["id"]].evaluate(output)
+            checked.append((record, evaluation, expected, actual))
+            # a case with the wrong status has failed already, its llm rules are not worth judging
+            if expected == actual:
+                evaluations.append((case, evaluation, output))
+            else:
+                evaluation.skip_llm_rules(f"Skipped, expected {expected} but got {actual}")
+
+        # cases that failed without the LLM, their end-to-end sessions are not judged either
+        failed = {record["id"] for record in records if record.get("passed") is False}
+        failed.update(
+            record["id"] for record, evaluation, expected, actual in checked
+            if expected != actual or evaluation.passed is False
+        )
+        answered = [
+            (case, sessions[case["id"]]["output"]) for case in cases
+            if case["id"] not in failed and sessions.get(case["id"], {}).get("output")
+        ]
+        with tracer.span("suite.judge", server=self.server_name, sessions=len(answered)):
+            _, verdicts = await asyncio.gather(
+                self.judge.judge_evaluations(evaluations),
+                self.judge.judge_sessions(answered)
+            )
+
+        for record, evaluation, expected, actual in checked:
+            record["validation_results"] = evaluation.results + [{
+                "rule": {"type": "status", "value": expected},
+                "passed": expected == actual,
+                "reason": f"Expected {expected}, got {actual}"
+            }]
+            record["passed"] = bool(evaluation.passed) and expected == actual
+
+        for case, record in zip(cases, records):
+            session = sessions.get(case["id"])
+            if session is None:
+                continue
+            verdict = verdicts.get(case["id"])
+            if case["id"] in failed:
+                passed, reason = None, "Skipped, the case already failed"
+            elif verdict:
+                passed, reason = verdict["answer"] == "yes", verdict["explanation"]
+            else:
+                passed, reason = False, session.get("error") or "LLM judging failed"
+            record["end_to_end"] = session
+            record.setdefault("validation_results", []).append({
+                "rule": {"type": "end_to_end", "value": case["query"]},
+                "passed": passed,
+                "reason": reason
+            })
+            record["passed"] = record["passed"] and passed
+        return records
+
+    async def run_sessions(self, pool: MCPClientPool, cases: List[dict]) -> Dict[str, dict]:
+        """
+        Put the query of every case to an LLM chat session that calls the server's tools
+
+        Returns:
+            The session's final `output` and its `tool_calls`, and an `error` if it
+            failed, keyed by case id
+        """
+        queried = [case for case in cases if case.get("query")]
+        if not queried:
+            return {}
+        try:
+            tools = await pool.submit({"id": "list_tools"}, lambda client, _: client.list_tools())
+        except Exception as error:
+            print(f"[{self.server_name}] Skipping end-to-end validation, listing tools failed: {error}")
+            return {}
+        system_prompt = val_prompt_chat.format(tools_description="\n".join(tool.format_for_llm() for tool in tools))
+
+        # like their tool calls, cases that are not parallel safe run on their own afterwards
+        parallel = [case for case in queried if case.get("parallelSafe", True)]
+        serial = [case for case in queried if not case.get("parallelSafe", True)]
+        print(f"Running {len(queried)} end-to-end chat sessions")
+        results = await asyncio.gather(*(self.chat(pool, system_prompt, case) for case in parallel))
+        for case in serial:
+            results.append(await self.chat(pool, system_prompt, case))
+        return {case["id"]: result for case, result in zip(parallel + serial, results)}
+
+    async def chat(self, pool: MCPClientPool, system_prompt: str, case: dict) -> dict:
+        """
+        Chat about a case's query until the LLM answers without calling a tool
+        """
+        messages = [{"role": "system", "content": system_prompt}, {"role": "user", "content": case["query"]}]
+        tool_calls = []
+        with tracer.span("chat.session", server=self.server_name, case=case["id"]) as span:
+            try:
+                while True:
+                    response = await self.scheduler.get_response(messages)
+                    call = self.parse_tool_call(response)
+                    if call is None or len(tool_calls) >= self.max_tool_calls:
+                        return {"output": response, "tool_calls": tool_calls}
+                    tool_calls.append(call)
+                    span["tool_calls"] = len(tool_calls)
+                    messages.append({"role": "assistant", "content": response})
+                    messages.append({"role": "system", "content": await self.call_tool(pool, case, call)})
+            except Exception as error:
+                return {"output": None, "tool_calls": tool_calls, "error": f"Chat session failed: {error}"}
+
+    async def call_tool(self, pool: MCPClientPool, case: dict, call: dict) -> str:
+        """
+        Execute a tool call of a chat session on the pool, and describe its result for the LLM
+        """
+        async def execute(client, _):
+            with tracer.span("tool.execute", "mcp", tool=call["tool"]):
+                return await client.execute_tool(call["tool"], call["arguments"])
+
+        try:
+            result = await pool.submit({"id": case["id"], "toolName": call["tool"]}, execute)
+        except Exception as error:
+            return f"Error executing tool: {error}"
+        return f"Tool execution result: {tool_output(result)}"
+
+    @staticmethod
+    def parse_tool_call(response: Optional[str]) -> Optional[dict]:
+        """
+        The {"tool", "arguments"} object of a response that calls a tool, None for a final answer
+        """
+        if not response:
+            return None
+        json_match = re.search(r'```(?:json)?\s*([\s\S]*?)\s*```', response)
+        try:
+            call = json.loads(json_match.group(1) if json_match else response.strip())
+        except ValueError:
+            return None
+        if not isinstance(call, dict) or not isinstance(call.get("tool"), str):
+            return None
+        arguments = call.get("arguments") or {}
+        return {"tool": call["tool"], "arguments": arguments} if isinstance(arguments, dict) else None
@@ -0,0 +1,71 @@
+import asyncio
+import json
+import re
+import pytest
+from src.validator.BatchJudge import BatchJudge
+
+
+class ScriptedLLM:
+    """
+    Answers batched prompts for every item but the ones in `skip`, and single prompts with yes
+    """
+
+    def __init__(self, skip=()):
+        self.skip = set(skip)
+        self.prompts = []
+
+    def get_response(self, messages):
+        prompt = messages[-1]["content"]
+        self.prompts.append(prompt)
+        batch = re.search(r"(\[\n  \{[\s\S]*?\n\])", prompt)
+        if batch:
+            return json.dumps([
+                {"id": item["id"], "answer": "no", "explanation": "Batched"}
+                for item in json.loads(batch.group(1)) if item["id"] not in self.skip
+            ])
+        return '```json\n{"answer": "yes", "explanation": "Single"}\n```'
+
+
+def rule_items(count):
+    return [
+        {"id": f"case:{i}", "tool": "tool", "input": {"i": i}, "validation_rule": "Looks fine", "output": "out"}
+        for i in range(count)
+    ]
+
+
+def test_items_are_packed_within_the_token_budget():
+    judge = BatchJudge(ScriptedLLM(), token_budget=1000)
+    batches = judge.pack(rule_items(50))
+    assert len(batches) > 1
+    assert [item for batch in batches for item in batch] == rule_items(50)
+
+
+def test_missing_items_are_judged_one_by_one():
+    llm = ScriptedLLM(skip={"case:1"})
+    verdicts = asyncio.run(BatchJudge(llm).judge(rule_items(3)))
+    assert verdicts["case:0"] == {"answer": "no", "explanation": "Batched"}
+    assert verdicts["case:1"] == {"answer": "yes", "explanation": "Single"}
+    assert len(llm.prompts) == 2
+
+
+def test_long_outputs_are_cut_in_the_middle():
+    judge = BatchJudge(ScriptedLLM(), max_output_chars=10)
+    assert judge.truncate("a" * 5 + "b" * 20 + "c" * 5) == "aaaaa\n...[20 characters truncated]...\nccccc"
+
+
+def test_sessions_are_judged_with_the_eval_prompts():
+    pytest.importorskip("jinja2")
+    llm = ScriptedLLM(skip={"2"})
+    cases = [
+        {"id": str(i), "query": f"query {i}", "expect": {"status": "success", "validation_rules": [
+            {"type": "contains", "value": "x", "message": "Mentions x"}
+        ]}}
+        for i in range(3)
+    ]
+    verdicts = asyncio.run(BatchJudge(llm).judge_sessions([(case, "final answer") for case in cases]))
+    assert {case_id: verdict["explanation"] for case_id, verdict in verdicts.items()} == {
+        "0": "Batched", "1": "Batched", "2": "Single"
+    }
+    assert "chat session" in llm.prompts[0]
+    assert "- **Expected Output**: Mentions x" in llm.prompts[1]
+    assert "- **User Query**: query 2" in llm.prompts[1]
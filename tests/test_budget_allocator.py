@@ -0,0 +1,83 @@
+from types import SimpleNamespace
+import pytest
+from src.test_generator.BudgetAllocator import BudgetAllocator
+
+
+@pytest.mark.parametrize("total, weights, low, high", [
+    (10, [1, 1], 1, 10),
+    (30, [1, 2, 3], 2, 20),
+    (7, [5, 1, 1, 1], 1, 4),
+    (100, [1.5, 0.2, 3.3, 1, 1, 7], 2, 30),
+    (4, [1, 1, 1, 1], 1, 1),
+    (6, [1, 1, 20], 2, 3),
+])
+def test_distribute_hits_the_total_within_bounds(total, weights, low, high):
+    counts = BudgetAllocator._distribute(total, weights, low, high)
+    assert len(counts) == len(weights)
+    assert sum(counts) == max(low * len(weights), min(total, high * len(weights)))
+    assert all(low <= count <= high for count in counts)
+
+
+def test_distribute_follows_the_weights():
+    assert BudgetAllocator._distribute(12, [1, 2, 3], 0, 12) == [2, 4, 6]
+
+
+def test_distribute_gives_clamped_shares_to_the_others():
+    assert BudgetAllocator._distribute(20, [1, 1, 100], 1, 10) == [5, 5, 10]
+
+
+def test_distribute_takes_an_overshoot_back_from_clamped_shares():
+    assert BudgetAllocator._distribute(6, [1, 1, 20], 2, 3) == [2, 2, 2]
+
+
+def test_distribute_clamps_the_total():
+    assert BudgetAllocator._distribute(100, [1, 1], 1, 5) == [5, 5]
+    assert BudgetAllocator._distribute(0, [1, 1], 2, 5) == [2, 2]
+
+
+def test_schema_complexity_counts_constraints_and_nesting():
+    flat = {"properties": {"a": {"type": "string"}}}
+    constrained = {"properties": {"a": {"type": "string", "enum": ["x"], "maxLength": 3}}, "required": ["a"]}
+    nested = {"properties": {"a": {"type": "object", "properties": {"b": {"type": "string"}}}}}
+    assert BudgetAllocator.schema_complexity(flat) == 1
+    assert BudgetAllocator.schema_complexity(constrained) == 2.5
+    assert BudgetAllocator.schema_complexity(nested) == 2
+    assert BudgetAllocator.schema_complexity(None) == 0
+
+
+def test_allocate_keeps_the_average_per_tool(tmp_path):
+    allocator = BudgetAllocator(min_tests=1, history=str(tmp_path / "missing.json"))
+    tools = [
+        SimpleNamespace(name="simple", input_schema={}),
+        SimpleNamespace(name="complex", input_schema={
+            "properties": {name: {"type": "integer", "minimum": 0} for name in "abcdef"}
+        })
+    ]
+    allocation = allocator.allocate(tools, 10, "server")
+    assert sum(allocation.values()) == 20
+    assert allocation["complex"] > allocation["simple"]
+
+
+def test_allocate_stays_within_the_token_budget(tmp_path):
+    allocator = BudgetAllocator(
+        min_tests=1, token_budget=2000, tokens_per_case=100, prompt_tokens=500,
+        history=str(tmp_path / "missing.json")
+    )
+    tools = [SimpleNamespace(name=f"tool{i}", input_schema={}) for i in range(2)]
+    assert sum(allocator.allocate(tools, 10, "server").values()) == 10
+    assert allocator.remaining_tokens == 0
+
+
+def test_reserved_budgets_do_not_depend_on_the_order_servers_allocate(tmp_path):
+    tools = [SimpleNamespace(name=f"tool{i}", input_schema={}) for i in range(2)]
+    tool_counts = {"first": 2, "second": 1}
+
+    def allocate(order):
+        allocator = BudgetAllocator(
+            min_tests=1, token_budget=3001, tokens_per_case=100, prompt_tokens=500,
+            history=str(tmp_path / "missing.json")
+        )
+        allocator.reserve(["first", "second"])
+        return {name: sum(allocator.allocate(tools[:tool_counts[name]], 10, name).values()) for name in order}
+
+    assert allocate(["first", "second"]) == allocate(["second", "first"]) == {"first": 5, "second": 10}
@@ -0,0 +1,83 @@
+from src.test_generator.CaseDeduplicator import CaseDeduplicator
+from src.type.types_def import TestCase
+
+
+def make_case(case_id, description, input, status="success", rules=0):
+    return TestCase(
+        id=case_id,
+        toolName="tool",
+        description=description,
+        query="",
+        input=input,
+        expect={"status": status, "validation_rules": [{"type": "contains", "value": "x"}] * rules}
+    )
+
+
+def test_same_input_keeps_the_case_with_most_rules():
+    cases = [
+        make_case("1", "List files in the home directory", {"path": "/home", "limit": 10}),
+        make_case("2", "Show everything under home", {"limit": 10.0, "path": "/home"}, rules=2)
+    ]
+    kept, dropped = CaseDeduplicator().deduplicate(cases)
+    assert [case.id for case in kept] == ["2"]
+    assert dropped[0]["id"] == "1" and dropped[0]["keptId"] == "2"
+    assert dropped[0]["reason"] == "duplicate of a later case with more validation rules"
+
+
+def test_similar_descriptions_with_normalized_equal_strings_are_merged():
+    cases = [
+        make_case("1", "Happy path: list the files of a directory", {"path": "/tmp"}),
+        make_case("2", "Happy path: list the files of a directory", {"path": " /TMP"})
+    ]
+    kept, dropped = CaseDeduplicator().deduplicate(cases)
+    assert [case.id for case in kept] == ["1"]
+    assert dropped[0]["reason"].startswith("similar description")
+
+
+def test_similar_descriptions_with_different_strings_are_kept():
+    cases = [
+        make_case("1", "Find all files matching the glob pattern *.py", {"pattern": "*.py"}),
+        make_case("2", "Find all files matching the glob pattern *.md", {"pattern": "*.md"}),
+        make_case("3", "Happy path: list the files of a directory", {"path": "/tmp"}),
+        make_case("4", "Happy path: list the files of a directory", {"path": "/var"})
+    ]
+    kept, dropped = CaseDeduplicator().deduplicate(cases)
+    assert [case.id for case in kept] == ["1", "2", "3", "4"]
+    assert dropped == []
+
+
+def test_distinct_cases_are_kept_in_order():
+    cases = [
+        make_case("1", "List files of a directory", {"path": "/tmp"}),
+        make_case("2", "List files of a directory", {"path": "/tmp"}, status="error"),
+        make_case("3", "Fail on a missing directory", {"path": "/missing"}),
+        make_case("4", "List files of a directory", {"path": "/tmp", "limit": 5})
+    ]
+    kept, dropped = CaseDeduplicator().deduplicate(cases)
+    assert [case.id for case in kept] == ["1", "2", "3", "4"]
+    assert dropped == []
+
+
+def test_strings_are_compared_exactly():
+    cases = [
+        make_case("1", "Find Python sources", {"pattern": "*.py"}),
+        make_case("2", "Find upper-case Python sources", {"pattern": "*.PY"}),
+        make_case("3", "Read a path", {"path": "/tmp/a"}),
+        make_case("4", "Read a path with a trailing space", {"path": "/tmp/a "})
+    ]
+    kept, dropped = CaseDeduplicator().deduplicate(cases)
+    assert [case.id for case in kept] == ["1", "2", "3", "4"]
+    assert dropped == []
+
+
+def test_similarity_of_signatures():
+    deduplicator = CaseDeduplicator()
+    signature = deduplicator.signature("Read a file that exists")
+    assert deduplicator.similarity(signature, deduplicator.signature("Read a file that exists")) == 1
+    assert deduplicator.similarity(signature, deduplicator.signature("Delete every running container")) < 0.5
+
+
+def test_from_config():
+    assert CaseDeduplicator.from_config({"enabled": False}) is None
+    assert CaseDeduplicator.from_config({"threshold": 0.5}).threshold == 0.5
+    assert CaseDeduplicator.from_config(None).threshold == 0.8
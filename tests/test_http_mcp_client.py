@@ -0,0 +1,98 @@
+import asyncio
+import json
+import socket
+import subprocess
+import time
+import pytest
+
+pytest.importorskip("mcp")
+pytest.importorskip("uvicorn")
+
+from src.bench.SyntheticServer import server_config, server_url, tool_name
+from src.client.HTTPMCPClient import HTTPMCPClient
+from src.client.MCPClientPool import MCPClientPool
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture(params=["http", "sse"])
+def served(request):
+    port = free_port()
+    config = server_config(3)
+    process = subprocess.Popen(
+        [config["command"], *config["args"], "--transport", request.param, "--port", str(port)]
+    )
+    try:
+        deadline = time.monotonic() + 20
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                if time.monotonic() > deadline or process.poll() is not None:
+                    pytest.fail(f"Synthetic server did not start on port {port}")
+                time.sleep(0.1)
+        yield request.param, server_url(request.param, port)
+    finally:
+        process.kill()
+        process.wait()
+
+
+def test_tools_are_listed_and_called(served):
+    transport, url = served
+
+    async def run():
+        client = HTTPMCPClient("synthetic", {"url": url})
+        assert client.transport == ("sse" if transport == "sse" else "streamable-http")
+        try:
+            await client.initialize()
+            tools = await client.list_tools()
+            result = await client.execute_tool(tool_name(1), {"query": "hello", "count": 2})
+        finally:
+            await client.cleanup()
+        return tools, result
+
+    tools, result = asyncio.run(run())
+    assert [tool.name for tool in tools] == [tool_name(index) for index in range(3)]
+    assert not result.isError
+    body = json.loads(result.content[0].text)
+    assert (body["tool"], body["query"], body["count"]) == (tool_name(1), "hello", 2)
+
+
+def test_sessions_of_a_pool_call_tools_concurrently(served):
+    _, url = served
+    cases = [{"id": str(index), "toolName": tool_name(index % 3), "input": {"query": f"q{index}"}} for index in range(12)]
+
+    async def execute(client, case):
+        result = await client.execute_tool(case["toolName"], case["input"])
+        return json.loads(result.content[0].text)["query"]
+
+    async def run():
+        async with MCPClientPool("synthetic", {"url": url}, size=3, call_timeout=30) as pool:
+            return await pool.run(cases, execute)
+
+    assert asyncio.run(run()) == [case["input"]["query"] for case in cases]
+
+
+def test_sessions_of_a_pool_share_one_http_client(served):
+    _, url = served
+    cases = [{"id": str(index), "toolName": tool_name(0), "input": {"query": f"q{index}"}} for index in range(12)]
+
+    async def execute(client, case):
+        await client.execute_tool(case["toolName"], case["input"])
+        return client, client.http
+
+    async def run():
+        async with MCPClientPool("synthetic", {"url": url}, size=3, call_timeout=30) as pool:
+            (http, sessions), = HTTPMCPClient.shared_clients.values()
+            assert sessions == 3
+            return await pool.run(cases, execute), http
+
+    results, http = asyncio.run(run())
+    assert len({id(client) for client, _ in results}) == 3
+    assert {id(client_http) for _, client_http in results} == {id(http)}
+    assert http.is_closed and not HTTPMCPClient.shared_clients
@@ -0,0 +1,74 @@
+import json
+from src.utils.json_stream import JSONArrayStreamParser
+
+
+def feed_all(parser, text, chunk_size):
+    elements = []
+    for start in range(0, len(text), chunk_size):
+        elements.extend(parser.feed(text[start:start + chunk_size]))
+    return elements
+
+
+def test_elements_are_yielded_as_soon_as_complete():
+    parser = JSONArrayStreamParser()
+    assert parser.feed('[{"a": 1}, {"b"') == [{"a": 1}]
+    assert parser.feed(': [1, 2]}]') == [{"b": [1, 2]}]
+    assert parser.done
+
+
+def test_any_chunking_gives_the_same_elements():
+    cases = [{"id": i, "text": 'quote " and brace } and bracket ]', "nested": [{"x": [i]}]} for i in range(5)]
+    text = "```json\n" + json.dumps(cases, indent=2) + "\n```\nThat's all."
+    for chunk_size in (1, 2, 7, 64, len(text)):
+        assert feed_all(JSONArrayStreamParser(), text, chunk_size) == cases
+
+
+def test_prose_before_the_fence_is_skipped():
+    parser = JSONArrayStreamParser()
+    assert parser.feed("Here are the cases:\n") == []
+    assert parser.feed('```json\n[{"a": 1}]\n```') == [{"a": 1}]
+
+
+def test_text_after_the_array_is_ignored():
+    parser = JSONArrayStreamParser()
+    assert parser.feed('[{"a": 1}] [{"b": 2}]') == [{"a": 1}]
+    assert parser.feed('{"c": 3}') == []
+
+
+def test_fenced_text_that_is_not_an_array_stops_the_parser():
+    parser = JSONArrayStreamParser()
+    assert parser.feed('```json\n{"a": 1}\n```') == []
+    assert parser.done
+
+
+def test_plain_json_mode_reads_arrays_only():
+    parser = JSONArrayStreamParser(skip_prefix=False)
+    assert parser.feed('  [{"a": 1}, {"a": 2}]') == [{"a": 1}, {"a": 2}]
+    other = JSONArrayStreamParser(skip_prefix=False)
+    assert other.feed('{"a": 1}') == []
+    assert other.done
+
+
+def test_consumed_text_is_dropped_from_the_buffer():
+    parser = JSONArrayStreamParser()
+    parser.feed("[" + ", ".join(json.dumps({"i": i}) for i in range(1000)) + ", {\"i\": ")
+    assert parser.buffer == '{"i": '
+
+
+def test_prose_before_an_unfenced_array_is_skipped():
+    parser = JSONArrayStreamParser()
+    assert parser.feed("Sure, here are the [2] cases:\n[") == []
+    assert parser.feed('\n  {"a": 1},') == [{"a": 1}]
+    assert parser.feed(' {"a": 2}]') == [{"a": 2}]
+
+
+def test_a_bare_object_is_left_to_the_non_streaming_parser():
+    parser = JSONArrayStreamParser()
+    assert parser.feed('{"description": "one case", "expect": {"validation_rules": [{"type": "llm"}]}}') == []
+    assert parser.done
+
+
+def test_invalid_elements_are_logged_and_skipped(capsys):
+    parser = JSONArrayStreamParser()
+    assert parser.feed('[{"a": 1}, {"b": nope}, {"c": 3}]') == [{"a": 1}, {"c": 3}]
+    assert '{"b": nope}' in capsys.readouterr().out
@@ -0,0 +1,92 @@
+import asyncio
+import json
+import os
+import time
+import pytest
+from src.llm.LLMCache import CachedLLMClient
+from src.llm.LLMScheduler import LLMScheduler
+
+
+class FakeLLM:
+    model = "fake-model"
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_response(self, messages):
+        self.calls += 1
+        return "response to " + messages[-1]["content"]
+
+
+def prompt(text):
+    return [{"role": "user", "content": text}]
+
+
+def entry_paths(cache_dir):
+    return sorted(os.path.join(root, name) for root, _, files in os.walk(cache_dir) for name in files)
+
+
+def test_repeated_prompts_are_served_from_disk(tmp_path):
+    llm = FakeLLM()
+    cache = CachedLLMClient(llm, cache_dir=str(tmp_path))
+    assert cache.get_response(prompt("a")) == "response to a"
+    assert CachedLLMClient(llm, cache_dir=str(tmp_path)).get_response(prompt("a")) == "response to a"
+    assert llm.calls == 1
+
+
+def test_modes(tmp_path):
+    llm = FakeLLM()
+    CachedLLMClient(llm, cache_dir=str(tmp_path), mode="readonly").get_response(prompt("a"))
+    assert entry_paths(tmp_path) == []
+    CachedLLMClient(llm, cache_dir=str(tmp_path)).get_response(prompt("a"))
+    CachedLLMClient(llm, cache_dir=str(tmp_path), mode="off").get_response(prompt("a"))
+    assert llm.calls == 3
+    with pytest.raises(ValueError):
+        CachedLLMClient(llm, cache_dir=str(tmp_path), mode="sometimes")
+
+
+def test_eviction_removes_least_recently_used_entries(tmp_path):
+    cache = CachedLLMClient(FakeLLM(), cache_dir=str(tmp_path))
+    for index, text in enumerate("abcd"):
+        cache.get_response(prompt(text))
+        path = cache._entry_path(cache.cache_key(prompt(text)))
+        os.utime(path, (time.time() - 100 + index, time.time() - 100 + index))
+    # reading "a" makes it the most recently used entry
+    cache.get_response(prompt("a"))
+
+    cache.max_size = sum(os.path.getsize(cache._entry_path(cache.cache_key(prompt(text)))) for text in "ad")
+    cache.evict()
+    kept = {text for text in "abcd" if os.path.exists(cache._entry_path(cache.cache_key(prompt(text))))}
+    assert kept == {"a", "d"}
+
+
+def test_expired_entries_are_misses_and_evicted(tmp_path):
+    llm = FakeLLM()
+    cache = CachedLLMClient(llm, cache_dir=str(tmp_path), max_age_days=1)
+    cache.get_response(prompt("old"))
+    path = entry_paths(tmp_path)[0]
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"created": time.time() - 2 * 24 * 3600, "response": "old response"}, file)
+
+    assert cache.get_response(prompt("old")) == "response to old"
+    assert llm.calls == 2
+
+    two_days_ago = time.time() - 2 * 24 * 3600
+    os.utime(path, (two_days_ago, two_days_ago))
+    cache.evict()
+    assert entry_paths(tmp_path) == []
+
+
+def test_scheduler_reads_the_cache_once_per_call(tmp_path):
+    llm = FakeLLM()
+    cache = CachedLLMClient(llm, cache_dir=str(tmp_path))
+    reads = []
+    read = cache._read
+    cache._read = lambda key: reads.append(key) or read(key)
+    scheduler = LLMScheduler(cache)
+
+    assert asyncio.run(scheduler.get_response(prompt("a"))) == "response to a"
+    assert len(reads) == 1 and (cache.hits, cache.misses) == (0, 1)
+    assert asyncio.run(scheduler.get_response(prompt("a"))) == "response to a"
+    assert len(reads) == 2 and (cache.hits, cache.misses) == (1, 1)
+    assert llm.calls == 1
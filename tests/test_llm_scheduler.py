@@ -0,0 +1,125 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from src.llm import LLMScheduler as scheduler_module
+from src.llm.LLMScheduler import LLMScheduler
+from src.utils.token_count import estimate_message_tokens, estimate_tokens
+
+
+class FakeClock:
+    """
+    Monotonic clock that only moves when the scheduler sleeps
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+        self._sleep = asyncio.sleep
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.sleeps.append(delay)
+        self.now += max(0, delay)
+        await self._sleep(0)
+
+
+class APIError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(status_code=status_code, headers=headers or {})
+
+
+class FakeLLM:
+    def __init__(self, errors=(), response="ok"):
+        self.errors = list(errors)
+        self.response = response
+        self.calls = 0
+
+    def get_response(self, messages):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.response
+
+
+def prompt(text):
+    return [{"role": "user", "content": text}]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(scheduler_module, "time", SimpleNamespace(monotonic=clock.monotonic))
+    monkeypatch.setattr(asyncio, "sleep", clock.sleep)
+    return clock
+
+
+def test_request_rate_limit_holds(clock):
+    llm = FakeLLM()
+    scheduler = LLMScheduler(llm, requests_per_minute=2)
+
+    async def run():
+        return await asyncio.gather(*(scheduler.get_response(prompt(str(i))) for i in range(5)))
+
+    assert asyncio.run(run()) == ["ok"] * 5
+    # a burst of two, then one request every 30 seconds
+    assert clock.sleeps == [pytest.approx(30)] * 3
+    assert clock.now == pytest.approx(90)
+    assert llm.calls == scheduler.calls == 5
+
+
+def test_prompt_tokens_are_reserved_and_completion_tokens_charged(clock):
+    messages = prompt("x" * 400)
+    llm = FakeLLM(response="y" * 400)
+    prompt_tokens, completion_tokens = estimate_message_tokens(messages), estimate_tokens(llm.response)
+    scheduler = LLMScheduler(llm, tokens_per_minute=prompt_tokens + completion_tokens // 2)
+
+    asyncio.run(scheduler.get_response(messages))
+    assert (scheduler.prompt_tokens, scheduler.completion_tokens) == (prompt_tokens, completion_tokens)
+    assert scheduler.tokens.level == pytest.approx(-completion_tokens / 2, abs=1)
+    assert clock.sleeps == []
+
+    # the completion went over the limit, so the next call waits until its prompt fits again
+    asyncio.run(scheduler.get_response(messages))
+    assert clock.sleeps == [pytest.approx((prompt_tokens - scheduler.tokens.capacity
+                                           + prompt_tokens + completion_tokens) / scheduler.tokens.rate)]
+
+
+def test_retryable_errors_back_off_until_the_call_succeeds(clock):
+    llm = FakeLLM(errors=[APIError(503), TimeoutError("read timed out"), APIError(503)])
+    scheduler = LLMScheduler(llm, base_delay=1.0, max_delay=60.0)
+
+    assert asyncio.run(scheduler.get_response(prompt("a"))) == "ok"
+    assert llm.calls == 4 and scheduler.retries == 3
+    assert len(clock.sleeps) == 3
+    assert all(0 <= delay <= 2 ** attempt for attempt, delay in enumerate(clock.sleeps))
+
+
+def test_rate_limits_honour_retry_after_and_pause_other_callers(clock):
+    llm = FakeLLM(errors=[APIError(429, {"retry-after": "7"})])
+    scheduler = LLMScheduler(llm)
+
+    assert asyncio.run(scheduler.get_response(prompt("a"))) == "ok"
+    assert clock.sleeps == [7]
+    assert scheduler.paused_until == 7
+
+
+def test_non_retryable_errors_are_raised(clock):
+    llm = FakeLLM(errors=[APIError(400)])
+    scheduler = LLMScheduler(llm)
+
+    with pytest.raises(APIError):
+        asyncio.run(scheduler.get_response(prompt("a")))
+    assert llm.calls == 1 and scheduler.retries == 0 and clock.sleeps == []
+
+
+def test_retryable_errors_are_raised_once_retries_run_out(clock):
+    llm = FakeLLM(errors=[APIError(503)] * 3)
+    scheduler = LLMScheduler(llm, max_retries=2)
+
+    with pytest.raises(APIError):
+        asyncio.run(scheduler.get_response(prompt("a")))
+    assert llm.calls == 3 and scheduler.retries == 2
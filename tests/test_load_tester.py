@@ -0,0 +1,39 @@
+import asyncio
+import pytest
+from src.bench.LoadTester import LoadTester
+
+
+def test_inflight_limit():
+    assert LoadTester("s", {}, rate=0).inflight_limit(4) == 4
+    assert LoadTester("s", {}, rate=10, max_inflight=7).inflight_limit(4) == 7
+    assert LoadTester("s", {}, rate=10, pool_options={"call_timeout": 2}).inflight_limit(4) == 20
+    assert LoadTester("s", {}, rate=0.01, pool_options={"call_timeout": 2}).inflight_limit(4) == 4
+    assert LoadTester("s", {}, rate=10, pool_options={"call_timeout": None}).inflight_limit(4) == 600
+
+
+def test_rate_limited_replay_against_the_synthetic_server():
+    pytest.importorskip("mcp")
+    from src.bench.SyntheticServer import server_config, tool_name
+
+    cases = [{"id": str(i), "toolName": tool_name(i % 2), "input": {"query": "x"}} for i in range(10)]
+    tester = LoadTester("synthetic", server_config(2), concurrency=2, rate=200, max_inflight=3)
+    results = asyncio.run(tester.run(cases))
+    assert results["overall"]["requests"] == 10
+    assert results["overall"]["errors"] == 0
+    assert set(results["tools"]) == {tool_name(0), tool_name(1)}
+
+
+def test_expected_errors_are_not_counted_as_errors():
+    pytest.importorskip("mcp")
+    from src.bench.SyntheticServer import server_config, tool_name
+
+    # every call of this server fails
+    cases = [
+        {"id": "positive", "toolName": tool_name(0), "input": {"query": "x"}},
+        {"id": "negative", "toolName": tool_name(1), "input": {"query": "x"}, "expect": {"status": "error"}}
+    ]
+    results = asyncio.run(LoadTester("synthetic", server_config(2, error_rate=1)).run(cases))
+    assert results["overall"]["requests"] == 2
+    assert results["overall"]["errors"] == 1
+    assert results["overall"]["expected_errors"] == 1
+    assert results["tools"][tool_name(1)]["error_rate"] == 0
@@ -0,0 +1,70 @@
+import asyncio
+import os
+import subprocess
+import pytest
+
+pytest.importorskip("mcp")
+
+from src.client.MCPClientPool import SESSION_ENV, MCPClientPool
+
+
+class WedgedClient:
+    """
+    Starts a server process that outlives a cleanup which never returns
+    """
+
+    started = []
+
+    def __init__(self, name, config):
+        self.config = config
+
+    async def initialize(self):
+        process = subprocess.Popen(["sleep", "60"], env={**os.environ, **self.config["env"]})
+        self.started.append(process)
+
+    async def execute_tool(self, tool_name, arguments):
+        await asyncio.sleep(60)
+
+    async def cleanup(self):
+        await asyncio.sleep(60)
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+def test_wedged_sessions_are_killed_after_the_kill_timeout():
+    WedgedClient.started = []
+    pool = MCPClientPool(
+        "wedged", {"command": "sleep", "args": [], "env": {"KEEP": "1"}}, size=1,
+        client_factory=WedgedClient, call_timeout=0.5, max_restarts=0, kill_timeout=0.5
+    )
+
+    async def run():
+        async with pool:
+            return await pool.run([{"id": "1", "toolName": "hang"}], lambda client, case: client.execute_tool("hang", {}))
+
+    asyncio.run(run())
+    process = WedgedClient.started[0]
+    assert process.wait(timeout=5) == -9
+    assert pool.timeouts == 1
+
+
+def test_stdio_sessions_get_a_token_of_their_own():
+    configs = []
+
+    class Client(WedgedClient):
+        def __init__(self, name, config):
+            configs.append(config)
+            super().__init__(name, config)
+
+        async def initialize(self):
+            pass
+
+        async def cleanup(self):
+            pass
+
+    async def run():
+        async with MCPClientPool("server", {"command": "x", "args": []}, size=2, client_factory=Client):
+            pass
+
+    asyncio.run(run())
+    tokens = {config["env"][SESSION_ENV] for config in configs}
+    assert len(tokens) == 2
@@ -0,0 +1,30 @@
+import json
+import os
+from src.reporter.Reporter import REPORT_HTML, REPORT_JSON, run_report, server_from_path
+
+
+def write_results(folder, records):
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / "validation_results.json"
+    path.write_text(json.dumps(records))
+    return str(path)
+
+
+def test_report_paths_are_printed_in_full(tmp_path, capsys):
+    valpath = write_results(tmp_path / "srv_2025-09-11T07-31-04-418670", [
+        {"id": "1", "toolName": "a", "passed": True, "execution_time": 0.1},
+        {"id": "2", "toolName": "a", "passed": False, "execution_time": 0.3}
+    ])
+    output = tmp_path / "out"
+    report = run_report(valpath, output_dir=str(output))
+
+    assert report["servers"]["srv"]["passed"] == 1
+    printed = capsys.readouterr().out
+    assert os.path.join(str(output), REPORT_JSON) in printed
+    assert os.path.join(str(output), REPORT_HTML) in printed
+    assert (output / REPORT_HTML).is_file()
+
+
+def test_server_from_path():
+    assert server_from_path("/x/perf_mcp_2025-09-11T07-31-04-418670/validation_results.json") == "perf_mcp"
+    assert server_from_path("/x/results/validation_results.json") == "unknown"
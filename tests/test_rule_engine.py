@@ -0,0 +1,59 @@
+from src.validator.RuleEngine import ContainsMatcher, RuleEngine
+
+
+def test_contains_matcher_finds_overlapping_and_nested_needles():
+    matcher = ContainsMatcher(["abc", "bcd", "b", "", "abc", "zzz"])
+    assert matcher.needles == ["abc", "bcd", "b", "zzz"]
+    assert matcher.find("xabcdx") == {"abc", "bcd", "b"}
+    assert ContainsMatcher([]).find("anything") == set()
+
+
+def test_normalize_text_strips_the_quotes_prompts_ask_for():
+    assert RuleEngine.normalize_text(" 'Python 3.11 installed' ") == "Python 3.11 installed"
+    assert RuleEngine.normalize_text(42) == "42"
+
+
+def test_deterministic_rules():
+    engine = RuleEngine()
+    rules = [
+        {"type": "contains", "value": "'/envs/'"},
+        {"type": "schema", "value": {"type": "object", "required": ["environments"]}},
+        {"type": "equals", "value": {"environments": ["/envs/base"]}}
+    ]
+    compiled = engine.compile_case({"id": "1", "expect": {"validation_rules": rules}})
+    evaluation = compiled.evaluate('{"environments": ["/envs/base"]}')
+    assert evaluation.passed is True
+    assert [result["passed"] for result in evaluation.results] == [True, True, True]
+
+    evaluation = compiled.evaluate("not json")
+    assert evaluation.passed is False
+    assert evaluation.results[1]["reason"] == "Response is not valid JSON"
+
+
+def test_llm_rules_are_only_pending_when_every_deterministic_rule_passed():
+    engine = RuleEngine()
+    rules = [{"type": "contains", "value": "ok"}, {"type": "llm", "value": "Output is polite"}]
+    compiled = engine.compile_case({"id": "1", "expect": {"validation_rules": rules}})
+
+    evaluation = compiled.evaluate("ok, thanks")
+    assert evaluation.pending_llm_rules == [(1, rules[1])]
+    assert evaluation.passed is None
+    evaluation.set_llm_result(1, True, "Polite")
+    assert evaluation.passed is True
+
+    evaluation = compiled.evaluate("failed")
+    assert evaluation.pending_llm_rules == []
+    assert evaluation.results[1]["passed"] is None
+    assert evaluation.passed is False
+
+
+def test_compile_suite_shares_schema_validators():
+    engine = RuleEngine()
+    schema_rule = {"type": "schema", "value": {"type": "object"}}
+    cases = [{"id": str(i), "expect": {"validation_rules": [schema_rule]}} for i in range(3)]
+    compiled = engine.compile_suite(cases)
+    assert set(compiled) == {"0", "1", "2"}
+    assert len(engine._schema_validators) == 1
+    assert engine.compile_case({"id": "x", "expect": {"validation_rules": [
+        {"type": "schema", "value": {"type": 5}}
+    ]}}).evaluate("{}").results[0]["reason"].startswith("Validation rule schema is invalid")
@@ -0,0 +1,52 @@
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from src.test_generator.SchemaCaseGenerator import SchemaCaseGenerator
+
+
+def make_tool(properties, required):
+    return SimpleNamespace(
+        name="tool",
+        input_schema={"type": "object", "properties": properties, "required": required}
+    )
+
+
+def test_invalid_cases_only_expect_the_error_status():
+    cases = SchemaCaseGenerator().generate(make_tool({"count": {"type": "integer", "minimum": 1}}, ["count"]))
+    errors = [case for case in cases if case.expect["status"] == "error"]
+    assert errors and all(case.expect["validation_rules"] == [] for case in errors)
+
+
+@pytest.mark.parametrize("prop", [
+    {"type": "string", "format": "date"},
+    {"type": "string", "format": "email", "maxLength": 40},
+    {"type": "string", "pattern": r"^\d+$"},
+    {"type": "string", "pattern": r"\.txt$", "minLength": 3}
+])
+def test_samples_satisfy_pattern_and_format(prop):
+    value = SchemaCaseGenerator().sample_value(prop)
+    assert len(value) >= prop.get("minLength", 0)
+    if "pattern" in prop:
+        assert re.search(prop["pattern"], value)
+    if prop.get("format") == "date":
+        assert value == "2024-01-01"
+
+
+def test_tools_with_unsatisfiable_required_fields_are_skipped():
+    generator = SchemaCaseGenerator()
+    with pytest.raises(ValueError):
+        generator.sample_value({"type": "string", "pattern": "^[A-Z]{3}-[0-9]{4}$"})
+    tool = make_tool({"code": {"type": "string", "pattern": "^[A-Z]{3}-[0-9]{4}$"}}, ["code"])
+    assert generator.generate(tool) == []
+
+
+def test_length_bounds_of_constrained_strings_are_not_valid_cases():
+    tool = make_tool({
+        "path": {"type": "string", "pattern": "^/", "minLength": 2, "maxLength": 20},
+        "name": {"type": "string", "minLength": 2}
+    }, [])
+    cases = SchemaCaseGenerator(max_cases_per_tool=20).generate(tool)
+    valid = [case.input for case in cases if case.expect["status"] == "success"]
+    assert valid == [{"name": "aa"}]
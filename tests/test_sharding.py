@@ -0,0 +1,75 @@
+import json
+import pytest
+import os
+from src.reporter.Reporter import server_from_path
+from src.utils.suite_store import TESTCASES_JSON, iter_records, list_suite_folders, suite_server
+from src.validator.Sharding import assign_shards, merge_results, parse_shard, write_shard
+
+
+def make_cases(count, tools=("a", "b", "c")):
+    return [{"id": f"case-{i}", "toolName": tools[i % len(tools)]} for i in range(count)]
+
+
+def test_parse_shard():
+    assert parse_shard("1/4") == (0, 4)
+    assert parse_shard("4/4") == (3, 4)
+    for spec in ("0/4", "5/4", "1/0", "x/2", "1"):
+        with pytest.raises(ValueError):
+            parse_shard(spec)
+
+
+def test_shards_by_id_are_stable_and_cover_every_case():
+    cases = make_cases(200)
+    shards = assign_shards(cases, 4)
+    assert shards == assign_shards(list(reversed(cases)), 4)[::-1]
+    assert set(shards) == {0, 1, 2, 3}
+    # a case keeps its shard when other cases are added
+    assert assign_shards(cases + make_cases(250)[200:], 4)[:200] == shards
+
+
+def test_shards_by_history_balance_the_load():
+    cases = make_cases(90)
+    times = {"a": 3.0, "b": 1.0, "c": 0.5}
+    shards = assign_shards(cases, 3, times)
+    loads = [sum(times[case["toolName"]] for case, shard in zip(cases, shards) if shard == index) for index in range(3)]
+    assert max(loads) - min(loads) <= max(times.values())
+    assert shards == assign_shards(list(reversed(cases)), 3, times)[::-1]
+
+
+def test_unknown_tools_cost_the_median_time():
+    cases = make_cases(6, tools=("a", "b", "c", "new"))
+    assert len(assign_shards(cases, 2, {"a": 1.0, "b": 2.0, "c": 3.0})) == 6
+
+
+def test_merge_keeps_each_case_once_in_order(tmp_path):
+    first = tmp_path / "shard1.json"
+    second = tmp_path / "shard2.jsonl"
+    first.write_text(json.dumps([{"id": "1", "passed": True}, {"id": "2", "passed": False}]))
+    second.write_text("\n".join(json.dumps(record) for record in [{"id": "2", "passed": True}, {"id": "3"}]))
+    output = tmp_path / "merged.json"
+
+    merge_results([str(first), str(second)], str(output))
+    merged = list(iter_records(str(output)))
+    assert [record["id"] for record in merged] == ["1", "2", "3"]
+    assert merged[1]["passed"] is False
+    assert json.loads(output.read_text()) == merged
+
+
+def test_merge_refuses_to_overwrite_a_shard(tmp_path):
+    shard = tmp_path / "validation_results.json"
+    shard.write_text("[]")
+    with pytest.raises(ValueError):
+        merge_results([str(shard)], str(shard))
+
+
+def test_shard_folders_are_not_taken_for_suites(tmp_path):
+    suite = tmp_path / "perf_mcp_2025-09-11T07-31-04-418670"
+    suite.mkdir()
+    (suite / TESTCASES_JSON).write_text(json.dumps(make_cases(10)))
+
+    shard_path = write_shard(str(suite), "2/3")
+    folder = os.path.dirname(shard_path)
+    assert os.path.basename(folder).endswith("_shard-2-of-3")
+    assert list_suite_folders("perf_mcp", str(tmp_path)) == [str(suite)]
+    assert server_from_path(shard_path) == "perf_mcp"
+    assert suite_server(["perf_mcp", "other"], shard_path) == "perf_mcp"
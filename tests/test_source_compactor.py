@@ -0,0 +1,45 @@
+from src.utils.source_compactor import MIN_SOURCE_TOKENS, compact_tool_source
+from src.utils.token_count import estimate_tokens
+
+SOURCE = '''import os
+import json
+
+# the root every path is resolved against
+ROOT = "/srv"
+
+
+def resolve(path):
+    """Resolve a path below ROOT"""
+    return os.path.join(ROOT, path)
+
+
+def unrelated():
+    return json.dumps({})
+
+
+@mcp.tool(name="read_file")
+def read(path: str) -> str:
+    """Read a file"""
+    with open(resolve(path)) as file:
+        return file.read()
+'''
+
+
+def test_source_that_fits_is_returned_unchanged():
+    assert compact_tool_source(SOURCE, "read_file", 10_000) == SOURCE
+
+
+def test_source_over_budget_keeps_the_tool_and_its_helpers():
+    source = SOURCE + "\n\n" + "\n\n".join(f"def filler_{i}():\n    return {i}" for i in range(200))
+    compacted = compact_tool_source(source, "read_file", MIN_SOURCE_TOKENS)
+    assert compacted.startswith("@mcp.tool(name='read_file')")
+    assert "def resolve(path)" in compacted and "ROOT = '/srv'" in compacted and "import os" in compacted
+    assert "unrelated" not in compacted and "filler_" not in compacted
+    assert "# the root" not in compacted
+
+
+def test_budget_is_clamped_to_the_minimum():
+    source = "x = 1\n" * 1000
+    compacted = compact_tool_source(source, "missing", -50)
+    assert "source truncated" in compacted
+    assert estimate_tokens(compacted) > MIN_SOURCE_TOKENS // 2
@@ -0,0 +1,32 @@
+import asyncio
+import json
+from src.utils.suite_db import SuiteDatabase
+
+
+def test_folder_time_parses_timestamps_with_and_without_microseconds():
+    assert SuiteDatabase.folder_time("perf_mcp_2025-09-11T07-31-04-418670") == "2025-09-11T07:31:04.418670"
+    assert SuiteDatabase.folder_time("perf_mcp_2025-09-11T07-31-04") == "2025-09-11T07:31:04"
+    assert SuiteDatabase.folder_time("perf_mcp_2025-09-11T07-31-04_shard-1-of-2") == "2025-09-11T07:31:04"
+
+
+def test_suites_are_recorded_from_worker_threads(tmp_path):
+    db = SuiteDatabase(str(tmp_path / "suites.db"))
+    try:
+        cases = [{"id": "1", "toolName": "tool", "input": {}, "expect": {"status": "success"}}]
+        asyncio.run(asyncio.to_thread(db.record_suite, "perf_mcp", cases, "perf_mcp_2025-09-11T07-31-04"))
+        assert [case["id"] for case in db.query_cases(server="perf_mcp")] == ["1"]
+    finally:
+        db.close()
+
+
+def test_shard_folders_are_imported_under_their_server(tmp_path):
+    folder = tmp_path / "perf_mcp_2025-09-11T07-31-04_shard-1-of-2"
+    folder.mkdir()
+    cases = [{"id": "1", "toolName": "tool", "input": {}, "expect": {"status": "success"}}]
+    (folder / "testcases.json").write_text(json.dumps(cases), encoding="utf-8")
+    db = SuiteDatabase(str(tmp_path / "suites.db"))
+    try:
+        assert len(db.import_folder(str(folder))) == 1
+        assert [case["id"] for case in db.query_cases(server="perf_mcp")] == ["1"]
+    finally:
+        db.close()
@@ -0,0 +1,187 @@
+import asyncio
+import json
+import pytest
+
+pytest.importorskip("mcp")
+
+from src.bench.SyntheticServer import SERVER_NAME, server_config, tool_name
+from src.utils.suite_db import SuiteDatabase
+from src.utils.suite_store import TESTCASES_JSON
+from src.utils.tracing import tracer
+from src.validator.SuiteValidator import SuiteValidator
+
+
+class JudgeLLM:
+    def __init__(self):
+        self.prompts = []
+
+    def get_response(self, messages):
+        self.prompts.append(messages[-1]["content"])
+        return json.dumps({"answer": "yes", "explanation": "Looks right"})
+
+
+def make_case(case_id, rules, status="success"):
+    return {
+        "id": case_id,
+        "toolName": tool_name(0),
+        "description": f"Case {case_id}",
+        "query": "",
+        "input": {"query": f"item {case_id}"},
+        "expect": {"status": status, "validation_rules": rules}
+    }
+
+
+@pytest.fixture
+def suite(tmp_path):
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps({
+        "mcpServers": {SERVER_NAME: server_config(2), "other": {"command": "false", "args": []}},
+        "validationSessions": 2,
+        "callTimeout": 30,
+        "endToEnd": {"enabled": False}
+    }))
+    folder = tmp_path / f"{SERVER_NAME}_2025-09-11T07-31-04-418670"
+    folder.mkdir()
+    cases = [
+        make_case("contains", [{"type": "contains", "value": "item contains"}]),
+        make_case("missing", [{"type": "contains", "value": "not in the output"},
+                              {"type": "llm", "value": "Never judged"}]),
+        make_case("judged", [{"type": "llm", "value": "The query is echoed"}]),
+        make_case("error", [], status="error")
+    ]
+    (folder / TESTCASES_JSON).write_text(json.dumps(cases))
+    return str(config_path), str(folder / TESTCASES_JSON)
+
+
+def test_suite_is_validated_on_the_pool(suite):
+    config_path, testcase_path = suite
+    llm = JudgeLLM()
+    validator = SuiteValidator(config_path=config_path, testcase_path=testcase_path, llm=llm)
+    assert validator.server_name == SERVER_NAME
+
+    valpath = asyncio.run(validator.run())
+    with open(valpath, encoding="utf-8") as file:
+        records = {record["id"]: record for record in json.load(file)}
+
+    assert {case_id: record["passed"] for case_id, record in records.items()} == {
+        "contains": True, "missing": False, "judged": True, "error": False
+    }
+    assert records["missing"]["validation_results"][1]["passed"] is None
+    assert records["judged"]["validation_results"][0]["reason"] == "Looks right"
+    assert records["error"]["validation_results"][-1]["reason"] == "Expected error, got success"
+    assert all(record["execution_time"] > 0 for record in records.values())
+    assert len(llm.prompts) == 1
+
+
+class ChatLLM(JudgeLLM):
+    """
+    Calls the tool named in the query once, then answers with the tool's result
+    """
+
+    def get_response(self, messages):
+        prompt = messages[-1]["content"]
+        if "Test Cases" in prompt:
+            self.prompts.append(prompt)
+            items = json.loads(prompt.split("final output:\n", 1)[1].split("\n\n### 3.", 1)[0])
+            return json.dumps([
+                {"id": item["id"], "answer": "yes" if "item" in item["output"] else "no", "explanation": "Judged"}
+                for item in items
+            ])
+        if prompt.startswith("Tool execution result: "):
+            return "Here it is: " + json.loads(prompt[len("Tool execution result: "):])["query"]
+        if prompt.startswith("call "):
+            return json.dumps({"tool": tool_name(0), "arguments": {"query": prompt[len("call "):]}})
+        return "I cannot help with that."
+
+
+def test_queries_are_run_end_to_end_and_judged_in_one_batch(suite):
+    config_path, testcase_path = suite
+    with open(config_path, encoding="utf-8") as file:
+        config = json.load(file)
+    config["endToEnd"] = {"enabled": True, "maxToolCalls": 2}
+    with open(config_path, "w", encoding="utf-8") as file:
+        json.dump(config, file)
+    cases = [dict(make_case("called", []), query="call item 1"), dict(make_case("refused", []), query="hello")]
+    with open(testcase_path, "w", encoding="utf-8") as file:
+        json.dump(cases, file)
+
+    llm = ChatLLM()
+    validator = SuiteValidator(config_path=config_path, testcase_path=testcase_path, llm=llm)
+    with open(asyncio.run(validator.run()), encoding="utf-8") as file:
+        records = {record["id"]: record for record in json.load(file)}
+
+    assert records["called"]["end_to_end"]["output"] == "Here it is: item 1"
+    assert records["called"]["end_to_end"]["tool_calls"] == [{"tool": tool_name(0), "arguments": {"query": "item 1"}}]
+    assert records["called"]["passed"] is True
+    assert records["refused"]["end_to_end"]["tool_calls"] == []
+    assert records["refused"]["validation_results"][-1]["rule"]["type"] == "end_to_end"
+    assert records["refused"]["passed"] is False
+    assert len(llm.prompts) == 1
+
+
+def test_cases_with_the_wrong_status_are_not_judged(suite):
+    config_path, testcase_path = suite
+    with open(config_path, encoding="utf-8") as file:
+        config = json.load(file)
+    config["endToEnd"] = {"enabled": True}
+    with open(config_path, "w", encoding="utf-8") as file:
+        json.dump(config, file)
+    cases = [
+        dict(make_case("wrong", [{"type": "llm", "value": "Never judged"}], status="error"), query="call item 1"),
+        dict(make_case("right", []), query="call item 2"),
+        dict(make_case("also_right", []), query="call item 3")
+    ]
+    with open(testcase_path, "w", encoding="utf-8") as file:
+        json.dump(cases, file)
+
+    llm = ChatLLM()
+    validator = SuiteValidator(config_path=config_path, testcase_path=testcase_path, llm=llm)
+    with open(asyncio.run(validator.run()), encoding="utf-8") as file:
+        records = {record["id"]: record for record in json.load(file)}
+
+    assert records["wrong"]["passed"] is False
+    assert records["wrong"]["validation_results"][0] == {
+        "rule": {"type": "llm", "value": "Never judged"}, "passed": None, "reason": "Skipped, expected error but got success"
+    }
+    assert records["wrong"]["validation_results"][-1]["reason"] == "Skipped, the case already failed"
+    assert records["right"]["passed"] is True and records["also_right"]["passed"] is True
+    assert len(llm.prompts) == 1 and '"wrong"' not in llm.prompts[0]
+
+
+def test_results_are_recorded_in_the_suite_database(suite, tmp_path):
+    config_path, testcase_path = suite
+    with open(config_path, encoding="utf-8") as file:
+        config = json.load(file)
+    config["suiteDatabase"] = {"path": str(tmp_path / "suites.db")}
+    with open(config_path, "w", encoding="utf-8") as file:
+        json.dump(config, file)
+
+    asyncio.run(SuiteValidator(config_path=config_path, testcase_path=testcase_path, llm=JudgeLLM()).run())
+    db = SuiteDatabase(str(tmp_path / "suites.db"))
+    try:
+        passed = {record["id"] for record in db.query_results(server=SERVER_NAME, passed=True)}
+    finally:
+        db.close()
+    assert passed == {"contains", "judged"}
+
+
+def test_validation_is_traced(suite):
+    config_path, testcase_path = suite
+    validator = SuiteValidator(config_path=config_path, testcase_path=testcase_path, llm=JudgeLLM())
+    tracer.enable()
+    try:
+        asyncio.run(validator.run())
+    finally:
+        tracer.enabled = False
+    names = {event[0] for event in tracer.events}
+    assert {"suite.execute", "case.run", "suite.judge", "llm.judge"} <= names
+
+
+def test_parse_tool_call():
+    assert SuiteValidator.parse_tool_call('```json\n{"tool": "t", "arguments": {"a": 1}}\n```') == {
+        "tool": "t", "arguments": {"a": 1}
+    }
+    assert SuiteValidator.parse_tool_call('{"tool": "t"}') == {"tool": "t", "arguments": {}}
+    assert SuiteValidator.parse_tool_call("The answer is 42") is None
+    assert SuiteValidator.parse_tool_call('{"tool": "t", "arguments": [1]}') is None
+    assert SuiteValidator.parse_tool_call(None) is None
@@ -0,0 +1,228 @@
+import asyncio
+import json
+import re
+import threading
+import time
+import uuid
+from contextlib import aclosing
+from types import SimpleNamespace
+from src.llm.LLMScheduler import LLMScheduler
+from src.test_generator.SchemaCaseGenerator import SchemaCaseGenerator
+from src.test_generator.TestGenerator import TestGenerator
+from src.type.types_def import TestCase, ToolDefinition
+from src.utils.suite_store import TESTCASES_JSONL, TestSuiteWriter, create_suite_folder, find_unfinished_suite
+
+TOOL = ToolDefinition("list_files", "List the files of a directory", {"properties": {"path": {"type": "string"}}})
+
+
+def make_cases():
+    return [
+        TestCase(id=str(uuid.uuid4()), toolName=TOOL.name, description=f"List {path}", query="",
+                 input={"path": path}, expect={"status": "success"})
+        for path in ("/tmp", "/var", "/etc")
+    ]
+
+
+def bare_generator(respond):
+    generator = TestGenerator.__new__(TestGenerator)
+
+    async def get_response_async(messages):
+        return respond(messages[-1]["content"])
+
+    generator.get_response_async = get_response_async
+    return generator
+
+
+def suite_generator(generate, **settings):
+    """
+    TestGenerator running generate_tests_for_each_server with `generate(tool)` as the LLM generation
+    """
+    generator = TestGenerator.__new__(TestGenerator)
+    generator.readsc = SimpleNamespace(get_code=lambda server_name: {})
+    generator.budget = None
+    generator.prompt_token_budget = 8000
+    generator.schema_cases = None
+    generator.deduplicator = None
+    generator.incremental = False
+    generator.fingerprints = {}
+    generator.dropped_cases = {}
+
+    async def generate_tests_for_tool(tool, tests_per_tool, tool_functions):
+        return generate(tool)
+
+    generator.generate_tests_for_tool = generate_tests_for_tool
+    vars(generator).update(settings)
+    return generator
+
+
+def llm_cases(tool):
+    return [TestCase(id=f"{tool.name}-{index}", toolName=tool.name, description=f"Case {index} of {tool.name}",
+                     query="", input={"path": f"/{index}"}, expect={"status": "success"}) for index in range(2)]
+
+
+def test_failed_tools_with_schema_cases_are_not_marked_completed(tmp_path):
+    tools = [ToolDefinition("good", "", TOOL.input_schema), ToolDefinition("bad", "", TOOL.input_schema)]
+    generator = suite_generator(lambda tool: [] if tool.name == "bad" else llm_cases(tool),
+                                schema_cases=SchemaCaseGenerator())
+    writer = TestSuiteWriter(str(tmp_path))
+    try:
+        cases = asyncio.run(generator.generate_tests_for_each_server(tools, 2, "server", writer))
+    finally:
+        writer.close()
+
+    assert any(case.toolName == "bad" for case in cases)
+    assert set(TestSuiteWriter(str(tmp_path)).completed) == {"good"}
+    assert set(generator.fingerprints["server"]) == {"good"}
+
+
+def test_interrupted_run_is_resumed(tmp_path):
+    folder = tmp_path / "server_2025-09-11T07-31-04-418670"
+    folder.mkdir()
+    tools = [ToolDefinition(name, "", TOOL.input_schema) for name in ("done", "failed", "interrupted")]
+
+    # the first run finishes "done", fails "failed" and crashes while writing "interrupted"
+    first = suite_generator(lambda tool: [] if tool.name == "failed" else llm_cases(tool))
+    writer = TestSuiteWriter(str(folder))
+    asyncio.run(first.generate_tests_for_each_server(tools[:2], 2, "server", writer))
+    writer.close()
+    with open(folder / TESTCASES_JSONL, "a", encoding="utf-8") as file:
+        file.write(json.dumps(first.testcases_to_dict(llm_cases(tools[2]))[0]) + "\n")
+        file.write('{"id": "interrupted-1", "toolName": "interr')
+    assert find_unfinished_suite("server", str(tmp_path)) == str(folder)
+
+    generated = []
+    second = suite_generator(lambda tool: generated.append(tool.name) or llm_cases(tool))
+    writer = TestSuiteWriter(str(folder))
+    try:
+        cases = asyncio.run(second.generate_tests_for_each_server(tools, 2, "server", writer))
+    finally:
+        writer.close()
+
+    assert sorted(generated) == ["failed", "interrupted"]
+    assert [case.id for case in cases] == [f"{tool.name}-{index}" for tool in tools for index in range(2)]
+    with open(folder / TESTCASES_JSONL, encoding="utf-8") as file:
+        lines = [json.loads(line) for line in file]
+    assert sorted(case["id"] for case in lines) == sorted(case.id for case in cases)
+
+
+def test_incremental_run_regenerates_only_changed_and_failed_tools(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    tools = [ToolDefinition(name, f"The {name} tool", TOOL.input_schema) for name in ("same", "changed", "failed")]
+
+    first = suite_generator(lambda tool: [] if tool.name == "failed" else llm_cases(tool), incremental=True)
+    cases = asyncio.run(first.generate_tests_for_each_server(tools, 2, "server"))
+    assert first.save_to_file("server", cases, create_suite_folder("server"))
+
+    tools[1] = ToolDefinition("changed", "The changed tool, now with a new description", TOOL.input_schema)
+    generated = []
+    second = suite_generator(lambda tool: generated.append(tool.name) or llm_cases(tool), incremental=True)
+    cases = asyncio.run(second.generate_tests_for_each_server(tools, 2, "server"))
+
+    assert sorted(generated) == ["changed", "failed"]
+    assert [case.id for case in cases] == [f"{tool.name}-{index}" for tool in tools for index in range(2)]
+    assert set(second.fingerprints["server"]) == {"same", "changed", "failed"}
+
+
+def test_batch_query_prompt_does_not_depend_on_case_ids():
+    generator = bare_generator(None)
+    first, second = make_cases(), make_cases()
+    assert generator.create_batch_eval_prompt(TOOL, first) == generator.create_batch_eval_prompt(TOOL, second)
+    assert first[0].id not in generator.create_batch_eval_prompt(TOOL, first)
+
+
+def test_batch_queries_are_mapped_back_to_case_ids():
+    def respond(prompt):
+        scenarios = json.loads(re.search(r"include\):\n([\s\S]*?)\n\nFor each scenario", prompt).group(1))
+        answer = {scenario["id"]: f"Show me {scenario['parameters']['path']}" for scenario in scenarios[:2]}
+        answer["99"] = "Not a scenario"
+        return json.dumps(answer)
+
+    cases = make_cases()
+    queries = asyncio.run(bare_generator(respond).generate_queries_batch(TOOL, cases))
+    assert queries == {cases[0].id: "Show me /tmp", cases[1].id: "Show me /var"}
+
+
+def streamed_cases(count):
+    return [
+        json.dumps({"description": f"Case {i}", "input": {"path": f"/dir{i}"}, "expect": {"status": "success"}})
+        for i in range(count)
+    ]
+
+
+def streaming_generator(chunks, batch_queries, fail=False):
+    prompts = []
+
+    def respond(prompt):
+        prompts.append(prompt)
+        if "Test scenarios" in prompt:
+            scenarios = json.loads(re.search(r"include\):\n([\s\S]*?)\n\nFor each scenario", prompt).group(1))
+            return json.dumps({scenario["id"]: "query" for scenario in scenarios})
+        return "query"
+
+    generator = bare_generator(respond)
+    generator.batch_queries = batch_queries
+
+    async def stream_response_async(messages):
+        for chunk in chunks:
+            await asyncio.sleep(0)
+            yield chunk
+        if fail:
+            raise ConnectionError("stream broken")
+
+    generator.stream_response_async = stream_response_async
+    return generator, prompts
+
+
+def test_streamed_cases_get_their_queries_in_one_batch():
+    chunks = ["```json\n[", streamed_cases(3)[0], ", ", ", ".join(streamed_cases(3)[1:]), "]\n```"]
+    generator, prompts = streaming_generator(chunks, batch_queries=True)
+    cases = asyncio.run(generator.generate_tests_streaming(TOOL, "prompt"))
+    assert [case.query for case in cases] == ["query"] * 3
+    assert len(prompts) == 1
+
+
+def test_query_tasks_are_cancelled_when_the_stream_fails():
+    started, finished = [], []
+    generator, _ = streaming_generator(["[", streamed_cases(2)[0], ", ", streamed_cases(2)[1]], False, fail=True)
+
+    async def generate_query(tool, test_case):
+        started.append(test_case)
+        await asyncio.sleep(10)
+        finished.append(test_case)
+
+    generator.generate_query = generate_query
+
+    async def run():
+        try:
+            await generator.generate_tests_streaming(TOOL, "prompt")
+        except ConnectionError:
+            return [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    assert asyncio.run(run()) == []
+    assert started and finished == []
+
+
+def test_stopping_early_stops_the_stream_thread():
+    closed = threading.Event()
+
+    class StreamingLLM:
+        def stream_response(self, messages):
+            try:
+                while True:
+                    time.sleep(0.01)
+                    yield "chunk"
+            finally:
+                closed.set()
+
+    generator = TestGenerator.__new__(TestGenerator)
+    generator.llm = StreamingLLM()
+    generator.scheduler = LLMScheduler(generator.llm)
+
+    async def run():
+        stream = generator.stream_response_async([{"role": "user", "content": "prompt"}])
+        async with aclosing(stream):
+            async for chunk in stream:
+                return chunk
+
+    assert asyncio.run(run()) == "chunk"
+    assert closed.wait(1)